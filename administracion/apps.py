@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AdministracionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'administracion'
+
+    def ready(self):
+        # Enrolamiento en Luxand cuando el worker termina de subir la foto
+        from . import enrolamiento  # noqa: F401
@@ -0,0 +1,88 @@
+# administracion/enrolamiento.py
+import math
+
+from django.conf import settings
+from django.dispatch import receiver
+from core.luxand import add_person, LuxandError
+from core.almacenamiento import ruta_local
+from core.cuotas import CuotaAgotada
+from core.imagenes import imagen_subida
+from core.trabajos import encolar, manejador, ErrorPermanente, ErrorReintentable
+from .models import Persona, Empleado
+
+
+def _coleccion(modelo):
+    if modelo is Empleado:
+        # Puedes usar la MISMA colección que Persona (p.ej. settings.LUXAND_COLLECTION)
+        # o una específica para empleados (p.ej. settings.LUXAND_COLLECTION_EMPLEADOS)
+        return getattr(settings, "LUXAND_COLLECTION_EMPLEADOS", getattr(settings, "LUXAND_COLLECTION", ""))
+    return getattr(settings, "LUXAND_COLLECTION", "")
+
+
+def encolar_enrolamiento(obj):
+    """
+    Encola el enrolamiento en Luxand de una Persona (o subclase) o un Empleado.
+    Hay como máximo un trabajo activo por registro; el frontend consulta `luxand_estado`.
+    """
+    # Solo si hay imagen (URL ImgBB) y aún no fue enrolada
+    if not obj.imagen or obj.luxand_uuid:
+        return None
+    modelo = Empleado if isinstance(obj, Empleado) else Persona
+    trabajo = encolar(
+        'ENROLAMIENTO', modelo=modelo, objeto_id=obj.pk,
+        clave=f"enrolar:{modelo._meta.model_name}:{obj.pk}",
+    )
+    modelo.objects.filter(pk=obj.pk).update(luxand_estado='PENDIENTE')
+    obj.luxand_estado = 'PENDIENTE'
+    return trabajo
+
+
+def _marcar_error(trabajo, error):
+    modelo = trabajo.content_type.model_class()
+    modelo.objects.filter(pk=trabajo.objeto_id, luxand_uuid__isnull=True).update(luxand_estado='ERROR')
+
+
+@manejador('ENROLAMIENTO', al_fallar=_marcar_error)
+def procesar_enrolamiento(trabajo):
+    obj = trabajo.objeto
+    if obj is None:
+        raise ErrorPermanente("El registro ya no existe")
+    if obj.luxand_uuid:
+        return {"uuid": obj.luxand_uuid}
+    if not obj.imagen:
+        raise ErrorPermanente("El registro no tiene imagen")
+
+    full_name = f"{obj.nombre} {obj.apellido}".strip() or f"{trabajo.content_type.model}-{obj.pk}"
+    try:
+        # Con almacenamiento local Luxand no alcanza la URL: se le manda el archivo
+        res = add_person(full_name, ruta_local(obj.imagen) or obj.imagen, _coleccion(obj.__class__))
+    except LuxandError as e:
+        if e.temporal:
+            # 429/503: se respeta el Retry-After de Luxand o se usa el backoff de la cola
+            raise ErrorReintentable(str(e), reintentar_en=e.retry_after)
+        raise ErrorPermanente(str(e))
+    except CuotaAgotada as e:
+        raise ErrorReintentable(str(e), reintentar_en=math.ceil(e.espera))
+
+    if res.get("status") == "failure":
+        raise ErrorPermanente(res.get("message", "Error desconocido de Luxand"))
+    uuid = res.get("uuid")
+    if not uuid:
+        raise ErrorReintentable("Luxand no devolvió UUID")
+
+    obj.luxand_uuid = uuid
+    obj.luxand_estado = 'ENROLADO'
+    obj.save(update_fields=["luxand_uuid", "luxand_estado"])
+    return {"uuid": uuid}
+
+
+@receiver(imagen_subida)
+def enrolar_tras_subida(sender, instance, parametros=None, **kwargs):
+    """
+    Cuando el worker termina de subir la foto, se encola el enrolamiento en Luxand
+    (solo para los ViewSets que lo piden, igual que antes en perform_create).
+    """
+    if not (parametros or {}).get("enrolar_luxand"):
+        return
+    if isinstance(instance, (Persona, Empleado)):
+        encolar_enrolamiento(instance)
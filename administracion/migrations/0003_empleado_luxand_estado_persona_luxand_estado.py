@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+def marcar_enrolados(apps, schema_editor):
+    # Los registros que ya tienen UUID de Luxand quedan como enrolados
+    for nombre in ('Persona', 'Empleado'):
+        modelo = apps.get_model('administracion', nombre)
+        modelo.objects.filter(luxand_uuid__isnull=False).exclude(luxand_uuid='').update(luxand_estado='ENROLADO')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0002_empleado_luxand_uuid_persona_luxand_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleado',
+            name='luxand_estado',
+            field=models.CharField(choices=[('SIN_ENROLAR', 'Sin enrolar'), ('PENDIENTE', 'Pendiente'), ('ENROLADO', 'Enrolado'), ('ERROR', 'Error')], default='SIN_ENROLAR', max_length=12, verbose_name='Estado en Luxand'),
+        ),
+        migrations.AddField(
+            model_name='persona',
+            name='luxand_estado',
+            field=models.CharField(choices=[('SIN_ENROLAR', 'Sin enrolar'), ('PENDIENTE', 'Pendiente'), ('ENROLADO', 'Enrolado'), ('ERROR', 'Error')], default='SIN_ENROLAR', max_length=12, verbose_name='Estado en Luxand'),
+        ),
+        migrations.RunPython(marcar_enrolados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0004_alter_empleado_luxand_uuid_alter_persona_luxand_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='empleado',
+            name='imagen_mediana',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (mediana)'),
+        ),
+        migrations.AddField(
+            model_name='empleado',
+            name='imagen_miniatura',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (miniatura)'),
+        ),
+        migrations.AddField(
+            model_name='persona',
+            name='imagen_mediana',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (mediana)'),
+        ),
+        migrations.AddField(
+            model_name='persona',
+            name='imagen_miniatura',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (miniatura)'),
+        ),
+    ]
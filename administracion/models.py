@@ -5,6 +5,14 @@ from django.utils import timezone
 
 # Create your models here.
 
+# Estado del enrolamiento facial (lo actualiza la cola de enrolamiento)
+LUXAND_ESTADO_CHOICES = [
+    ('SIN_ENROLAR', 'Sin enrolar'),
+    ('PENDIENTE', 'Pendiente'),
+    ('ENROLADO', 'Enrolado'),
+    ('ERROR', 'Error'),
+]
+
 class Persona(models.Model):
     """
     Modelo base para todas las personas en el sistema.
@@ -34,13 +42,17 @@ class Persona(models.Model):
     apellido = models.CharField(max_length=100, verbose_name="Apellido")
     telefono = models.CharField(max_length=15, verbose_name="Teléfono", blank=True, null=True)
     imagen = models.URLField(blank=True, null=True, verbose_name='Imagen')
+    # Variantes generadas al subir la imagen (core/almacenamiento.py); las usan los listados
+    imagen_miniatura = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (miniatura)')
+    imagen_mediana = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (mediana)')
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='A', verbose_name="Estado")
     sexo = models.CharField(max_length=1, choices=SEXO_CHOICES, verbose_name="Sexo")
     tipo = models.CharField(max_length=1, choices=TIPO_CHOICES, verbose_name="Tipo de Persona")
     fecha_registro = models.DateTimeField(default=timezone.now, verbose_name="Fecha de Registro")
     CI = models.CharField(max_length=20, unique=True, verbose_name="Cédula de Identidad")
     fecha_nacimiento = models.DateField(verbose_name="Fecha de Nacimiento")
-    luxand_uuid = models.CharField(max_length=64, blank=True, null=True)
+    luxand_uuid = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    luxand_estado = models.CharField(max_length=12, choices=LUXAND_ESTADO_CHOICES, default='SIN_ENROLAR', verbose_name="Estado en Luxand")
     
     class Meta:
         db_table = 'persona'
@@ -101,8 +113,12 @@ class Empleado(models.Model):
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='A', verbose_name="Estado")
     sueldo = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Sueldo")
     imagen = models.URLField(blank=True, null=True, verbose_name='Imagen')
+    # Variantes generadas al subir la imagen (core/almacenamiento.py); las usan los listados
+    imagen_miniatura = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (miniatura)')
+    imagen_mediana = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (mediana)')
     fecha_registro = models.DateTimeField(default=timezone.now, verbose_name="Fecha de Registro")
-    luxand_uuid = models.CharField(max_length=64, blank=True, null=True)
+    luxand_uuid = models.CharField(max_length=64, blank=True, null=True, db_index=True)
+    luxand_estado = models.CharField(max_length=12, choices=LUXAND_ESTADO_CHOICES, default='SIN_ENROLAR', verbose_name="Estado en Luxand")
     
     # Relación con Cargo
     cargo = models.ForeignKey(
@@ -11,14 +11,15 @@ class PersonaSerializer(serializers.ModelSerializer):
     """
     nombre_completo = serializers.ReadOnlyField()
     luxand_uuid = serializers.ReadOnlyField()
+    luxand_estado = serializers.ReadOnlyField()
     class Meta:
         model = Persona
         fields = [
-            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'estado', 
+            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'imagen_miniatura', 'imagen_mediana', 'estado', 
             'sexo', 'tipo', 'fecha_registro', 'CI', 'fecha_nacimiento', 
-            'nombre_completo', 'luxand_uuid'
+            'nombre_completo', 'luxand_uuid', 'luxand_estado'
         ]
-        read_only_fields = ['id', 'fecha_registro', 'luxand_uuid']
+        read_only_fields = ['id', 'fecha_registro', 'luxand_uuid', 'luxand_estado']
     
     def validate_CI(self, value):
         """
@@ -47,14 +48,15 @@ class PersonaSinTipoSerializer(serializers.ModelSerializer):
     """
     nombre_completo = serializers.ReadOnlyField()
     luxand_uuid = serializers.ReadOnlyField()
+    luxand_estado = serializers.ReadOnlyField()
     class Meta:
         model = Persona
         fields = [
-            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'estado', 
+            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'imagen_miniatura', 'imagen_mediana', 'estado', 
             'sexo', 'fecha_registro', 'CI', 'fecha_nacimiento', 
-            'nombre_completo', 'luxand_uuid'
+            'nombre_completo', 'luxand_uuid', 'luxand_estado'
         ]
-        read_only_fields = ['id', 'fecha_registro', 'luxand_uuid']
+        read_only_fields = ['id', 'fecha_registro', 'luxand_uuid', 'luxand_estado']
     
     def validate_CI(self, value):
         """
@@ -1,3 +1,53 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from administracion.models import Persona
+from core.cuotas import CuotaAgotada
+from core.luxand import LuxandError
+from seguridad_IA import reconocimiento
+
+
+class LuxandSaturadoTests(TestCase):
+    """La cuota compartida y el 429 de Luxand llegan al cliente como 429 con Retry-After, no como 500."""
+
+    def setUp(self):
+        reconocimiento._cache.invalidar()
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(User.objects.create_user("admin-luxand"))
+        self.persona = Persona.objects.create(nombre="Ana", apellido="Rojas", tipo="P", sexo="F",
+                                              fecha_nacimiento="1990-01-01", CI="L-1", luxand_uuid="u-1")
+
+    def tearDown(self):
+        reconocimiento._cache.invalidar()
+
+    def _reconocer(self, **apost):
+        with mock.patch("administracion.views.http.apost", new=mock.AsyncMock(**apost)):
+            return self.cliente.post("/api/personas/reconocimiento_facial/",
+                                     {"image_url": "https://img.test/cara.jpg"}, format="json")
+
+    def test_reconocimiento_con_luxand_en_429(self):
+        r = self._reconocer(return_value=mock.Mock(status_code=429, text="rate limit", headers={"Retry-After": "7"}))
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(r["Retry-After"], "7")
+        r = self._reconocer(return_value=mock.Mock(status_code=400, text="foto inválida", headers={}))
+        self.assertEqual(r.status_code, 500)
+
+    def test_reconocimiento_sin_turno_en_la_cuota(self):
+        r = self._reconocer(side_effect=CuotaAgotada("luxand", 2.2))
+        self.assertEqual(r.status_code, 429)
+        self.assertEqual(r["Retry-After"], "3")
 
-# Create your tests here.
+    def test_agregar_foto_con_luxand_saturado(self):
+        url = f"/api/personas/{self.persona.pk}/agregar_foto/"
+        datos = {"image_url": "https://img.test/cara2.jpg"}
+        with mock.patch("administracion.views.add_face", side_effect=LuxandError("rate limit", 429, 30)):
+            r = self.cliente.post(url, datos, format="json")
+        self.assertEqual((r.status_code, r["Retry-After"]), (429, "30"))
+        with mock.patch("administracion.views.add_face", side_effect=CuotaAgotada("luxand", 0.4)):
+            r = self.cliente.post(url, datos, format="json")
+        self.assertEqual((r.status_code, r["Retry-After"]), (429, "1"))
+        with mock.patch("administracion.views.add_face", side_effect=LuxandError("no existe", 404)):
+            self.assertEqual(self.cliente.post(url, datos, format="json").status_code, 500)
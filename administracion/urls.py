@@ -2,7 +2,7 @@ from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
     LogoutView, UserViewSet, RolViewSet,
-    PersonaViewSet, CargoViewSet, EmpleadoViewSet, GroupAuxViewSet, PermissionViewSet, CustomTokenObtainPairView, CSRFTokenView
+    PersonaViewSet, ReconocimientoFacialView, CargoViewSet, EmpleadoViewSet, GroupAuxViewSet, PermissionViewSet, CustomTokenObtainPairView, CSRFTokenView
 )
 from rest_framework_simplejwt.views import (
     TokenRefreshView,
@@ -25,6 +25,8 @@ router.register(r'cargos', CargoViewSet, basename='cargos')
 router.register(r'empleados', EmpleadoViewSet, basename='empleados')
 
 urlpatterns = [
+    # Vista async (fuera del ViewSet); va antes del router para que no la tome personas/<pk>/
+    path('personas/reconocimiento_facial/', ReconocimientoFacialView.as_view(), name='personas-reconocimiento-facial'),
     path('', include(router.urls)),
     
     # Usa tu vista personalizada para el login
@@ -1,9 +1,13 @@
+import math
+
+from asgiref.sync import sync_to_async
 from rest_framework import status, viewsets, filters, generics
 from django.contrib.auth.models import User, Group, Permission
 from django.db.models import Q, Count, Avg, Sum
 from django.db.models import ProtectedError
 from django.utils import timezone
 from rest_framework.response import Response
+from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.views import APIView
 from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -17,9 +21,16 @@ from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
-import requests
 from django.conf import settings
-from core.luxand import add_person, add_face, recognize
+from core import http
+from core.luxand import add_person, add_face, recognize, LuxandError
+from core.asincrono import APIViewAsync
+from core.preproceso import apreparar
+from core.cuotas import CuotaAgotada
+from core.imagenes import ImagenAsincronaMixin
+from .enrolamiento import encolar_enrolamiento
+from seguridad_IA.identidades import resolver_uuid
+from seguridad_IA import reconocimiento
 
 
 # Create your views here.
@@ -69,11 +80,24 @@ class RolViewSet(viewsets.ModelViewSet):
 
 # ==================== VISTAS PARA GESTIONAR PERSONAS ====================
 
-class PersonaViewSet(viewsets.ModelViewSet):
+def _demasiadas_solicitudes(detalle, retry_after):
+    """429 con Retry-After: la cuota compartida o Luxand piden esperar (no es un error del servidor)."""
+    return Response({"detail": detalle}, status=429, headers={"Retry-After": str(retry_after)})
+
+
+def _error_luxand(r):
+    """Respuesta para un status de Luxand distinto de 200: su 429 se pasa al cliente, lo demás es 500."""
+    if r.status_code == 429:
+        return _demasiadas_solicitudes(f"Luxand no disponible: {r.text}", r.headers.get("Retry-After", "1"))
+    return Response({"detail": f"Error en Luxand: {r.text}"}, status=500)
+
+
+class PersonaViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar personas con subida de imágenes a ImgBB
     """
     queryset = Persona.objects.all()
+    parametros_imagen = {"enrolar_luxand": True}
     serializer_class = PersonaSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['nombre', 'apellido', 'CI', 'telefono']
@@ -102,57 +126,6 @@ class PersonaViewSet(viewsets.ModelViewSet):
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
     
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            try:
-                # Leer el archivo una sola vez y resetear el puntero
-                imagen_file.seek(0)
-                file_content = imagen_file.read()
-                imagen_file.seek(0)  # Resetear para que el serializer pueda leerlo
-                
-                # Subir imagen a ImgBB
-                url = "https://api.imgbb.com/1/upload"
-                payload = {"key": settings.IMGBB_API_KEY}
-                files = {"image": file_content}
-                
-                response = requests.post(url, payload, files=files)
-                
-                if response.status_code == 200:
-                    # Extraer URL de la imagen subida
-                    image_url = response.json()["data"]["url"]
-                    
-                    # Actualizar los datos de la request con la URL de la imagen
-                    data = request.data.copy()
-                    data["imagen"] = image_url
-                    # Remover el archivo de FILES para evitar problemas de serialización
-                    request._files = {}
-                    request._full_data = data
-                else:
-                    return Response(
-                        {"error": "Error al subir imagen a ImgBB"}, 
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-            except Exception as e:
-                return Response(
-                    {"error": f"Error al procesar imagen: {str(e)}"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
-    
     def perform_create(self, serializer):
         instance = serializer.save()
         self._enroll_luxand(instance)
@@ -162,27 +135,44 @@ class PersonaViewSet(viewsets.ModelViewSet):
         self._enroll_luxand(instance)
 
     def _enroll_luxand(self, persona: Persona):
-        # Solo si hay imagen (URL ImgBB) y aún no fue enrolada
-        if not persona.imagen or persona.luxand_uuid:
-            return
-        try:
-            full_name = f"{persona.nombre} {persona.apellido}".strip() or f"persona-{persona.pk}"
-            col = getattr(settings, "LUXAND_COLLECTION", "")
-            res = add_person(full_name, persona.imagen, col)
-            uuid = res.get("uuid")
-            if uuid:
-                persona.luxand_uuid = uuid
-                persona.save(update_fields=["luxand_uuid"])
-        except Exception as e:
-            # No rompemos el CRUD si falla Luxand (cuota/red/imagen inválida)
-            print(f"[Luxand] No se pudo enrolar Persona {persona.pk}: {e}")
+        # Se encola; si la imagen llega como archivo, se encola cuando el worker la suba
+        encolar_enrolamiento(persona)
 
-    @action(detail=False, methods=["post"])
-    def reconocimiento_facial(self, request):
+    @action(detail=True, methods=["post"])
+    def agregar_foto(self, request, pk=None):
         """
-        Reconocimiento facial que acepta tanto image_url como archivo de imagen.
-        COMPATIBLE CON WEB Y MÓVIL.
+        (Opcional) Sube fotos extra de la misma persona para mejorar precisión.
+        Body: { "image_url": "https://..." }
         """
+        persona = self.get_object()
+        if not persona.luxand_uuid:
+            return Response({"detail": "La Persona aún no está enrolada en Luxand."}, status=400)
+        image_url = request.data.get("image_url")
+        if not image_url:
+            return Response({"detail": "image_url es requerido"}, status=400)
+        try:
+            res = add_face(persona.luxand_uuid, image_url)
+            return Response({"ok": True, "raw": res})
+        except CuotaAgotada as e:
+            return _demasiadas_solicitudes(str(e), math.ceil(e.espera))
+        except LuxandError as e:
+            if e.status_code != 429:
+                return Response({"detail": f"Error al agregar foto: {e}"}, status=500)
+            return _demasiadas_solicitudes(f"Luxand no disponible: {e}", e.retry_after or 1)
+        except Exception as e:
+            return Response({"detail": f"Error al agregar foto: {e}"}, status=500)
+
+
+class ReconocimientoFacialView(APIViewAsync):
+    """
+    Reconocimiento facial que acepta tanto image_url como archivo de imagen.
+    COMPATIBLE CON WEB Y MÓVIL. Ruta: personas/reconocimiento_facial/
+    Con multiple=true responde una entrada por cada cara de la foto.
+    Async: las subidas a ImgBB y las búsquedas en Luxand no ocupan un hilo del worker.
+    """
+    parser_classes = (MultiPartParser, FormParser, JSONParser)
+
+    async def post(self, request, *args, **kwargs):
         image_url = request.data.get("image_url")
         image_file = request.FILES.get("image")
         
@@ -199,8 +189,15 @@ class PersonaViewSet(viewsets.ModelViewSet):
         gallery = getattr(settings, "LUXAND_COLLECTION", "")
         
         try:
+            # La misma imagen (bytes o URL) reenviada en segundos no vuelve a ImgBB ni a Luxand
+            clave = reconocimiento.clave_imagen(gallery, image_url=image_url, image_file=image_file)
+            res = reconocimiento.obtener(clave)
+            desde_cache = res is not None
+            if desde_cache:
+                print("DEBUG - Resultado de reconocimiento tomado de la cache")
+
             # CASO 1: Si viene image_url (WEB) - FUNCIONA EXACTAMENTE IGUAL QUE ANTES
-            if image_url and not image_file:
+            elif image_url and not image_file:
                 print("DEBUG - Modo WEB: Usando image_url directamente")
                 # Llamar a Luxand directamente con la URL
                 luxand_url = "https://api.luxand.cloud/photo/search/v2"
@@ -210,10 +207,10 @@ class PersonaViewSet(viewsets.ModelViewSet):
                     "gallery": gallery
                 }
                 
-                luxand_response = requests.post(luxand_url, headers=luxand_headers, data=luxand_data, timeout=30)
+                luxand_response = await http.apost("luxand", luxand_url, headers=luxand_headers, data=luxand_data)
                 
                 if luxand_response.status_code != 200:
-                    return Response({"detail": f"Error en Luxand: {luxand_response.text}"}, status=500)
+                    return _error_luxand(luxand_response)
                 
                 res = luxand_response.json()
             
@@ -223,9 +220,11 @@ class PersonaViewSet(viewsets.ModelViewSet):
                 # Subir imagen a ImgBB
                 url = "https://api.imgbb.com/1/upload"
                 payload = {"key": settings.IMGBB_API_KEY}
-                files = {"image": image_file}
+                # A ImgBB (y de ahí a Luxand) va la versión reducida y recomprimida
+                preparada, _ = await apreparar(image_file)
+                files = {"image": (preparada.name, preparada.read(), preparada.content_type)}
                 
-                response = requests.post(url, payload, files=files)
+                response = await http.apost("imgbb", url, data=payload, files=files)
                 print(f"DEBUG - ImgBB response status: {response.status_code}")
                 
                 if response.status_code == 200:
@@ -240,10 +239,10 @@ class PersonaViewSet(viewsets.ModelViewSet):
                         "gallery": gallery
                     }
                     
-                    luxand_response = requests.post(luxand_url, headers=luxand_headers, data=luxand_data, timeout=30)
+                    luxand_response = await http.apost("luxand", luxand_url, headers=luxand_headers, data=luxand_data)
                     
                     if luxand_response.status_code != 200:
-                        return Response({"detail": f"Error en Luxand: {luxand_response.text}"}, status=500)
+                        return _error_luxand(luxand_response)
                     
                     res = luxand_response.json()
                 else:
@@ -260,13 +259,16 @@ class PersonaViewSet(viewsets.ModelViewSet):
                     "gallery": gallery
                 }
                 
-                luxand_response = requests.post(luxand_url, headers=luxand_headers, data=luxand_data, timeout=30)
+                luxand_response = await http.apost("luxand", luxand_url, headers=luxand_headers, data=luxand_data)
                 
                 if luxand_response.status_code != 200:
-                    return Response({"detail": f"Error en Luxand: {luxand_response.text}"}, status=500)
+                    return _error_luxand(luxand_response)
                 
                 res = luxand_response.json()
             
+            if not desde_cache:
+                reconocimiento.guardar(clave, res)
+
             # PROCESAR RESPUESTA - MANEJAR TANTO LISTA COMO DICCIONARIO
             print(f"DEBUG - Tipo de respuesta: {type(res)}")
             print(f"DEBUG - Contenido de respuesta: {res}")
@@ -285,6 +287,16 @@ class PersonaViewSet(viewsets.ModelViewSet):
             
             if not candidates:
                 return Response({"ok": False, "reason": "sin_coincidencias", "raw": res})
+
+            # Modo multi-cara (multiple=true): todas las caras de la foto con una sola consulta de UUIDs
+            if str(request.data.get("multiple", "")).strip().lower() in ("1", "true", "si", "sí"):
+                caras = await sync_to_async(reconocimiento.resultado_por_cara)(candidates, umbral)
+                return Response({
+                    "ok": any(c["ok"] for c in caras),
+                    "caras": caras,
+                    "desde_cache": desde_cache,
+                    "raw": res
+                })
             
             best = candidates[0]
             uuid = best.get("uuid") or best.get("subject") or best.get("person_uuid")
@@ -302,9 +314,10 @@ class PersonaViewSet(viewsets.ModelViewSet):
             print(f"DEBUG - Threshold: {umbral}")
             
             persona = None
-            if uuid:
-                persona = Persona.objects.filter(luxand_uuid=uuid).first()
-                print(f"DEBUG - Persona found: {persona}")
+            identidad = await sync_to_async(resolver_uuid)(uuid)
+            if identidad and identidad["tipo"] == "persona":
+                persona = identidad
+                print(f"DEBUG - Persona found: {persona['nombre']}")
             
             # Lógica más permisiva: si la confianza es muy alta (>= 0.9), ser más flexible
             if sim >= 0.9:
@@ -320,36 +333,21 @@ class PersonaViewSet(viewsets.ModelViewSet):
             
             return Response({
                 "ok": ok,
-                "persona_id": persona.id if persona else None,
+                "persona_id": persona["id"] if persona else None,
                 "similaridad": round(float(sim), 4),
                 "uuid": uuid,
-                "nombre": persona.nombre_completo if persona else None,
-                "tipo": persona.tipo if persona else None,
+                "nombre": persona["nombre"] if persona else None,
+                "tipo": persona["categoria"] if persona else None,
+                "desde_cache": desde_cache,
                 "raw": res
             })
             
+        except CuotaAgotada as e:
+            return _demasiadas_solicitudes(str(e), math.ceil(e.espera))
         except Exception as e:
             print(f"DEBUG - Error general: {e}")
             return Response({"detail": f"Error en reconocimiento: {e}"}, status=500)
 
-    @action(detail=True, methods=["post"])
-    def agregar_foto(self, request, pk=None):
-        """
-        (Opcional) Sube fotos extra de la misma persona para mejorar precisión.
-        Body: { "image_url": "https://..." }
-        """
-        persona = self.get_object()
-        if not persona.luxand_uuid:
-            return Response({"detail": "La Persona aún no está enrolada en Luxand."}, status=400)
-        image_url = request.data.get("image_url")
-        if not image_url:
-            return Response({"detail": "image_url es requerido"}, status=400)
-        try:
-            res = add_face(persona.luxand_uuid, image_url)
-            return Response({"ok": True, "raw": res})
-        except Exception as e:
-            return Response({"detail": f"Error al agregar foto: {e}"}, status=500)
-
 
 # ==================== VISTAS PARA GESTIONAR EMPLEADOS ====================
 
@@ -365,11 +363,12 @@ class CargoViewSet(viewsets.ModelViewSet):
     ordering = ['nombre']
 
 
-class EmpleadoViewSet(viewsets.ModelViewSet):
+class EmpleadoViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestionar empleados con subida de imágenes a ImgBB
     """
     queryset = Empleado.objects.select_related('cargo').all()
+    parametros_imagen = {"enrolar_luxand": True}
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = [
         'nombre', 'apellido', 'CI', 'cargo__nombre'
@@ -422,56 +421,6 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
     
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            try:
-                # Leer el archivo una sola vez y resetear el puntero
-                imagen_file.seek(0)
-                file_content = imagen_file.read()
-                imagen_file.seek(0)  # Resetear para que el serializer pueda leerlo
-                
-                # Subir imagen a ImgBB
-                url = "https://api.imgbb.com/1/upload"
-                payload = {"key": settings.IMGBB_API_KEY}
-                files = {"image": file_content}
-                
-                response = requests.post(url, payload, files=files)
-                
-                if response.status_code == 200:
-                    # Extraer URL de la imagen subida
-                    image_url = response.json()["data"]["url"]
-                    
-                    # Actualizar los datos de la request con la URL de la imagen
-                    data = request.data.copy()
-                    data["imagen"] = image_url
-                    # Remover el archivo de FILES para evitar problemas de serialización
-                    request._files = {}
-                    request._full_data = data
-                else:
-                    return Response(
-                        {"error": "Error al subir imagen a ImgBB"}, 
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-            except Exception as e:
-                return Response(
-                    {"error": f"Error al procesar imagen: {str(e)}"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
     def perform_create(self, serializer):
         instance = serializer.save()
         self._enroll_luxand_empleado(instance)
@@ -481,21 +430,8 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         self._enroll_luxand_empleado(instance)
 
     def _enroll_luxand_empleado(self, empleado: Empleado):
-        # Solo si hay imagen (URL ImgBB) y aún no fue enrolado
-        if not empleado.imagen or empleado.luxand_uuid:
-            return
-        try:
-            full_name = f"{empleado.nombre} {empleado.apellido}".strip() or f"empleado-{empleado.pk}"
-            # Puedes usar la MISMA colección que Persona (p.ej. settings.LUXAND_COLLECTION)
-            # o una específica para empleados (p.ej. settings.LUXAND_COLLECTION_EMPLEADOS)
-            col = getattr(settings, "LUXAND_COLLECTION_EMPLEADOS", getattr(settings, "LUXAND_COLLECTION", ""))
-            res = add_person(full_name, empleado.imagen, col)
-            uuid = res.get("uuid")
-            if uuid:
-                empleado.luxand_uuid = uuid
-                empleado.save(update_fields=["luxand_uuid"])
-        except Exception as e:
-            print(f"[Luxand] No se pudo enrolar Empleado {empleado.pk}: {e}")
+        # Se encola; si la imagen llega como archivo, se encola cuando el worker la suba
+        encolar_enrolamiento(empleado)
     @action(detail=True, methods=["post"])
     def agregar_foto(self, request, pk=None):
         """
@@ -510,6 +446,12 @@ class EmpleadoViewSet(viewsets.ModelViewSet):
         try:
             res = add_face(empleado.luxand_uuid, image_url)
             return Response({"ok": True, "raw": res})
+        except CuotaAgotada as e:
+            return _demasiadas_solicitudes(str(e), math.ceil(e.espera))
+        except LuxandError as e:
+            if e.status_code != 429:
+                return Response({"detail": f"Error al agregar foto: {e}"}, status=500)
+            return _demasiadas_solicitudes(f"Luxand no disponible: {e}", e.retry_after or 1)
         except Exception as e:
             return Response({"detail": f"Error al agregar foto: {e}"}, status=500)
 
@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'condominioBACK.settings')
 
 application = get_asgi_application()
+
+# Después de get_asgi_application(): core importa modelos
+from core.asincrono import con_lifespan  # noqa: E402
+
+application = con_lifespan(application)
@@ -0,0 +1,19 @@
+# condominioBACK/gunicorn_asgi.py
+"""
+Perfil ASGI de gunicorn:
+    gunicorn condominioBACK.asgi:application -c python:condominioBACK.gunicorn_asgi
+
+Con workers uvicorn las vistas async (reconocimiento facial, ALPR, enrolamiento)
+esperan a Luxand/PlateRecognizer/ImgBB en el event loop, así un solo proceso
+atiende cientos de reconocimientos en curso; las vistas síncronas siguen
+funcionando (Django las corre en un hilo).
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+worker_class = "uvicorn_worker.UvicornWorker"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# Las llamadas a Luxand pueden tardar hasta LUXAND_TIMEOUT; el worker no debe morir antes
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
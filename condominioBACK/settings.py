@@ -53,7 +53,8 @@ INSTALLED_APPS = [
     'administracion',
     'finanzas',
     'residencial',
-    'seguridad_IA'
+    'seguridad_IA',
+    'core',
 ]
 
 MIDDLEWARE = [
@@ -148,8 +149,14 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.AllowAny",  # todo requiere auth por defecto
     ),
+    # Paginación por cursor sobre el `ordering` de cada ViewSet (ver core/pagination.py)
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
+    "PAGE_SIZE": config("API_PAGE_SIZE", default=50, cast=int),
 }
 
+# ?count=approx devuelve el estimado del planificador a partir de este número de filas
+PAGINATION_APPROX_COUNT_THRESHOLD = config("PAGINATION_APPROX_COUNT_THRESHOLD", default=10000, cast=int)
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
@@ -179,6 +186,52 @@ CORS_ALLOW_CREDENTIALS = False
 
 # Configuración de ImgBB API
 IMGBB_API_KEY = config('IMGBB_API_KEY', default='')
+IMGBB_TIMEOUT = config('IMGBB_TIMEOUT', default=30, cast=int)
+
+# Preprocesado antes de subir a ImgBB/Luxand/PlateRecognizer (core/preproceso.py):
+# lado máximo en píxeles, calidad de recompresión y formato (JPEG o WEBP)
+IMAGEN_LADO_MAXIMO = config('IMAGEN_LADO_MAXIMO', default=1600, cast=int)
+IMAGEN_CALIDAD = config('IMAGEN_CALIDAD', default=82, cast=int)
+IMAGEN_FORMATO = config('IMAGEN_FORMATO', default='JPEG')
+
+# Control de calidad local antes de Luxand/PlateRecognizer (core/calidad.py).
+# Por endpoint ("reconocimiento", "alpr") y por camera_id se pisan los umbrales por defecto, p.ej.
+# CALIDAD_IMAGEN = {"alpr": {"nitidez_minima": 60}}
+# CALIDAD_IMAGEN_CAMARAS = {"porton-norte": {"brillo_minimo": 15}, "lobby": {"activa": False}}
+CALIDAD_IMAGEN = {}
+CALIDAD_IMAGEN_CAMARAS = {}
+
+# Las imágenes subidas se hashean, validan (por sus primeros bytes) y limitan en tamaño
+# mientras llegan (core/subidas.py); el resto de archivos sigue con los handlers de Django
+IMAGEN_TAMANO_MAXIMO = config('IMAGEN_TAMANO_MAXIMO', default=10 * 1024 * 1024, cast=int)
+IMAGEN_CAMPOS_SUBIDA = ["imagen", "foto", "image", "image_file", "upload", "file"]
+FILE_UPLOAD_HANDLERS = [
+    "core.subidas.ImagenUploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
+# Backend de imágenes (core/almacenamiento.py): imgbb, cloudinary o local (MEDIA_ROOT).
+# Cada imagen se guarda con una variante mediana y una miniatura (lado en píxeles).
+ALMACENAMIENTO_IMAGENES = config('ALMACENAMIENTO_IMAGENES', default='imgbb')
+IMAGEN_LADO_MEDIANO = config('IMAGEN_LADO_MEDIANO', default=640, cast=int)
+IMAGEN_LADO_MINIATURA = config('IMAGEN_LADO_MINIATURA', default=160, cast=int)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# URL absoluta con la que se sirven los archivos locales (se guarda en los registros)
+ALMACENAMIENTO_URL_BASE = config('ALMACENAMIENTO_URL_BASE', default='http://localhost:8000' + MEDIA_URL)
+# Vigencia (segundos) de los parámetros firmados para subir directo (/api/imagenes/firma/)
+SUBIDA_DIRECTA_VIGENCIA = config('SUBIDA_DIRECTA_VIGENCIA', default=600, cast=int)
+
+# Cola de trabajos en segundo plano (python manage.py procesar_trabajos)
+TRABAJOS_MAX_INTENTOS = config('TRABAJOS_MAX_INTENTOS', default=5, cast=int)
+TRABAJOS_BACKOFF_BASE = config('TRABAJOS_BACKOFF_BASE', default=5, cast=int)
+TRABAJOS_BACKOFF_MAX = config('TRABAJOS_BACKOFF_MAX', default=600, cast=int)
+# Máximo de trabajos en curso a la vez por tipo (sumando todos los workers)
+TRABAJOS_CONCURRENCIA = {
+    'ENROLAMIENTO': config('LUXAND_ENROLAMIENTO_CONCURRENCIA', default=2, cast=int),
+    'ALPR': config('ALPR_CONCURRENCIA', default=4, cast=int),
+}
 PLATE_TOKEN = config("PLATE_TOKEN")
 PLATE_REGIONS = config("PLATE_REGIONS", default="bo")
 
@@ -198,4 +251,83 @@ FRONTEND_URL = config("FRONTEND_URL", default="http://127.0.0.1:5173")
 # Configuración de Luxand API
 LUXAND_TOKEN = config("LUXAND_TOKEN")
 LUXAND_COLLECTION = config("LUXAND_COLLECTION", "")
-LUXAND_COLLECTION_EMPLEADOS = config("LUXAND_COLLECTION_EMPLEADOS", "")
\ No newline at end of file
+LUXAND_COLLECTION_EMPLEADOS = config("LUXAND_COLLECTION_EMPLEADOS", "")
+
+# Cliente HTTP compartido (core/http.py): un pool keep-alive por proveedor y por worker.
+# timeout = (conexión, lectura); reintentos_estado son los códigos que se reintentan.
+# cuota = token bucket compartido por todos los workers (llamadas por segundo, ráfaga
+# y segundos máximos que una petición espera su turno antes de responder 429).
+PROVEEDORES_HTTP = {
+    "luxand": {
+        "timeout": (5, config("LUXAND_TIMEOUT", default=30, cast=int)),
+        "reintentos_conexion": 2,
+        "reintentos_estado": [],
+        "cuota": {
+            "por_segundo": config("LUXAND_CUOTA_POR_SEGUNDO", default=2, cast=float),
+            "rafaga": config("LUXAND_CUOTA_RAFAGA", default=4, cast=int),
+            "espera_maxima": config("LUXAND_CUOTA_ESPERA", default=5, cast=float),
+        },
+    },
+    "platerecognizer": {
+        "timeout": (5, config("PLATE_TIMEOUT", default=20, cast=int)),
+        "reintentos_conexion": 2,
+        "reintentos_estado": [502, 503, 504],
+        "cuota": {
+            "por_segundo": config("PLATE_CUOTA_POR_SEGUNDO", default=1, cast=float),
+            "rafaga": config("PLATE_CUOTA_RAFAGA", default=2, cast=int),
+            "espera_maxima": config("PLATE_CUOTA_ESPERA", default=3, cast=float),
+        },
+    },
+    "imgbb": {
+        "timeout": (5, IMGBB_TIMEOUT),
+        "reintentos_conexion": 2,
+        "reintentos_estado": [502, 503, 504],
+    },
+}
+# Caches en memoria por worker (core/cache_local.py); el TTL acota cuánto tarda
+# un worker en ver lo que cambió otro.
+# Las señales que invalidan identidades y reconocimientos solo limpian la cache del
+# proceso donde se guardó el cambio (p. ej. procesar_trabajos al enrolar en Luxand):
+# en los demás workers un enrolamiento, una baja o un cambio de luxand_uuid tarda
+# hasta IDENTIDADES_CACHE_TTL en verse (y hasta RECONOCIMIENTO_CACHE_TTL para la
+# misma imagen). Es el retraso máximo con que la puerta reconoce o deja de reconocer.
+IDENTIDADES_CACHE_TTL = config('IDENTIDADES_CACHE_TTL', default=60, cast=int)
+# Resultados de /photo/search/v2 para la misma imagen (bytes o URL)
+RECONOCIMIENTO_CACHE_TTL = config('RECONOCIMIENTO_CACHE_TTL', default=15, cast=int)
+RECONOCIMIENTO_CACHE_MAX = config('RECONOCIMIENTO_CACHE_MAX', default=500, cast=int)
+# Peticiones idénticas simultáneas (reconocimiento/ALPR) comparten una sola llamada (core/coalescencia.py):
+# segundos que se espera al líder y segundos que su resultado sigue disponible para reintentos
+COALESCENCIA_ESPERA = config('COALESCENCIA_ESPERA', default=30, cast=int)
+COALESCENCIA_RETENCION = config('COALESCENCIA_RETENCION', default=5, cast=int)
+# Mapa placa normalizada -> vehículo que usa el ALPR
+PLACAS_CACHE_TTL = config('PLACAS_CACHE_TTL', default=60, cast=int)
+# Match aproximado de placas (errores de OCR): ediciones máximas, confianza mínima para aceptar
+# y ventaja mínima sobre la segunda coincidencia (solo se aceptan confusiones 0/O, 1/I, 8/B...)
+PLACAS_FUZZY_MAX_DISTANCIA = config('PLACAS_FUZZY_MAX_DISTANCIA', default=2, cast=int)
+PLACAS_FUZZY_CONFIANZA_MIN = config('PLACAS_FUZZY_CONFIANZA_MIN', default=0.6, cast=float)
+PLACAS_FUZZY_MARGEN = config('PLACAS_FUZZY_MARGEN', default=0.1, cast=float)
+# Decisiones de acceso precalculadas por placa y por UUID (seguridad_IA/accesos.py): cada
+# worker las cachea hasta ACCESOS_CACHE_TTL, pero consulta la versión de la tabla cada
+# ACCESOS_VERSION_SEGUNDOS y descarta lo leído antes de un cambio hecho en otro worker
+ACCESOS_CACHE_TTL = config('ACCESOS_CACHE_TTL', default=60, cast=int)
+ACCESOS_VERSION_SEGUNDOS = config('ACCESOS_VERSION_SEGUNDOS', default=1, cast=int)
+# Sesiones de lectura por cámara (seguridad_IA/lecturas.py)
+ALPR_SESION_SEGUNDOS = config('ALPR_SESION_SEGUNDOS', default=8, cast=int)
+ALPR_ESPERA_CONFIRMADA = config('ALPR_ESPERA_CONFIRMADA', default=10, cast=int)
+ALPR_SESION_MAX_LECTURAS = config('ALPR_SESION_MAX_LECTURAS', default=20, cast=int)
+# Filtro de cambio de escena en /api/alpr/ (seguridad_IA/movimiento.py): fracción de píxeles
+# que deben cambiar, diferencia mínima por píxel y segundos tras los que vence la referencia.
+# ALPR_MOVIMIENTO_CAMARAS pisa umbral/pixel/activo por camera_id
+ALPR_MOVIMIENTO = config('ALPR_MOVIMIENTO', default=True, cast=bool)
+ALPR_MOVIMIENTO_UMBRAL = config('ALPR_MOVIMIENTO_UMBRAL', default=0.02, cast=float)
+ALPR_MOVIMIENTO_PIXEL = config('ALPR_MOVIMIENTO_PIXEL', default=25, cast=int)
+ALPR_MOVIMIENTO_REFRESCO = config('ALPR_MOVIMIENTO_REFRESCO', default=300, cast=int)
+ALPR_MOVIMIENTO_CAMARAS = {}
+# Retención de lectura_placa (python manage.py particiones_lecturas)
+LECTURAS_RETENCION_MESES = config('LECTURAS_RETENCION_MESES', default=12, cast=int)
+LECTURAS_ARCHIVO_DIR = config('LECTURAS_ARCHIVO_DIR', default='')
+# Ingesta ALPR en cola (POST /api/alpr/cola/): frames pendientes por cámara y en total,
+# y segundos tras los que un frame ya no se procesa
+ALPR_COLA_POR_CAMARA = config('ALPR_COLA_POR_CAMARA', default=3, cast=int)
+ALPR_COLA_MAXIMA = config('ALPR_COLA_MAXIMA', default=200, cast=int)
+ALPR_COLA_EDAD_MAXIMA = config('ALPR_COLA_EDAD_MAXIMA', default=30, cast=int)
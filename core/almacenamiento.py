@@ -0,0 +1,291 @@
+# core/almacenamiento.py
+"""
+Dónde se guardan las imágenes de personas, empleados, mascotas, vehículos y unidades.
+settings.ALMACENAMIENTO_IMAGENES elige el backend:
+  - "local":      disco (MEDIA_ROOT), sin red; para desarrollo y pruebas
+  - "imgbb":      ImgBB (lo de siempre)
+  - "cloudinary": Cloudinary (ya configurado en settings)
+Todos devuelven las URLs de la imagen y de sus variantes mediana y miniatura.
+
+Subida directa: cloudinary y local firman parámetros de subida de corta vida para
+que el cliente suba la imagen sin pasar por la API; al crear el registro manda solo
+la URL y la firma que le devolvió el almacenamiento, y el ViewSet la verifica.
+Cada firma se usa una sola vez (firma_usada); en local además va atada al usuario.
+"""
+import hashlib
+import os
+import re
+import secrets
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import imgbb
+from .models import FirmaUsada
+from .preproceso import preparar
+from .subidas import tipo_imagen
+
+LADO_MEDIANO = getattr(settings, "IMAGEN_LADO_MEDIANO", 640)
+LADO_MINIATURA = getattr(settings, "IMAGEN_LADO_MINIATURA", 160)
+
+# Segundos que valen los parámetros firmados (y la firma devuelta tras subir)
+VIGENCIA_SUBIDA = getattr(settings, "SUBIDA_DIRECTA_VIGENCIA", 600)
+
+_EXTENSIONES = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/gif": "gif"}
+
+
+def consumir_firma(nonce):
+    """
+    Marca la firma `nonce` como usada. False si ya se había usado. Dentro de una
+    transacción que luego se revierte, la firma queda libre otra vez.
+    """
+    ahora = timezone.now()
+    FirmaUsada.objects.filter(expira_en__lt=ahora).delete()
+    try:
+        with transaction.atomic():
+            # Pasada la vigencia la firma ya no verifica: no hace falta recordarla más
+            FirmaUsada.objects.create(nonce=nonce, expira_en=ahora + timedelta(seconds=VIGENCIA_SUBIDA))
+    except IntegrityError:
+        return False
+    return True
+
+
+def _usuario_id(usuario):
+    return usuario.pk if usuario is not None and usuario.is_authenticated else None
+
+
+class Almacenamiento:
+    """Interfaz común de los backends."""
+
+    def guardar_imagen(self, contenido: bytes, nombre: str = "") -> dict:
+        """Guarda la imagen y devuelve {"original", "mediana", "miniatura"} (URLs públicas)."""
+        raise NotImplementedError
+
+    def ruta_local(self, url):
+        """Ruta en disco de una URL de este backend, si la hay (solo el local)."""
+        return None
+
+    def firmar_subida(self, request):
+        """
+        {"url", "campos", "expira_en"} para subir directo: POST multipart a `url` con
+        `campos` y el archivo en `file`. None si el backend no lo admite.
+        """
+        return None
+
+    def verificar_subida(self, url, firma, usuario=None):
+        """
+        URLs {"original", "mediana", "miniatura"} si `firma` corresponde a `url` (y a
+        `usuario`, si el backend lo registra) y no se usó antes; si no, None. La firma
+        queda usada.
+        """
+        return None
+
+    def es_propia(self, url):
+        """True si la URL apunta a este almacenamiento (entonces solo se acepta con firma)."""
+        return False
+
+
+class AlmacenamientoLocal(Almacenamiento):
+    """
+    Rutas por contenido: imagenes/ab/<sha256>[_variante].<ext>. La misma imagen
+    subida dos veces ocupa un solo archivo y las variantes no se regeneran.
+    """
+
+    def __init__(self, raiz=None, url_base=None):
+        self.raiz = str(raiz or settings.MEDIA_ROOT)
+        self.url_base = (url_base or settings.ALMACENAMIENTO_URL_BASE).rstrip("/") + "/"
+
+    def _guardar(self, ruta, contenido):
+        destino = os.path.join(self.raiz, ruta)
+        if not os.path.exists(destino):
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            # Escritura atómica: nunca queda a la vista un archivo a medio escribir
+            fd, temporal = tempfile.mkstemp(dir=os.path.dirname(destino))
+            with os.fdopen(fd, "wb") as f:
+                f.write(contenido)
+            os.replace(temporal, destino)
+        return self.url_base + ruta
+
+    def guardar_imagen(self, contenido, nombre=""):
+        sha = hashlib.sha256(contenido).hexdigest()
+        base = f"imagenes/{sha[:2]}/{sha}"
+        extension = _EXTENSIONES.get(tipo_imagen(contenido[:12]), "jpg")
+        urls = {"original": self._guardar(f"{base}.{extension}", contenido)}
+        for variante, lado in (("mediana", LADO_MEDIANO), ("miniatura", LADO_MINIATURA)):
+            reducida, info = preparar(contenido, nombre, lado_maximo=lado)
+            if info["formato"] is None or info["dimensiones_final"] == info["dimensiones_original"]:
+                urls[variante] = urls["original"]  # ya era más chica que la variante
+            else:
+                urls[variante] = self._guardar(f"{base}_{variante}.{reducida.name.rsplit('.', 1)[-1]}", reducida.read())
+        return urls
+
+    def ruta_local(self, url):
+        if not url or not url.startswith(self.url_base):
+            return None
+        ruta = os.path.join(self.raiz, url[len(self.url_base):])
+        return ruta if os.path.exists(ruta) else None
+
+    # Sustituto local de Cloudinary para desarrollo y pruebas: el "servicio" es
+    # SubidaLocalView (core/views.py) y las firmas son de django.core.signing.
+    SAL_TOKEN = "almacenamiento.subida"
+    SAL_FIRMA = "almacenamiento.resultado"
+
+    def firmar_subida(self, request):
+        from django.urls import reverse
+
+        token = {"u": _usuario_id(request.user), "n": secrets.token_urlsafe(16)}
+        return {
+            "url": request.build_absolute_uri(reverse("subida-local")),
+            "campos": {"token": signing.dumps(token, salt=self.SAL_TOKEN)},
+            "expira_en": int(time.time()) + VIGENCIA_SUBIDA,
+        }
+
+    def usar_token(self, token):
+        """Datos del token de subida ({"u", "n"}) si es válido y no se usó; lo marca usado."""
+        try:
+            datos = signing.loads(token, salt=self.SAL_TOKEN, max_age=VIGENCIA_SUBIDA)
+        except signing.BadSignature:
+            return None
+        if not isinstance(datos, dict) or "n" not in datos or not consumir_firma(f"local-token:{datos['n']}"):
+            return None
+        return datos
+
+    def firmar_resultado(self, urls, token):
+        """Lo que devuelve SubidaLocalView: como la `signature` de la respuesta de Cloudinary."""
+        return signing.dumps({"urls": urls, "u": token["u"], "n": token["n"]}, salt=self.SAL_FIRMA)
+
+    def verificar_subida(self, url, firma, usuario=None):
+        try:
+            datos = signing.loads(firma, salt=self.SAL_FIRMA, max_age=VIGENCIA_SUBIDA)
+        except signing.BadSignature:
+            return None
+        if not isinstance(datos, dict) or (datos.get("urls") or {}).get("original") != url:
+            return None
+        if datos.get("u") != _usuario_id(usuario) or not consumir_firma(f"local-firma:{datos['n']}"):
+            return None
+        return datos["urls"]
+
+    def es_propia(self, url):
+        return url.startswith(self.url_base)
+
+
+class AlmacenamientoImgBB(Almacenamiento):
+    """ImgBB genera sus propias variantes (medium/thumb) al subir."""
+
+    def guardar_imagen(self, contenido, nombre=""):
+        data = imgbb.subir(contenido, nombre)
+        return {
+            "original": data["url"],
+            "mediana": (data.get("medium") or {}).get("url") or data["url"],
+            "miniatura": (data.get("thumb") or {}).get("url") or data["url"],
+        }
+
+
+class AlmacenamientoCloudinary(Almacenamiento):
+    """
+    public_id por contenido (imagenes/<sha256>); las variantes son transformaciones
+    en la URL que Cloudinary genera y cachea en su CDN.
+    """
+
+    def guardar_imagen(self, contenido, nombre=""):
+        import cloudinary
+        import cloudinary.uploader
+
+        public_id = f"imagenes/{hashlib.sha256(contenido).hexdigest()}"
+        resultado = cloudinary.uploader.upload(
+            BytesIO(contenido), public_id=public_id, overwrite=False, resource_type="image")
+        return self._urls(resultado["secure_url"], public_id)
+
+    def _urls(self, original, public_id):
+        import cloudinary
+
+        urls = {"original": original}
+        for variante, lado in (("mediana", LADO_MEDIANO), ("miniatura", LADO_MINIATURA)):
+            urls[variante] = cloudinary.CloudinaryImage(public_id).build_url(
+                width=lado, height=lado, crop="limit", quality="auto", fetch_format="auto", secure=True)
+        return urls
+
+    # https://res.cloudinary.com/<cloud>/image/upload/[transformaciones/]v<version>/<public_id>.<ext>
+    _URL = re.compile(r"^https://res\.cloudinary\.com/(?P<cloud>[^/]+)/image/upload/(?:.+/)?"
+                      r"v(?P<version>\d+)/(?P<public_id>.+?)(?:\.\w+)?$")
+
+    def firmar_subida(self, request):
+        import cloudinary
+        import cloudinary.utils
+
+        config = cloudinary.config()
+        if not config.api_secret:
+            print("[Almacenamiento] Cloudinary sin api_secret: no se pueden firmar subidas directas")
+            return None
+        campos = {
+            "timestamp": int(time.time()),
+            "folder": "imagenes",
+            "allowed_formats": "jpg,jpeg,png,webp,heic",
+        }
+        campos["signature"] = cloudinary.utils.api_sign_request(campos, config.api_secret)
+        campos["api_key"] = config.api_key
+        return {
+            "url": f"https://api.cloudinary.com/v1_1/{config.cloud_name}/image/upload",
+            "campos": campos,
+            "expira_en": campos["timestamp"] + VIGENCIA_SUBIDA,
+        }
+
+    def verificar_subida(self, url, firma, usuario=None):
+        import cloudinary
+        import cloudinary.utils
+
+        config = cloudinary.config()
+        if not config.api_secret:
+            # verify_api_response_signature lanzaría una Exception genérica (un 500)
+            print("[Almacenamiento] Cloudinary sin api_secret: no se pueden verificar subidas directas")
+            return None
+        m = self._URL.match(url)
+        if not m or m["cloud"] != config.cloud_name:
+            return None
+        # `signature` de la respuesta de Cloudinary: firma public_id y version con el api_secret
+        if not cloudinary.utils.verify_api_response_signature(m["public_id"], m["version"], firma):
+            return None
+        if time.time() - int(m["version"]) > VIGENCIA_SUBIDA:
+            return None
+        if not consumir_firma(f"cloudinary:{m['public_id']}:{m['version']}"):
+            return None
+        return self._urls(url, m["public_id"])
+
+    def es_propia(self, url):
+        import cloudinary
+
+        return url.startswith(f"https://res.cloudinary.com/{cloudinary.config().cloud_name}/")
+
+
+BACKENDS = {
+    "local": AlmacenamientoLocal,
+    "imgbb": AlmacenamientoImgBB,
+    "cloudinary": AlmacenamientoCloudinary,
+}
+_backend = None
+
+
+def almacenamiento() -> Almacenamiento:
+    """Backend configurado en settings.ALMACENAMIENTO_IMAGENES (una instancia por proceso)."""
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[getattr(settings, "ALMACENAMIENTO_IMAGENES", "imgbb")]()
+    return _backend
+
+
+def guardar_imagen(contenido, nombre=""):
+    return almacenamiento().guardar_imagen(contenido, nombre)
+
+
+def ruta_local(url):
+    return almacenamiento().ruta_local(url)
+
+
+def verificar_subida(url, firma, usuario=None):
+    return almacenamiento().verificar_subida(url, firma, usuario)
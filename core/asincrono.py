@@ -0,0 +1,60 @@
+# core/asincrono.py
+import inspect
+
+from asgiref.sync import sync_to_async
+from rest_framework.views import APIView
+
+from . import http
+
+
+class APIViewAsync(APIView):
+    """
+    APIView con handlers `async def` para servir bajo ASGI (ver condominioBACK/gunicorn_asgi.py).
+    Autenticación, permisos y throttling siguen siendo los de DRF (síncronos, con ORM):
+    se corren en un hilo y el handler se espera en el event loop, así una llamada lenta
+    a Luxand/PlateRecognizer no retiene un hilo del worker.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+def con_lifespan(aplicacion):
+    """
+    Envuelve la aplicación ASGI de Django, que no atiende `lifespan`: al arrancar el
+    worker su event loop se registra como de larga vida (core/http.py reutiliza ahí
+    los clientes httpx) y al apagarse se cierran esos clientes.
+    """
+    async def app(scope, receive, send):
+        if scope["type"] != "lifespan":
+            return await aplicacion(scope, receive, send)
+        while True:
+            mensaje = await receive()
+            if mensaje["type"] == "lifespan.startup":
+                http.registrar_loop()
+                await send({"type": "lifespan.startup.complete"})
+            elif mensaje["type"] == "lifespan.shutdown":
+                await http.cerrar_clientes()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    return app
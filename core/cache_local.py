@@ -0,0 +1,54 @@
+# core/cache_local.py
+import threading
+import time
+from collections import OrderedDict
+
+_FALTA = object()
+
+
+class CacheLocal:
+    """
+    Cache en memoria del proceso (cada worker de gunicorn tiene la suya),
+    con expiración por TTL y desalojo LRU al superar `max_items`.
+    El TTL acota cuánto puede tardar un worker en ver un cambio hecho en otro.
+    """
+    def __init__(self, ttl=60, max_items=10000):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def get(self, clave, default=None):
+        with self._lock:
+            item = self._datos.get(clave, _FALTA)
+            if item is _FALTA or item[0] < time.monotonic():
+                if item is not _FALTA:
+                    del self._datos[clave]
+                self.fallos += 1
+                return default
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return item[1]
+
+    def __contains__(self, clave):
+        return self.get(clave, _FALTA) is not _FALTA
+
+    def set(self, clave, valor, ttl=None):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + (self.ttl if ttl is None else ttl), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_items:
+                self._datos.popitem(last=False)
+
+    def invalidar(self, clave=_FALTA):
+        """Borra una clave, o todo si no se indica ninguna."""
+        with self._lock:
+            if clave is _FALTA:
+                self._datos.clear()
+            else:
+                self._datos.pop(clave, None)
+
+    def estadisticas(self):
+        return {"items": len(self._datos), "aciertos": self.aciertos, "fallos": self.fallos}
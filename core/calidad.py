@@ -0,0 +1,142 @@
+# core/calidad.py
+"""
+Control de calidad local antes de llamar a Luxand o PlateRecognizer: un frame
+borroso, oscuro, quemado o diminuto se rechaza en unos milisegundos con el motivo,
+en vez de pagar una llamada de varios segundos que responde "Can't find faces".
+
+Métricas (sobre la imagen en grises, reducida a ANALISIS px de lado):
+  - nitidez:  varianza del laplaciano
+  - brillo:   media del histograma y fracción de píxeles recortados (negro/blanco)
+  - resolución y relación de aspecto del original
+Umbrales: DEFECTOS <- settings.CALIDAD_IMAGEN[endpoint] <- settings.CALIDAD_IMAGEN_CAMARAS[camera_id]
+"""
+import os
+import time
+from io import BytesIO
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
+
+# Lado al que se reduce la imagen para medir (decodificación "draft" en JPEG: muy rápida)
+ANALISIS = 512
+
+DEFECTOS = {
+    "reconocimiento": {
+        "activa": True,
+        "lado_minimo": 160,        # px del lado más corto
+        "relacion_maxima": 3.0,    # lado largo / lado corto
+        "brillo_minimo": 40,       # media 0-255
+        "brillo_maximo": 215,
+        "recorte_maximo": 0.45,    # fracción de píxeles en negro o blanco puro
+        "nitidez_minima": 25.0,    # varianza del laplaciano
+    },
+    "alpr": {
+        "activa": True,
+        "lado_minimo": 240,
+        "relacion_maxima": 4.0,
+        "brillo_minimo": 30,
+        "brillo_maximo": 225,
+        "recorte_maximo": 0.55,
+        "nitidez_minima": 40.0,
+    },
+}
+
+MOTIVOS = {
+    "resolucion_baja": "La imagen es demasiado pequeña; acerque la cámara o use más resolución.",
+    "relacion_aspecto": "La imagen tiene una proporción inusual; envíe el cuadro completo sin recortar.",
+    "muy_oscura": "La imagen está muy oscura; mejore la iluminación o active el modo nocturno.",
+    "sobreexpuesta": "La imagen está sobreexpuesta; evite contraluces o baje la exposición.",
+    "borrosa": "La imagen está borrosa; mantenga la cámara quieta y enfocada.",
+}
+
+
+def umbrales(endpoint, camera_id=""):
+    """Umbrales efectivos para un endpoint ("reconocimiento" o "alpr") y una cámara."""
+    efectivos = dict(DEFECTOS.get(endpoint, {}))
+    efectivos.update(getattr(settings, "CALIDAD_IMAGEN", {}).get(endpoint, {}))
+    if camera_id:
+        efectivos.update(getattr(settings, "CALIDAD_IMAGEN_CAMARAS", {}).get(camera_id, {}))
+    return efectivos
+
+
+def metricas(archivo):
+    """Métricas de `archivo` (bytes o archivo con seek/read), o None si Pillow no lo abre."""
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        fuente = BytesIO(bytes(archivo))
+    else:
+        fuente = archivo
+        fuente.seek(0)
+    try:
+        with Image.open(fuente) as img:
+            ancho, alto = img.size
+            img.draft("L", (ANALISIS, ANALISIS))
+            gris = img.convert("L")
+            gris.thumbnail((ANALISIS, ANALISIS))
+            histograma = gris.histogram()
+            g = np.asarray(gris, dtype=np.float32)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        if fuente is archivo:
+            archivo.seek(0)
+
+    total = float(sum(histograma)) or 1.0
+    brillo = sum(i * n for i, n in enumerate(histograma)) / total
+    recorte = (sum(histograma[:8]) + sum(histograma[248:])) / total
+    if g.shape[0] >= 3 and g.shape[1] >= 3:
+        laplaciano = g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:] - 4 * g[1:-1, 1:-1]
+        nitidez = float(laplaciano.var())
+    else:
+        nitidez = 0.0
+    return {
+        "ancho": ancho,
+        "alto": alto,
+        "relacion": round(max(ancho, alto) / max(min(ancho, alto), 1), 2),
+        "brillo": round(brillo, 1),
+        "recorte": round(recorte, 3),
+        "nitidez": round(nitidez, 1),
+    }
+
+
+def evaluar(archivo, endpoint, camera_id=""):
+    """
+    {"ok", "motivo", "detalle", "metricas", "ms"}. Si el control está desactivado
+    o la imagen no se puede abrir, ok=True: que decida el proveedor.
+    """
+    inicio = time.perf_counter()
+    u = umbrales(endpoint, camera_id)
+    resultado = {"ok": True, "motivo": None, "detalle": None, "metricas": None}
+    if u.get("activa", True):
+        m = metricas(archivo)
+        resultado["metricas"] = m
+        motivo = _motivo(m, u) if m else None
+        if motivo:
+            resultado.update(ok=False, motivo=motivo, detalle=MOTIVOS[motivo])
+    resultado["ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+    if not resultado["ok"]:
+        nombre = os.path.basename(getattr(archivo, "name", "") or "")
+        print(f"[Calidad] {endpoint} {camera_id or '-'} {nombre}: rechazada ({resultado['motivo']}) "
+              f"{resultado['metricas']} en {resultado['ms']} ms")
+    return resultado
+
+
+def _motivo(m, u):
+    # Orden: lo que no se arregla recortando/reintentando primero
+    if min(m["ancho"], m["alto"]) < u["lado_minimo"]:
+        return "resolucion_baja"
+    if m["relacion"] > u["relacion_maxima"]:
+        return "relacion_aspecto"
+    if m["brillo"] < u["brillo_minimo"] or (m["recorte"] > u["recorte_maximo"] and m["brillo"] < 128):
+        return "muy_oscura"
+    if m["brillo"] > u["brillo_maximo"] or m["recorte"] > u["recorte_maximo"]:
+        return "sobreexpuesta"
+    if m["nitidez"] < u["nitidez_minima"]:
+        return "borrosa"
+    return None
+
+
+async def aevaluar(archivo, endpoint, camera_id=""):
+    """evaluar() desde una vista async, en un hilo aparte."""
+    return await sync_to_async(evaluar, thread_sensitive=False)(archivo, endpoint, camera_id)
@@ -0,0 +1,104 @@
+# core/coalescencia.py
+"""
+Single-flight para llamadas externas pagas (Luxand, PlateRecognizer): si llegan
+varias peticiones idénticas a la vez (p.ej. una tablet que reintenta con mala red),
+solo la primera (el líder) llama al proveedor y las demás esperan su resultado.
+
+- En el mismo proceso los seguidores esperan un Future del event loop.
+- Entre workers, el líder registra la clave en solicitud_en_curso y deja ahí el
+  resultado (JSON) unos segundos; los seguidores de otros procesos lo consultan.
+Si el líder falla o se cae, los seguidores de otros workers hacen su propia llamada;
+si se cancela (su cliente se desconectó), los seguidores del mismo proceso también.
+"""
+import asyncio
+import hashlib
+import weakref
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.utils import timezone
+
+from .models import SolicitudEnCurso
+
+# Segundos que un seguidor espera al líder (y que vive una clave EN_CURSO sin terminar)
+ESPERA = getattr(settings, "COALESCENCIA_ESPERA", 30)
+# Segundos que queda disponible un resultado terminado para los reintentos que llegan tarde
+RETENCION = getattr(settings, "COALESCENCIA_RETENCION", 5)
+INTERVALO = 0.1
+
+_SIN_RESULTADO = object()
+# event loop -> {clave: Future del líder}. Con uvicorn hay un solo loop por worker; bajo
+# WSGI/runserver cada petición tiene el suyo (se libera con el loop) y las peticiones
+# simultáneas del mismo proceso se coalescen por solicitud_en_curso, como entre workers
+_en_vuelo = weakref.WeakKeyDictionary()
+
+
+async def una_vez(clave, funcion):
+    """
+    Ejecuta `await funcion()` una sola vez para todas las peticiones concurrentes
+    con la misma `clave`. El resultado debe ser serializable a JSON.
+    """
+    if len(clave) > 200:
+        clave = hashlib.sha256(clave.encode()).hexdigest()
+    loop = asyncio.get_running_loop()
+    locales = _en_vuelo.setdefault(loop, {})
+    if clave in locales:
+        resultado = await asyncio.shield(locales[clave])
+        if resultado is not _SIN_RESULTADO:
+            return resultado
+        # El líder se canceló: sus seguidores siguen conectados y eligen otro líder
+        return await una_vez(clave, funcion)
+
+    futuro = loop.create_future()
+    locales[clave] = futuro
+    try:
+        resultado = await _entre_workers(clave, funcion)
+    except asyncio.CancelledError:
+        futuro.set_result(_SIN_RESULTADO)
+        raise
+    except Exception as e:
+        futuro.set_exception(e)
+        futuro.exception()  # marcado como leído aunque no haya seguidores
+        raise
+    else:
+        futuro.set_result(resultado)
+        return resultado
+    finally:
+        locales.pop(clave, None)
+
+
+async def _entre_workers(clave, funcion):
+    ahora = timezone.now()
+    # Limpia lo vencido (resultados viejos y líderes caídos) antes de intentar ser líder
+    await SolicitudEnCurso.objects.filter(expira_en__lt=ahora).adelete()
+    try:
+        await SolicitudEnCurso.objects.acreate(clave=clave, expira_en=ahora + timedelta(seconds=ESPERA))
+    except IntegrityError:
+        resultado = await _esperar(clave)
+        if resultado is not _SIN_RESULTADO:
+            return resultado
+        return await funcion()
+
+    try:
+        resultado = await funcion()
+    except BaseException:
+        await SolicitudEnCurso.objects.filter(clave=clave).adelete()
+        raise
+    await SolicitudEnCurso.objects.filter(clave=clave).aupdate(
+        estado='LISTO', resultado=resultado, expira_en=timezone.now() + timedelta(seconds=RETENCION),
+    )
+    return resultado
+
+
+async def _esperar(clave):
+    """Resultado del líder de otro worker, o _SIN_RESULTADO si falló o tardó demasiado."""
+    limite = asyncio.get_running_loop().time() + ESPERA
+    while asyncio.get_running_loop().time() < limite:
+        fila = await SolicitudEnCurso.objects.filter(clave=clave).values("estado", "resultado").afirst()
+        if fila is None:
+            return _SIN_RESULTADO
+        if fila["estado"] == 'LISTO':
+            return fila["resultado"]
+        await asyncio.sleep(INTERVALO)
+    return _SIN_RESULTADO
@@ -0,0 +1,83 @@
+# core/cuotas.py
+import asyncio
+import time
+
+import requests
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import CuotaProveedor
+
+
+class CuotaAgotada(requests.RequestException):
+    """
+    No hay turno dentro de la espera máxima. `espera` son los segundos que faltan;
+    sirve como Retry-After o como `reintentar_en` de la cola de trabajos.
+    """
+    def __init__(self, proveedor, espera):
+        super().__init__(f"Cuota de {proveedor} agotada; siguiente turno en {espera:.1f}s")
+        self.proveedor = proveedor
+        self.espera = espera
+
+
+def _fila(proveedor, rafaga):
+    """Fila del bucket bloqueada (SELECT ... FOR UPDATE); se crea llena la primera vez."""
+    try:
+        return CuotaProveedor.objects.select_for_update().get(proveedor=proveedor)
+    except CuotaProveedor.DoesNotExist:
+        try:
+            with transaction.atomic():
+                CuotaProveedor.objects.create(proveedor=proveedor, tokens=rafaga)
+        except IntegrityError:
+            pass  # la creó otro proceso
+        return CuotaProveedor.objects.select_for_update().get(proveedor=proveedor)
+
+
+def reservar(proveedor, por_segundo, rafaga, espera_maxima):
+    """
+    Reserva un turno en el bucket del proveedor y devuelve cuántos segundos hay que
+    esperar para usarlo (0 si hay tokens). Una sola transacción corta por llamada:
+    el bucket se recarga a `por_segundo`, tope `rafaga`, y la espera se hace fuera.
+    """
+    with transaction.atomic():
+        fila = _fila(proveedor, rafaga)
+        ahora = timezone.now()
+        transcurrido = max((ahora - fila.actualizado).total_seconds(), 0.0)
+        tokens = min(rafaga, fila.tokens + transcurrido * por_segundo)
+        espera = max(0.0, (1 - tokens) / por_segundo)
+        if espera > espera_maxima:
+            # No se reserva: el llamador decide (responder 429, reencolar...)
+            CuotaProveedor.objects.filter(pk=fila.pk).update(tokens=tokens, actualizado=ahora)
+            raise CuotaAgotada(proveedor, espera)
+        CuotaProveedor.objects.filter(pk=fila.pk).update(tokens=tokens - 1, actualizado=ahora)
+    return espera
+
+
+def tomar(proveedor, cuota):
+    """
+    Espera el turno para una llamada al proveedor según `cuota`
+    ({"por_segundo", "rafaga", "espera_maxima"}). Lanza CuotaAgotada si tardaría más.
+    """
+    espera = reservar(
+        proveedor,
+        float(cuota["por_segundo"]),
+        float(cuota.get("rafaga", 1)),
+        float(cuota.get("espera_maxima", 5)),
+    )
+    if espera > 0:
+        time.sleep(espera)
+    return espera
+
+
+async def atomar(proveedor, cuota):
+    """tomar() para las vistas async: la reserva va a un hilo y la espera es asyncio.sleep."""
+    espera = await sync_to_async(reservar)(
+        proveedor,
+        float(cuota["por_segundo"]),
+        float(cuota.get("rafaga", 1)),
+        float(cuota.get("espera_maxima", 5)),
+    )
+    if espera > 0:
+        await asyncio.sleep(espera)
+    return espera
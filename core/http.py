@@ -0,0 +1,215 @@
+# core/http.py
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from . import cuotas
+
+# Valores por defecto; settings.PROVEEDORES_HTTP puede sobrescribir cualquiera
+DEFAULTS = {
+    "timeout": (5, 30),            # (conexión, lectura) en segundos
+    "reintentos_conexion": 2,      # errores al conectar (seguro reintentar siempre)
+    "reintentos_estado": [],       # códigos HTTP que se reintentan
+    "backoff": 0.3,
+    "pool_maxsize": 10,            # conexiones keep-alive por host
+    "cuota": None,                 # {"por_segundo", "rafaga", "espera_maxima"}; None = sin límite
+}
+
+_sesiones = {}
+_lock = threading.Lock()
+# Clientes httpx de las vistas async: uno por proveedor, solo en los event loops de larga
+# vida (el de cada worker uvicorn, registrado en el lifespan ASGI: core/asincrono.py).
+# Bajo WSGI/runserver async_to_sync crea un loop por petición: ahí se usa sesion() en un hilo.
+_loops_persistentes = weakref.WeakSet()
+_clientes = weakref.WeakKeyDictionary()
+
+
+def configuracion(proveedor: str) -> dict:
+    cfg = dict(DEFAULTS)
+    cfg.update(getattr(settings, "PROVEEDORES_HTTP", {}).get(proveedor, {}))
+    return cfg
+
+
+def sesion(proveedor: str) -> requests.Session:
+    """
+    Sesión con pool keep-alive para un proveedor (luxand, platerecognizer, imgbb).
+    Hay una por proceso: tras el fork de gunicorn cada worker crea la suya.
+    """
+    clave = (os.getpid(), proveedor)
+    s = _sesiones.get(clave)
+    if s is None:
+        with _lock:
+            s = _sesiones.get(clave)
+            if s is None:
+                s = _crear_sesion(proveedor)
+                _sesiones[clave] = s
+    return s
+
+
+def _crear_sesion(proveedor):
+    cfg = configuracion(proveedor)
+    retry = Retry(
+        total=None,
+        connect=cfg["reintentos_conexion"],
+        read=0,
+        status=cfg["reintentos_conexion"] if cfg["reintentos_estado"] else 0,
+        status_forcelist=cfg["reintentos_estado"],
+        allowed_methods=None,      # también POST: solo se reintenta lo configurado
+        backoff_factor=cfg["backoff"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=cfg["pool_maxsize"], max_retries=retry)
+    s = requests.Session()
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def request(proveedor: str, method: str, url: str, espera_cuota=None, **kwargs) -> requests.Response:
+    """
+    Si el proveedor tiene `cuota` en settings, antes de llamar se toma un turno del
+    token bucket compartido entre workers (core/cuotas.py). `espera_cuota` cambia la
+    espera máxima (0 en la cola de trabajos: mejor reencolar que dormir).
+    """
+    cfg = configuracion(proveedor)
+    if cfg.get("cuota"):
+        cuota = dict(cfg["cuota"])
+        if espera_cuota is not None:
+            cuota["espera_maxima"] = espera_cuota
+        cuotas.tomar(proveedor, cuota)
+    kwargs.setdefault("timeout", cfg["timeout"])
+    return sesion(proveedor).request(method, url, **kwargs)
+
+
+def get(proveedor: str, url: str, **kwargs) -> requests.Response:
+    return request(proveedor, "GET", url, **kwargs)
+
+
+def post(proveedor: str, url: str, **kwargs) -> requests.Response:
+    return request(proveedor, "POST", url, **kwargs)
+
+
+def registrar_loop(loop=None):
+    """Marca el event loop (por defecto el actual) como de larga vida: sus clientes httpx se reutilizan."""
+    _loops_persistentes.add(loop or asyncio.get_running_loop())
+
+
+async def cerrar_clientes():
+    """Cierra los clientes httpx del loop actual (apagado del worker ASGI)."""
+    loop = asyncio.get_running_loop()
+    _loops_persistentes.discard(loop)
+    for c in _clientes.pop(loop, {}).values():
+        await c.aclose()
+
+
+def cliente(proveedor: str):
+    """
+    Versión async de sesion(): pool keep-alive httpx del event loop actual, o None
+    si el loop no es de larga vida (entonces arequest usa la sesión síncrona).
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _loops_persistentes:
+        return None
+    por_proveedor = _clientes.setdefault(loop, {})
+    c = por_proveedor.get(proveedor)
+    if c is None:
+        cfg = configuracion(proveedor)
+        conexion, lectura = cfg["timeout"]
+        c = httpx.AsyncClient(
+            timeout=httpx.Timeout(lectura, connect=conexion),
+            limits=httpx.Limits(max_keepalive_connections=cfg["pool_maxsize"]),
+            transport=httpx.AsyncHTTPTransport(retries=cfg["reintentos_conexion"]),
+        )
+        por_proveedor[proveedor] = c
+    return c
+
+
+def _request_sincrono(proveedor, method, url, **kwargs):
+    """
+    La llamada con el pool de sesion() (sin volver a tomar la cuota). Los errores de
+    requests se traducen a los de httpx, que son los que esperan las vistas async.
+    """
+    kwargs.setdefault("timeout", configuracion(proveedor)["timeout"])
+    try:
+        return sesion(proveedor).request(method, url, **kwargs)
+    except requests.Timeout as e:
+        raise httpx.TimeoutException(str(e)) from e
+    except requests.ConnectionError as e:
+        raise httpx.ConnectError(str(e)) from e
+    except requests.RequestException as e:
+        raise httpx.TransportError(str(e)) from e
+
+
+async def arequest(proveedor: str, method: str, url: str, espera_cuota=None, **kwargs) -> httpx.Response:
+    """
+    Igual que request() pero sin ocupar un hilo: la espera de la cuota y los
+    reintentos por estado (reintentos_estado, con backoff o Retry-After) se hacen con asyncio.sleep.
+    """
+    cfg = configuracion(proveedor)
+    if cfg.get("cuota"):
+        cuota = dict(cfg["cuota"])
+        if espera_cuota is not None:
+            cuota["espera_maxima"] = espera_cuota
+        await cuotas.atomar(proveedor, cuota)
+    c = cliente(proveedor)
+    if c is None:
+        # Loop de una sola petición (WSGI/runserver): un cliente httpx aquí no reutilizaría
+        # conexiones y quedaría sin cerrar; la sesión síncrona sí tiene pool
+        return await sync_to_async(_request_sincrono, thread_sensitive=False)(proveedor, method, url, **kwargs)
+    if "timeout" in kwargs:
+        kwargs["timeout"] = httpx.Timeout(kwargs["timeout"])
+    intentos = cfg["reintentos_conexion"] if cfg["reintentos_estado"] else 0
+    for intento in range(intentos + 1):
+        r = await c.request(method, url, **kwargs)
+        if r.status_code not in cfg["reintentos_estado"] or intento == intentos:
+            return r
+        try:
+            espera = float(r.headers.get("Retry-After", ""))
+        except ValueError:
+            espera = cfg["backoff"] * (2 ** intento)
+        await asyncio.sleep(espera)
+
+
+async def aget(proveedor: str, url: str, **kwargs) -> httpx.Response:
+    return await arequest(proveedor, "GET", url, **kwargs)
+
+
+async def apost(proveedor: str, url: str, **kwargs) -> httpx.Response:
+    return await arequest(proveedor, "POST", url, **kwargs)
+
+
+def metricas() -> dict:
+    """
+    Reutilización de conexiones por proveedor en este worker.
+    `conexiones_nuevas` cuenta handshakes TCP+TLS; el resto de solicitudes reusaron el pool.
+    """
+    pid = os.getpid()
+    data = {}
+    for (s_pid, proveedor), s in list(_sesiones.items()):
+        if s_pid != pid:
+            continue
+        solicitudes = nuevas = 0
+        for adapter in {id(a): a for a in s.adapters.values()}.values():
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                solicitudes += pool.num_requests
+                nuevas += pool.num_connections
+        data[proveedor] = {
+            "solicitudes": solicitudes,
+            "conexiones_nuevas": nuevas,
+            "reutilizadas": max(solicitudes - nuevas, 0),
+            "tasa_reutilizacion": round((solicitudes - nuevas) / solicitudes, 4) if solicitudes else None,
+        }
+    return {"pid": pid, "proveedores": data}
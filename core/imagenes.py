@@ -0,0 +1,163 @@
+# core/imagenes.py
+from contextlib import nullcontext
+
+from django.db import transaction
+from django.dispatch import Signal
+from rest_framework import status
+from rest_framework.response import Response
+
+from .almacenamiento import almacenamiento, guardar_imagen
+from .models import Trabajo
+from .preproceso import preparar
+from .trabajos import encolar, manejador, ErrorPermanente
+
+# Se emite cuando la imagen quedó guardada en el registro (worker o subida directa).
+# kwargs: instance, campo, url, parametros
+imagen_subida = Signal()
+
+
+class ImagenAsincronaMixin:
+    """
+    Mixin para ViewSets con imagen (`imagen` o `foto`).
+    El registro se guarda en la misma petición y la subida (al backend de
+    core/almacenamiento.py, con sus variantes) queda en la
+    cola de trabajos; la respuesta incluye `<campo>_trabajo` con su id y estado.
+    Con subida directa (core/almacenamiento.py) llega solo la URL en `<campo>` y la
+    firma en `<campo>_firma`: se verifica y no hace falta el worker.
+    """
+    campo_imagen = 'imagen'
+    # Parámetros que recibe el receptor de `imagen_subida` (p. ej. enrolar en Luxand)
+    parametros_imagen = {}
+
+    def handle_image_upload(self, request, action, *args, **kwargs):
+        """
+        Guarda el registro sin esperar a ImgBB y encola la subida de la imagen
+        """
+        campo = self.campo_imagen
+        imagen_file = request.FILES.get(campo)
+
+        if imagen_file and not getattr(imagen_file, "content_type", "").startswith("image/"):
+            return Response({"error": "El archivo debe ser una imagen."}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = request.data.copy()
+        if imagen_file:
+            data.pop(campo, None)
+            # Remover el archivo de FILES para evitar problemas de serialización
+            request._files = {}
+
+        # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
+        anterior = getattr(self.get_object(), campo) if request.method in ["PUT", "PATCH"] else None
+        if request.method in ["PUT", "PATCH"] and not data.get(campo):
+            data[campo] = anterior
+        request._full_data = data
+
+        subida_directa = None
+        url = data.get(campo)
+        firma = verificar = None
+        if not imagen_file and isinstance(url, str) and url:
+            firma = data.get(f"{campo}_firma")
+            sin_cambios = request.method in ["PUT", "PATCH"] and url == anterior
+            verificar = firma or (not sin_cambios and almacenamiento().es_propia(url))
+
+        # La firma queda usada en la misma transacción que guarda el registro: si el
+        # registro no se guarda (p. ej. un 400 del serializer) se puede reintentar con ella
+        with transaction.atomic() if verificar else nullcontext():
+            if verificar:
+                subida_directa = almacenamiento().verificar_subida(url, firma or "", request.user)
+                if subida_directa is None:
+                    return Response({"error": "La firma de la imagen no es válida, ya venció o ya se usó."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+
+            response = action(request, *args, **kwargs)
+
+            ok = response.status_code in (status.HTTP_200_OK, status.HTTP_201_CREATED)
+            if verificar and not ok:
+                transaction.set_rollback(True)
+            if ok and subida_directa:
+                obj = self.get_queryset().model._default_manager.get(pk=response.data.get("id"))
+                guardar_urls(obj, campo, subida_directa, parametros=self.parametros_imagen)
+                variantes = subida_directa
+            elif ok and not imagen_file and (url or None) != (anterior or None):
+                # URL ajena al almacenamiento (o imagen quitada): sin variantes propias,
+                # los listados muestran la imagen nueva y no la miniatura de la anterior
+                obj = self.get_queryset().model._default_manager.get(pk=response.data.get("id"))
+                variantes = reiniciar_variantes(obj, campo)
+            else:
+                variantes = None
+        if variantes:
+            for variante in ("miniatura", "mediana"):
+                if f"{campo}_{variante}" in response.data:
+                    response.data[f"{campo}_{variante}"] = variantes[variante]
+
+        if imagen_file and ok:
+            trabajo = encolar_imagen(
+                self.get_queryset().model, response.data.get("id"), campo, imagen_file,
+                parametros=self.parametros_imagen
+            )
+            response.data[f"{campo}_trabajo"] = {"id": trabajo.id, "estado": trabajo.estado}
+        return response
+
+
+def encolar_imagen(modelo, objeto_id, campo, imagen_file, parametros=None):
+    """
+    Encola la subida de `imagen_file` para `modelo(objeto_id).campo`.
+    Cancela las subidas anteriores del mismo campo que aún no empezaron.
+    """
+    Trabajo.objects.filter(
+        tipo='IMAGEN', estado='PENDIENTE', objeto_id=objeto_id, campo=campo,
+        content_type__app_label=modelo._meta.app_label, content_type__model=modelo._meta.model_name,
+    ).update(estado='CANCELADO')
+
+    # Se guarda (y luego se sube) la versión reducida; el tamaño antes/después queda en el trabajo
+    preparada, info = preparar(imagen_file)
+    return encolar(
+        'IMAGEN', modelo=modelo, objeto_id=objeto_id, campo=campo,
+        archivo=preparada.read(), nombre_archivo=preparada.name,
+        parametros={**(parametros or {}), "imagen": info},
+    )
+
+
+@manejador('IMAGEN')
+def procesar_subida_imagen(trabajo):
+    obj = trabajo.objeto
+    if obj is None:
+        raise ErrorPermanente("El registro ya no existe")
+
+    urls = guardar_imagen(bytes(trabajo.archivo), trabajo.nombre_archivo)
+    guardar_urls(obj, trabajo.campo, urls, parametros=trabajo.parametros)
+    return {"url": urls["original"], "variantes": urls}
+
+
+def guardar_urls(obj, campo, urls, parametros=None):
+    """
+    Guarda en `obj` la imagen ya almacenada (y sus variantes, si el modelo tiene
+    `<campo>_miniatura` / `<campo>_mediana`) y emite `imagen_subida`.
+    """
+    campos = {campo: urls["original"]}
+    nombres = {f.name for f in obj._meta.concrete_fields}
+    for variante in ("miniatura", "mediana"):
+        if f"{campo}_{variante}" in nombres:
+            campos[f"{campo}_{variante}"] = urls[variante]
+    for nombre, valor in campos.items():
+        setattr(obj, nombre, valor)
+    obj.save(update_fields=list(campos))
+
+    imagen_subida.send(
+        sender=obj.__class__, instance=obj, campo=campo, url=urls["original"],
+        parametros=parametros or {}
+    )
+
+
+def reiniciar_variantes(obj, campo):
+    """
+    Apunta `<campo>_miniatura` / `<campo>_mediana` a la imagen original actual (o las
+    vacía si no hay). Para cuando el original cambió sin pasar por guardar_urls.
+    """
+    original = getattr(obj, campo) or None
+    nombres = {f.name for f in obj._meta.concrete_fields}
+    campos = [f"{campo}_{v}" for v in ("miniatura", "mediana") if f"{campo}_{v}" in nombres]
+    for nombre in campos:
+        setattr(obj, nombre, original)
+    if campos:
+        obj.save(update_fields=campos)
+    return {"miniatura": original, "mediana": original}
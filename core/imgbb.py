@@ -0,0 +1,25 @@
+# core/imgbb.py
+from django.conf import settings
+from . import http
+
+UPLOAD_URL = "https://api.imgbb.com/1/upload"
+
+
+def subir(contenido: bytes, nombre: str = "") -> dict:
+    """
+    Sube una imagen a ImgBB y devuelve el `data` de la respuesta
+    (url, y según el tamaño thumb.url y medium.url).
+    """
+    payload = {"key": settings.IMGBB_API_KEY}
+    files = {"image": (nombre or "imagen.jpg", contenido)}
+    r = http.post("imgbb", UPLOAD_URL, data=payload, files=files)
+    if r.status_code != 200:
+        raise ValueError(f"ImgBB error ({r.status_code}): {r.text[:200]}")
+    return r.json()["data"]
+
+
+def subir_imagen(contenido: bytes, nombre: str = ""):
+    """
+    Sube una imagen a ImgBB y devuelve la URL pública.
+    """
+    return subir(contenido, nombre)["url"]
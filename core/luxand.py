@@ -1,6 +1,12 @@
 # core/luxand.py
+import asyncio
+import os
+
+import httpx
 import requests
 from django.conf import settings
+from . import http
+from .cuotas import CuotaAgotada
 
 BASE = "https://api.luxand.cloud"
 TOKEN = settings.LUXAND_TOKEN
@@ -8,6 +14,29 @@ COLLECTION = getattr(settings, "LUXAND_COLLECTION", "")  # opcional
 
 HEADERS = {"token": TOKEN}
 
+
+class LuxandError(ValueError):
+    """
+    Error HTTP de Luxand. Guarda el status y el Retry-After (segundos) para
+    que quien llame decida si reintentar (429/503) o no.
+    """
+    def __init__(self, mensaje, status_code=None, retry_after=None):
+        super().__init__(mensaje)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def temporal(self):
+        return self.status_code in (429, 500, 502, 503, 504)
+
+
+def _error(prefijo, r):
+    try:
+        retry_after = int(r.headers.get("Retry-After", ""))
+    except ValueError:
+        retry_after = None
+    return LuxandError(f"{prefijo}: {r.text}", status_code=r.status_code, retry_after=retry_after)
+
 def _filefield_for(path_or_url, field_name: str):
     # Luxand acepta pasar una URL directamente como valor del campo 'photo'/'photos'
     if isinstance(path_or_url, str):
@@ -22,7 +51,7 @@ def _filefield_for(path_or_url, field_name: str):
 def create_collection(name: str):
     # opcional: crear colección
     url = f"{BASE}/collection"
-    return requests.post(url, headers=HEADERS, files={"name": (None, name)}, timeout=20).json()
+    return http.post("luxand", url, headers=HEADERS, files={"name": (None, name)}).json()
 
 def add_person(name: str, image_path_or_url: str, collections: str = ""):
     """
@@ -33,9 +62,9 @@ def add_person(name: str, image_path_or_url: str, collections: str = ""):
     data = {"name": name, "store": "1"}
     if collections:
         data["collections"] = collections
-    r = requests.post(url, headers=HEADERS, files=files, data=data, timeout=30)
+    r = http.post("luxand", url, headers=HEADERS, files=files, data=data)
     if r.status_code != 200:
-        raise ValueError(f"Luxand add_person error: {r.text}")
+        raise _error("Luxand add_person error", r)
     return r.json()  # incluye 'uuid'
 
 def add_face(person_uuid: str, image_path_or_url: str):
@@ -46,9 +75,18 @@ def add_face(person_uuid: str, image_path_or_url: str):
     url = f"{BASE}/v2/person/{person_uuid}"
     files = _filefield_for(image_path_or_url, "photo")  # 'photo' según documentación
     data = {"store": "1"}
-    r = requests.post(url, headers=HEADERS, files=files, data=data, timeout=30)
+    r = http.post("luxand", url, headers=HEADERS, files=files, data=data)
     if r.status_code != 200:
-        raise ValueError(f"Luxand add_face error: {r.text}")
+        raise _error("Luxand add_face error", r)
+    return r.json()
+
+def _resultado_recognize(r):
+    if r.status_code == 503:
+        raise _error("Luxand service unavailable (503)", r)
+    elif r.status_code == 429:
+        raise _error("Luxand rate limit exceeded (429)", r)
+    elif r.status_code != 200:
+        raise ValueError(f"Luxand recognize error ({r.status_code}): {r.text}")
     return r.json()
 
 def recognize(image_path_or_url: str, gallery: str = ""):
@@ -69,21 +107,132 @@ def recognize(image_path_or_url: str, gallery: str = ""):
     print(f"   Data: {data}")
     
     try:
-        r = requests.post(url, headers=HEADERS, files=files, data=data, timeout=30)
+        r = http.post("luxand", url, headers=HEADERS, files=files, data=data)
         print(f"   Status Code: {r.status_code}")
         print(f"   Response: {r.text[:500]}...")
         
-        if r.status_code == 503:
-            raise ValueError(f"Luxand service unavailable (503). This may be due to rate limiting or service issues. Response: {r.text}")
-        elif r.status_code == 429:
-            raise ValueError(f"Luxand rate limit exceeded (429). Please wait before trying again. Response: {r.text}")
-        elif r.status_code != 200:
-            raise ValueError(f"Luxand recognize error ({r.status_code}): {r.text}")
-        
-        return r.json()
+        return _resultado_recognize(r)
+    except CuotaAgotada:
+        raise  # la cuota compartida no dio turno: quien llama responde 429
     except requests.exceptions.Timeout:
         raise ValueError("Luxand API timeout. The service may be slow or unavailable.")
     except requests.exceptions.ConnectionError:
         raise ValueError("Cannot connect to Luxand API. Check your internet connection.")
     except requests.exceptions.RequestException as e:
         raise ValueError(f"Network error connecting to Luxand: {e}")
+
+
+# ---- Versiones async (vistas ASGI): mismo contrato, sin ocupar un hilo durante la llamada ----
+
+def _foto_async(fuente, campo: str):
+    """(data, files) para httpx: una URL va como campo de formulario y un archivo como bytes."""
+    if isinstance(fuente, str):
+        if fuente.startswith("http://") or fuente.startswith("https://"):
+            return {campo: fuente}, None
+        with open(fuente, "rb") as f:
+            return {}, {campo: (os.path.basename(fuente), f.read(), "image/jpeg")}
+    fuente.seek(0)
+    nombre = getattr(fuente, "name", "") or "foto.jpg"
+    return {}, {campo: (nombre, fuente.read(), getattr(fuente, "content_type", None) or "image/jpeg")}
+
+async def aadd_person(name: str, image_path_or_url, collections: str = ""):
+    data, files = _foto_async(image_path_or_url, "photos")
+    data.update({"name": name, "store": "1"})
+    if collections:
+        data["collections"] = collections
+    r = await http.apost("luxand", f"{BASE}/v2/person", headers=HEADERS, data=data, files=files)
+    if r.status_code != 200:
+        raise _error("Luxand add_person error", r)
+    return r.json()
+
+async def arecognize(image_path_or_url, gallery: str = ""):
+    data, files = _foto_async(image_path_or_url, "photo")
+    if gallery:
+        data["gallery"] = gallery
+    try:
+        r = await http.apost("luxand", f"{BASE}/photo/search/v2", headers=HEADERS, data=data, files=files)
+        return _resultado_recognize(r)
+    except httpx.TimeoutException:
+        raise ValueError("Luxand API timeout. The service may be slow or unavailable.")
+    except httpx.ConnectError:
+        raise ValueError("Cannot connect to Luxand API. Check your internet connection.")
+    except httpx.HTTPError as e:
+        raise ValueError(f"Network error connecting to Luxand: {e}")
+
+
+def colecciones_busqueda():
+    """
+    Colecciones donde se enrola a la gente (LUXAND_COLLECTION para personas,
+    LUXAND_COLLECTION_EMPLEADOS para empleados), sin repetir. "" = sin colección.
+    """
+    return list(dict.fromkeys([
+        getattr(settings, "LUXAND_COLLECTION", ""),
+        getattr(settings, "LUXAND_COLLECTION_EMPLEADOS", ""),
+    ]))
+
+def candidatos_de(res):
+    """Lista de candidatos de una respuesta de /photo/search/v2 (lista o dict)."""
+    if isinstance(res, list):
+        return res
+    if isinstance(res, dict):
+        candidatos = res.get("candidates") or res.get("matches") or res.get("result") or []
+        if isinstance(candidatos, dict):
+            candidatos = candidatos.get("candidates", [])
+        return candidatos if isinstance(candidatos, list) else []
+    return []
+
+def probabilidad(candidato):
+    """Similitud de un candidato normalizada a 0..1."""
+    try:
+        p = float(candidato.get("probability") or candidato.get("similarity")
+                  or candidato.get("confidence") or candidato.get("score") or 0.0)
+    except (TypeError, ValueError):
+        p = 0.0
+    return p / 100.0 if p > 1.0 else p
+
+def caras_de(candidatos):
+    """
+    Agrupa los candidatos por cara (mismo "rectangle" en la foto). Cada cara queda
+    con sus candidatos de mayor a menor probabilidad; las caras en el orden en que aparecen.
+    """
+    caras = {}
+    for c in candidatos:
+        rect = c.get("rectangle") or {}
+        clave = tuple(sorted(rect.items())) if isinstance(rect, dict) else repr(rect)
+        caras.setdefault(clave, {"rectangulo": rect or None, "candidatos": []})["candidatos"].append(c)
+    for cara in caras.values():
+        cara["candidatos"].sort(key=probabilidad, reverse=True)
+    return list(caras.values())
+
+async def abuscar_en_colecciones(image_path_or_url, colecciones, umbral=None):
+    """
+    Busca la cara en todas las colecciones a la vez (la latencia es la de la más lenta)
+    y junta los candidatos de mayor a menor probabilidad, marcando su "collection".
+    Si un candidato ya supera `umbral` no se espera a las colecciones que faltan.
+    Devuelve (candidatos, completo); completo=False si se cortó antes o alguna falló.
+    """
+    async def buscar(coleccion):
+        return coleccion, await arecognize(image_path_or_url, gallery=coleccion)
+
+    tareas = [asyncio.ensure_future(buscar(c)) for c in colecciones]
+    candidatos, errores, respondidas = [], [], 0
+    try:
+        for siguiente in asyncio.as_completed(tareas):
+            try:
+                coleccion, res = await siguiente
+            except (ValueError, CuotaAgotada) as e:
+                errores.append(e)
+                continue
+            respondidas += 1
+            for c in candidatos_de(res):
+                if isinstance(c, dict):
+                    candidatos.append({**c, "collection": coleccion})
+            if umbral is not None and any(probabilidad(c) >= umbral for c in candidatos):
+                break
+    finally:
+        for t in tareas:
+            t.cancel()
+    if errores and not respondidas:
+        raise errores[0]
+    candidatos.sort(key=probabilidad, reverse=True)
+    return candidatos, respondidas == len(tareas)
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.trabajos import procesar_pendientes, liberar_bloqueados
+
+
+class Command(BaseCommand):
+    help = "Worker de la cola de trabajos en segundo plano (subida de imágenes, etc.)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tipo", action="append", dest="tipos", help="Procesar solo este tipo (se puede repetir)")
+        parser.add_argument("--lote", type=int, default=10, help="Trabajos a tomar por iteración")
+        parser.add_argument("--espera", type=float, default=2.0, help="Segundos de espera cuando la cola está vacía")
+        parser.add_argument("--una-vez", action="store_true", help="Procesar lo pendiente y salir")
+
+    def handle(self, *args, **options):
+        tipos = options["tipos"]
+        lote = options["lote"]
+        espera = options["espera"]
+
+        self.stdout.write(f"Worker iniciado (tipos={tipos or 'todos'}, lote={lote})")
+        ultima_limpieza = 0
+        try:
+            while True:
+                close_old_connections()
+                if time.monotonic() - ultima_limpieza > 60:
+                    liberados = liberar_bloqueados()
+                    if liberados:
+                        self.stdout.write(f"{liberados} trabajo(s) bloqueados devueltos a la cola")
+                    ultima_limpieza = time.monotonic()
+
+                procesados = procesar_pendientes(lote, tipos)
+                if options["una_vez"] and procesados < lote:
+                    break
+                if not procesados:
+                    time.sleep(espera)
+        except KeyboardInterrupt:
+            self.stdout.write("Worker detenido")
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:28
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Trabajo',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('IMAGEN', 'Subida de imagen')], max_length=20, verbose_name='Tipo')),
+                ('estado', models.CharField(choices=[('PENDIENTE', 'Pendiente'), ('PROCESANDO', 'Procesando'), ('COMPLETADO', 'Completado'), ('FALLIDO', 'Fallido'), ('CANCELADO', 'Cancelado')], default='PENDIENTE', max_length=10, verbose_name='Estado')),
+                ('objeto_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('campo', models.CharField(blank=True, max_length=50, verbose_name='Campo a completar')),
+                ('archivo', models.BinaryField(blank=True, null=True)),
+                ('nombre_archivo', models.CharField(blank=True, max_length=255)),
+                ('parametros', models.JSONField(blank=True, default=dict)),
+                ('resultado', models.JSONField(blank=True, null=True)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('max_intentos', models.PositiveIntegerField(default=5)),
+                ('ultimo_error', models.TextField(blank=True, null=True)),
+                ('disponible_en', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Disponible desde')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('content_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Trabajo',
+                'verbose_name_plural': 'Trabajos',
+                'db_table': 'trabajo',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'disponible_en'], name='trabajo_estado_3f8eda_idx'), models.Index(fields=['content_type', 'objeto_id'], name='trabajo_content_56f5cb_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajo',
+            name='clave',
+            field=models.CharField(blank=True, max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='trabajo',
+            name='tipo',
+            field=models.CharField(choices=[('IMAGEN', 'Subida de imagen'), ('ENROLAMIENTO', 'Enrolamiento en Luxand')], max_length=20, verbose_name='Tipo'),
+        ),
+        migrations.AddConstraint(
+            model_name='trabajo',
+            constraint=models.UniqueConstraint(condition=models.Q(('estado__in', ['PENDIENTE', 'PROCESANDO'])), fields=('clave',), name='trabajo_clave_activa_unica'),
+        ),
+    ]
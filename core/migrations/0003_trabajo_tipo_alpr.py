@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_trabajo_clave_alter_trabajo_tipo_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trabajo',
+            name='tipo',
+            field=models.CharField(choices=[('IMAGEN', 'Subida de imagen'), ('ENROLAMIENTO', 'Enrolamiento en Luxand'), ('ALPR', 'Lectura de placa')], max_length=20, verbose_name='Tipo'),
+        ),
+    ]
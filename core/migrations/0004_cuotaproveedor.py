@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:44
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_trabajo_tipo_alpr'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CuotaProveedor',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('proveedor', models.CharField(max_length=50, unique=True)),
+                ('tokens', models.FloatField(default=0)),
+                ('actualizado', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Cuota de proveedor',
+                'verbose_name_plural': 'Cuotas de proveedores',
+                'db_table': 'cuota_proveedor',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:51
+
+import django.core.serializers.json
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_cuotaproveedor'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SolicitudEnCurso',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('clave', models.CharField(max_length=200, unique=True)),
+                ('estado', models.CharField(choices=[('EN_CURSO', 'En curso'), ('LISTO', 'Listo')], default='EN_CURSO', max_length=10)),
+                ('resultado', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('expira_en', models.DateTimeField(db_index=True)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Solicitud en curso',
+                'verbose_name_plural': 'Solicitudes en curso',
+                'db_table': 'solicitud_en_curso',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_solicitudencurso'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConcurrenciaTrabajo',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(max_length=20, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Concurrencia de trabajos',
+                'verbose_name_plural': 'Concurrencia de trabajos',
+                'db_table': 'concurrencia_trabajo',
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_concurrencia_trabajo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FirmaUsada',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('nonce', models.CharField(max_length=200, unique=True)),
+                ('expira_en', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Firma usada',
+                'verbose_name_plural': 'Firmas usadas',
+                'db_table': 'firma_usada',
+            },
+        ),
+    ]
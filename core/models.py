@@ -0,0 +1,152 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+
+class Trabajo(models.Model):
+    """
+    Cola de trabajos en segundo plano respaldada por la base de datos.
+    El worker (`python manage.py procesar_trabajos`) los toma y ejecuta.
+    """
+    TIPO_CHOICES = [
+        ('IMAGEN', 'Subida de imagen'),
+        ('ENROLAMIENTO', 'Enrolamiento en Luxand'),
+        ('ALPR', 'Lectura de placa'),
+    ]
+
+    ESTADO_CHOICES = [
+        ('PENDIENTE', 'Pendiente'),
+        ('PROCESANDO', 'Procesando'),
+        ('COMPLETADO', 'Completado'),
+        ('FALLIDO', 'Fallido'),
+        ('CANCELADO', 'Cancelado'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name="Tipo")
+    estado = models.CharField(max_length=10, choices=ESTADO_CHOICES, default='PENDIENTE', verbose_name="Estado")
+
+    # Registro al que pertenece el trabajo (Persona, Empleado, Mascota, Vehiculo, Unidad...)
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, null=True, blank=True)
+    objeto_id = models.PositiveIntegerField(null=True, blank=True)
+    objeto = GenericForeignKey('content_type', 'objeto_id')
+    campo = models.CharField(max_length=50, blank=True, verbose_name="Campo a completar")
+    # Evita trabajos duplicados: solo puede haber uno activo por clave
+    clave = models.CharField(max_length=100, blank=True, null=True)
+
+    archivo = models.BinaryField(null=True, blank=True)
+    nombre_archivo = models.CharField(max_length=255, blank=True)
+    parametros = models.JSONField(default=dict, blank=True)
+    resultado = models.JSONField(null=True, blank=True)
+
+    intentos = models.PositiveIntegerField(default=0)
+    max_intentos = models.PositiveIntegerField(default=5)
+    ultimo_error = models.TextField(blank=True, null=True)
+    disponible_en = models.DateTimeField(default=timezone.now, verbose_name="Disponible desde")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'trabajo'
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+        ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['estado', 'disponible_en']),
+            models.Index(fields=['content_type', 'objeto_id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['clave'],
+                condition=models.Q(estado__in=['PENDIENTE', 'PROCESANDO']),
+                name='trabajo_clave_activa_unica',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} #{self.id} ({self.estado})"
+
+
+class ConcurrenciaTrabajo(models.Model):
+    """
+    Una fila por tipo de trabajo con concurrencia limitada (TRABAJOS_CONCURRENCIA):
+    tomar_trabajos la bloquea (SELECT ... FOR UPDATE) mientras cuenta los PROCESANDO,
+    así dos workers no reparten los mismos cupos libres.
+    """
+    id = models.AutoField(primary_key=True)
+    tipo = models.CharField(max_length=20, unique=True)
+
+    class Meta:
+        db_table = 'concurrencia_trabajo'
+        verbose_name = "Concurrencia de trabajos"
+        verbose_name_plural = "Concurrencia de trabajos"
+
+    def __str__(self):
+        return self.tipo
+
+
+class CuotaProveedor(models.Model):
+    """
+    Token bucket compartido por todos los procesos para respetar la cuota de un
+    proveedor externo (ver core/cuotas.py). `tokens` puede quedar negativo: son
+    llamadas ya reservadas que esperan su turno.
+    """
+    id = models.AutoField(primary_key=True)
+    proveedor = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField(default=0)
+    actualizado = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'cuota_proveedor'
+        verbose_name = "Cuota de proveedor"
+        verbose_name_plural = "Cuotas de proveedores"
+
+    def __str__(self):
+        return f"{self.proveedor}: {self.tokens:.2f}"
+
+
+class SolicitudEnCurso(models.Model):
+    """
+    Llamada externa en curso (o recién terminada) compartida entre workers: las
+    peticiones idénticas esperan el resultado del líder en vez de repetir la
+    llamada (ver core/coalescencia.py).
+    """
+    ESTADOS = [
+        ('EN_CURSO', 'En curso'),
+        ('LISTO', 'Listo'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    clave = models.CharField(max_length=200, unique=True)
+    estado = models.CharField(max_length=10, choices=ESTADOS, default='EN_CURSO')
+    resultado = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    expira_en = models.DateTimeField(db_index=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'solicitud_en_curso'
+        verbose_name = "Solicitud en curso"
+        verbose_name_plural = "Solicitudes en curso"
+
+    def __str__(self):
+        return f"{self.clave} ({self.estado})"
+
+
+class FirmaUsada(models.Model):
+    """
+    Nonce de una firma de subida directa ya usada (ver core/almacenamiento.py): cada
+    token de subida y cada firma de resultado valen una sola vez, en cualquier worker.
+    """
+    id = models.AutoField(primary_key=True)
+    nonce = models.CharField(max_length=200, unique=True)
+    expira_en = models.DateTimeField(db_index=True)
+
+    class Meta:
+        db_table = 'firma_usada'
+        verbose_name = "Firma usada"
+        verbose_name_plural = "Firmas usadas"
+
+    def __str__(self):
+        return self.nonce
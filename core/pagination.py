@@ -0,0 +1,289 @@
+# core/pagination.py
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre el `ordering` de cada ViewSet.
+
+    - Usa el orden elegido con OrderingFilter o, si no hay, el `ordering` de la vista
+      o el Meta.ordering del modelo, y siempre agrega `id` como desempate estable.
+    - Cada página es un `WHERE (campos) > (valores del último registro)`, así que el
+      costo no crece con el número de página ni con el tamaño de la tabla.
+    - El total es opcional: `?count=exact` hace COUNT(*), `?count=approx` usa el
+      estimado del planificador de PostgreSQL cuando la tabla es grande.
+    """
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    # Por debajo de este estimado el COUNT(*) exacto es barato y se prefiere
+    approx_count_threshold = getattr(settings, "PAGINATION_APPROX_COUNT_THRESHOLD", 10000)
+    invalid_cursor_message = "Cursor inválido"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.base_url = request.build_absolute_uri()
+        self.count = None
+        self.count_is_estimate = False
+
+        self.ordering = self.get_ordering(request, queryset, view)
+        values, reverse = self.decode_cursor(request)
+
+        count_mode = request.query_params.get(self.count_query_param)
+        if count_mode in ("exact", "approx"):
+            self.count, self.count_is_estimate = self.get_count(queryset, approx=(count_mode == "approx"))
+
+        ordering = [self._invert(o) for o in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*[self._order_expression(o) for o in ordering])
+        if values is not None:
+            queryset = queryset.filter(self._after_filter(ordering, values))
+
+        # Se pide un registro extra para saber si hay página siguiente
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        if reverse:
+            self.has_next = values is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = values is not None
+
+        self.first = results[0] if results else None
+        self.last = results[-1] if results else None
+        # Cursor de una página vacía: se conserva el de la petición para poder volver
+        self.current_values = values
+        return results
+
+    def get_paginated_response(self, data):
+        payload = OrderedDict([
+            ("next", self.get_next_link()),
+            ("previous", self.get_previous_link()),
+        ])
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["count_is_estimate"] = self.count_is_estimate
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "count_is_estimate": {"type": "boolean"},
+                "results": schema,
+            },
+        }
+
+    # ==================== ORDEN ====================
+
+    def get_ordering(self, request, queryset, view):
+        """
+        Orden efectivo de la lista, expandido a columnas concretas y con `id` al final.
+        """
+        ordering = None
+        for backend in getattr(view, "filter_backends", None) or []:
+            backend = backend()
+            if hasattr(backend, "get_ordering"):
+                ordering = backend.get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, "ordering", None)
+        if not ordering:
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+
+        model = queryset.model
+        expanded = []
+        for item in ordering:
+            if not isinstance(item, str) or item == "?":
+                continue
+            expanded.extend(self._expand(model, item))
+
+        # Desempate estable por la clave primaria
+        pk_names = ("pk", model._meta.pk.name)
+        names = [o.lstrip("-") for o in expanded]
+        if not any(n in pk_names for n in names):
+            expanded.append("pk")
+        else:
+            # Lo que venga después de la PK ya no aporta al orden
+            idx = next(i for i, n in enumerate(names) if n in pk_names)
+            expanded = expanded[:idx + 1]
+        return expanded
+
+    def _expand(self, model, item, depth=0):
+        """
+        Traduce un campo de orden a columnas: una FK se ordena por el Meta.ordering
+        del modelo relacionado (como hace Django), o por su id si no tiene.
+        """
+        descending = item.startswith("-")
+        path = item.lstrip("-")
+        field = self._resolve_field(model, path)
+        if field is None:
+            return []
+        if path == "pk" or path.endswith("__pk") or field.primary_key:
+            return [item]
+        if field.is_relation and (field.many_to_one or field.one_to_one):
+            related_ordering = field.related_model._meta.ordering if depth < 3 else []
+            if not related_ordering:
+                return [("-" if descending else "") + f"{path}__pk"]
+            expanded = []
+            for sub in related_ordering:
+                if not isinstance(sub, str):
+                    continue
+                sub_desc = sub.startswith("-")
+                sub_path = f"{path}__{sub.lstrip('-')}"
+                expanded.extend(self._expand(model, ("-" if descending != sub_desc else "") + sub_path, depth + 1))
+            return expanded
+        if field.is_relation:
+            return []
+        return [item]
+
+    def _resolve_field(self, model, path):
+        field = None
+        opts = model._meta
+        for part in path.split("__"):
+            if part == "pk":
+                part = opts.pk.name
+            try:
+                field = opts.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            if field.is_relation and field.related_model is not None:
+                opts = field.related_model._meta
+        return field
+
+    @staticmethod
+    def _invert(item):
+        return item[1:] if item.startswith("-") else "-" + item
+
+    @staticmethod
+    def _order_expression(item):
+        # NULL siempre se trata como el valor "mayor" para que el filtro por cursor
+        # sea idéntico en PostgreSQL y SQLite
+        if item.startswith("-"):
+            return F(item[1:]).desc(nulls_first=True)
+        return F(item).asc(nulls_last=True)
+
+    def _after_filter(self, ordering, values):
+        """
+        Condición lexicográfica (c1, c2, ..., id) > (v1, v2, ..., vid).
+        """
+        if len(values) != len(ordering):
+            raise NotFound(self.invalid_cursor_message)
+        condition = Q(pk__in=[])
+        equal = Q()
+        for item, value in zip(ordering, values):
+            name = item.lstrip("-")
+            if item.startswith("-"):
+                after = Q(**{f"{name}__isnull": False}) if value is None else Q(**{f"{name}__lt": value})
+            else:
+                after = Q(pk__in=[]) if value is None else (Q(**{f"{name}__gt": value}) | Q(**{f"{name}__isnull": True}))
+            condition |= equal & after
+            equal &= Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+        return condition
+
+    # ==================== CURSOR ====================
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode("ascii") + b"==").decode("utf-8")
+            data = json.loads(raw)
+            return list(data["v"]), bool(data.get("r"))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, values, reverse):
+        raw = json.dumps({"v": values, "r": 1 if reverse else 0}, default=str, separators=(",", ":"))
+        encoded = base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _values_for(self, obj):
+        values = []
+        for item in self.ordering:
+            value = obj
+            for part in item.lstrip("-").split("__"):
+                value = getattr(value, part, None) if value is not None else None
+            values.append(value)
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.last is None:
+            return self.encode_cursor(self.current_values, False)
+        return self.encode_cursor(self._values_for(self.last), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.first is None:
+            return self.encode_cursor(self.current_values, True)
+        return self.encode_cursor(self._values_for(self.first), True)
+
+    # ==================== TAMAÑO Y TOTAL ====================
+
+    def get_page_size(self, request):
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                size = int(raw)
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except ValueError:
+                pass
+        return self.page_size
+
+    def get_count(self, queryset, approx=False):
+        """
+        Devuelve (total, es_estimado). En PostgreSQL el estimado sale de EXPLAIN,
+        que no recorre la tabla; si es pequeño se hace el COUNT(*) exacto.
+        """
+        queryset = queryset.order_by()
+        if approx:
+            estimate = self._estimate_count(queryset)
+            if estimate is not None and estimate >= self.approx_count_threshold:
+                return estimate, True
+        return queryset.count(), False
+
+    def _estimate_count(self, queryset):
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        try:
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            print(f"[Paginación] No se pudo estimar el total: {e}")
+            return None
@@ -0,0 +1,88 @@
+# core/preproceso.py
+"""
+Preprocesado de imágenes antes de subirlas a ImgBB, Luxand o PlateRecognizer:
+endereza según EXIF, reduce al lado máximo configurado y recomprime (JPEG o WebP).
+Una foto de celular de 4-10 MB queda en unos cientos de KB, suficiente para caras y placas.
+"""
+import os
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+LADO_MAXIMO = getattr(settings, "IMAGEN_LADO_MAXIMO", 1600)
+CALIDAD = getattr(settings, "IMAGEN_CALIDAD", 82)
+FORMATO = getattr(settings, "IMAGEN_FORMATO", "JPEG").upper()
+
+_EXTENSIONES = {"JPEG": ("jpg", "image/jpeg"), "WEBP": ("webp", "image/webp")}
+_ORIENTACION = 0x0112
+
+
+def preparar(archivo, nombre=None, content_type=None, lado_maximo=None):
+    """
+    Devuelve (archivo, info): el archivo listo para subir y
+    {bytes_original, bytes_final, dimensiones_original, dimensiones_final, formato}.
+    `archivo` puede ser un UploadedFile (Pillow lo lee directo, sin copiarlo) o bytes.
+    Si Pillow no puede abrirlo (o recomprimir no achica nada) se devuelve el original.
+    `lado_maximo` cambia IMAGEN_LADO_MAXIMO (p.ej. para miniaturas).
+    """
+    lado = lado_maximo or LADO_MAXIMO
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        fuente = BytesIO(bytes(archivo))
+        tamano = len(fuente.getbuffer())
+    else:
+        fuente = archivo
+        fuente.seek(0, os.SEEK_END)
+        tamano = fuente.tell()
+        fuente.seek(0)
+        nombre = nombre or getattr(archivo, "name", "")
+        content_type = content_type or getattr(archivo, "content_type", None)
+    nombre = os.path.basename(nombre or "") or "imagen.jpg"
+    content_type = content_type or "image/jpeg"
+    info = {"bytes_original": tamano, "bytes_final": tamano,
+            "dimensiones_original": None, "dimensiones_final": None, "formato": None}
+
+    def sin_cambios():
+        if fuente is archivo:
+            archivo.seek(0)
+            return archivo
+        return SimpleUploadedFile(nombre, fuente.getvalue(), content_type)
+
+    try:
+        with Image.open(fuente) as img:
+            info["dimensiones_original"] = list(img.size)
+            rotada = img.getexif().get(_ORIENTACION, 1) != 1
+            # En JPEG decodifica directo a una escala reducida (mucho más rápido que abrir a tamaño completo)
+            img.draft("RGB", (lado, lado))
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((lado, lado), Image.LANCZOS)
+            if img.mode not in ("RGB", "L"):
+                img = img.convert("RGB")
+            salida = BytesIO()
+            if FORMATO == "WEBP":
+                img.save(salida, "WEBP", quality=CALIDAD, method=4)
+            else:
+                img.save(salida, "JPEG", quality=CALIDAD, optimize=True, progressive=True)
+            dimensiones = list(img.size)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"[Imagen] No se pudo preprocesar {nombre}: {e}; se envía el original")
+        return sin_cambios(), info
+
+    contenido = salida.getvalue()
+    if len(contenido) >= tamano and not rotada and dimensiones == info["dimensiones_original"]:
+        # Ya venía chica y derecha: recomprimir solo la agrandaría
+        info["dimensiones_final"] = dimensiones
+        return sin_cambios(), info
+
+    extension, tipo = _EXTENSIONES.get(FORMATO, _EXTENSIONES["JPEG"])
+    info.update(bytes_final=len(contenido), dimensiones_final=dimensiones, formato=FORMATO)
+    print(f"[Imagen] {nombre}: {info['bytes_original'] // 1024} KB {info['dimensiones_original']} -> "
+          f"{info['bytes_final'] // 1024} KB {dimensiones}")
+    return SimpleUploadedFile(f"{os.path.splitext(nombre)[0]}.{extension}", contenido, tipo), info
+
+
+async def apreparar(archivo, nombre=None, content_type=None):
+    """preparar() desde una vista async: la decodificación corre en un hilo aparte."""
+    return await sync_to_async(preparar, thread_sensitive=False)(archivo, nombre, content_type)
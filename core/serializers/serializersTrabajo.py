@@ -0,0 +1,18 @@
+from rest_framework import serializers
+from ..models import Trabajo
+
+
+class TrabajoSerializer(serializers.ModelSerializer):
+    """
+    Serializer de solo lectura para consultar el estado de un trabajo
+    """
+    modelo = serializers.CharField(source='content_type.model', read_only=True, default=None)
+
+    class Meta:
+        model = Trabajo
+        fields = [
+            'id', 'tipo', 'estado', 'modelo', 'objeto_id', 'campo', 'resultado',
+            'intentos', 'max_intentos', 'ultimo_error', 'disponible_en',
+            'fecha_creacion', 'fecha_actualizacion'
+        ]
+        read_only_fields = fields
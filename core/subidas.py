@@ -0,0 +1,103 @@
+# core/subidas.py
+"""
+Upload handler para los campos de imagen (settings.FILE_UPLOAD_HANDLERS).
+Mientras llega el multipart: calcula el SHA-256, reconoce el formato por los
+primeros bytes (no por el content-type del cliente) y corta la subida en cuanto
+pasa IMAGEN_TAMANO_MAXIMO o no es una imagen. El contenido va a un
+SpooledTemporaryFile (en memoria hasta FILE_UPLOAD_MAX_MEMORY_SIZE, después a
+disco) y la vista recibe ese mismo archivo, sin copias.
+"""
+import hashlib
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+from django.http.multipartparser import MultiPartParserError
+
+CAMPOS = set(getattr(settings, "IMAGEN_CAMPOS_SUBIDA", ["imagen", "foto", "image", "image_file", "upload", "file"]))
+TAMANO_MAXIMO = getattr(settings, "IMAGEN_TAMANO_MAXIMO", 10 * 1024 * 1024)
+
+# Bytes necesarios para reconocer cualquiera de los formatos de abajo
+_CABECERA = 12
+
+
+def _legible(n):
+    return f"{n / (1024 * 1024):.0f} MB" if n >= 1024 * 1024 else f"{n // 1024} KB"
+
+
+def tipo_imagen(cabecera):
+    """content-type según los primeros bytes del archivo, o None si no es una imagen conocida."""
+    if cabecera.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if cabecera.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if cabecera[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return "image/webp"
+    if cabecera.startswith(b"BM"):
+        return "image/bmp"
+    if cabecera[4:8] == b"ftyp" and cabecera[8:12] in (b"heic", b"heix", b"mif1", b"msf1", b"avif"):
+        return "image/avif" if cabecera[8:12] == b"avif" else "image/heic"
+    return None
+
+
+class ImagenSubida(UploadedFile):
+    """Imagen recibida por ImagenUploadHandler; `sha256` es el hash del contenido completo."""
+    def __init__(self, file, name, content_type, size, charset, sha256):
+        super().__init__(file, name, content_type, size, charset)
+        self.sha256 = sha256
+
+
+class ImagenUploadHandler(FileUploadHandler):
+    """
+    Toma solo los campos de CAMPOS; el resto de archivos sigue a los handlers
+    por defecto de Django. Un archivo inválido corta el parseo con un 400.
+    """
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.activo = field_name in CAMPOS
+        if not self.activo:
+            return
+        if content_length and content_length > TAMANO_MAXIMO:
+            raise MultiPartParserError(f"'{field_name}' supera el máximo de {_legible(TAMANO_MAXIMO)}")
+        self.archivo = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE, suffix=".upload", dir=settings.FILE_UPLOAD_TEMP_DIR)
+        self.hash = hashlib.sha256()
+        self.cabecera = b""
+        self.tipo = None
+        self.recibidos = 0
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.activo:
+            return raw_data
+        self.recibidos += len(raw_data)
+        if self.recibidos > TAMANO_MAXIMO:
+            self.archivo.close()
+            raise MultiPartParserError(f"'{self.field_name}' supera el máximo de {_legible(TAMANO_MAXIMO)}")
+        if self.tipo is None:
+            self.cabecera += raw_data[:_CABECERA - len(self.cabecera)]
+            if len(self.cabecera) >= _CABECERA:
+                self.tipo = tipo_imagen(self.cabecera)
+                if self.tipo is None:
+                    self.archivo.close()
+                    raise MultiPartParserError(f"'{self.field_name}' no es una imagen (JPEG, PNG, WebP, GIF, BMP o HEIC)")
+        self.hash.update(raw_data)
+        self.archivo.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        if not self.activo:
+            return None
+        if self.tipo is None:
+            # Menos de _CABECERA bytes: no puede ser una imagen válida
+            self.tipo = tipo_imagen(self.cabecera)
+            if self.tipo is None:
+                self.archivo.close()
+                raise MultiPartParserError(f"'{self.field_name}' no es una imagen (JPEG, PNG, WebP, GIF, BMP o HEIC)")
+        self.archivo.seek(0)
+        return ImagenSubida(
+            self.archivo, self.file_name, self.tipo, file_size, self.charset, self.hash.hexdigest())
@@ -0,0 +1,365 @@
+import asyncio
+import hashlib
+import tempfile
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models import F
+from django.http.multipartparser import MultiPartParserError
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.utils import timezone
+from PIL import Image
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core import almacenamiento, coalescencia, cuotas, http, subidas, trabajos
+from core.asincrono import con_lifespan
+from core.models import ConcurrenciaTrabajo, CuotaProveedor, Trabajo
+from core.pagination import KeysetPagination
+
+
+class ClientesHttpTests(SimpleTestCase):
+    def test_sin_loop_persistente_usa_la_sesion_sincrona(self):
+        respuesta = mock.Mock(status_code=200)
+        with mock.patch.object(http, "sesion") as sesion:
+            sesion.return_value.request.return_value = respuesta
+            r = async_to_sync(http.apost)("imgbb", "https://ejemplo.test/", data={"a": 1})
+        self.assertIs(r, respuesta)
+        sesion.assert_called_once_with("imgbb")
+
+    def test_errores_de_requests_se_traducen_a_httpx(self):
+        with mock.patch.object(http, "sesion") as sesion:
+            sesion.return_value.request.side_effect = requests.ConnectionError("sin red")
+            with self.assertRaises(httpx.ConnectError):
+                async_to_sync(http.apost)("imgbb", "https://ejemplo.test/")
+
+    def test_lifespan_reutiliza_y_cierra_los_clientes(self):
+        async def aplicacion(scope, receive, send):
+            pass
+
+        async def ciclo():
+            mensajes = asyncio.Queue()
+            enviados = []
+            for tipo in ("lifespan.startup", "lifespan.shutdown"):
+                mensajes.put_nowait({"type": tipo})
+
+            async def enviar(mensaje):
+                enviados.append(mensaje["type"])
+                if mensaje["type"] == "lifespan.startup.complete":
+                    clientes.append(http.cliente("luxand"))
+                    clientes.append(http.cliente("luxand"))
+
+            clientes = []
+            await con_lifespan(aplicacion)({"type": "lifespan"}, mensajes.get, enviar)
+            return clientes, enviados, http.cliente("luxand")
+
+        clientes, enviados, despues = asyncio.run(ciclo())
+        self.assertEqual(enviados, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.assertIs(clientes[0], clientes[1])
+        self.assertTrue(clientes[0].is_closed)
+        self.assertIsNone(despues)
+
+
+class CoalescenciaTests(TestCase):
+    def test_seguidores_comparten_el_resultado_del_lider(self):
+        llamadas = []
+
+        async def funcion():
+            llamadas.append(1)
+            await asyncio.sleep(0.05)
+            return {"ok": True}
+
+        async def escenario():
+            return await asyncio.gather(*(coalescencia.una_vez("clave-a", funcion) for _ in range(3)))
+
+        self.assertEqual(async_to_sync(escenario)(), [{"ok": True}] * 3)
+        self.assertEqual(len(llamadas), 1)
+
+    def test_si_el_lider_se_cancela_el_seguidor_llama_por_su_cuenta(self):
+        async def lenta():
+            await asyncio.sleep(10)
+
+        async def propia():
+            return {"de": "seguidor"}
+
+        async def escenario():
+            lider = asyncio.create_task(coalescencia.una_vez("clave-b", lenta))
+            await asyncio.sleep(0.05)
+            seguidor = asyncio.create_task(coalescencia.una_vez("clave-b", propia))
+            await asyncio.sleep(0.05)
+            lider.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await lider
+            return await seguidor
+
+        self.assertEqual(async_to_sync(escenario)(), {"de": "seguidor"})
+
+
+class TomarTrabajosTests(TestCase):
+    def _encolar(self, n, tipo="ALPR", estado="PENDIENTE"):
+        for _ in range(n):
+            Trabajo.objects.create(tipo=tipo, estado=estado)
+
+    def test_cada_trabajo_se_toma_una_sola_vez(self):
+        self._encolar(3, tipo="IMAGEN")
+        primero = trabajos.tomar_trabajos(limite=2)
+        segundo = trabajos.tomar_trabajos(limite=10)
+        self.assertEqual(len(primero), 2)
+        self.assertEqual(len(segundo), 1)
+        self.assertEqual(Trabajo.objects.filter(estado="PROCESANDO", intentos=1).count(), 3)
+
+    def test_respeta_la_concurrencia_entre_workers(self):
+        self._encolar(1, estado="PROCESANDO")
+        self._encolar(4)
+        self._encolar(2, tipo="IMAGEN")
+        with mock.patch.dict(trabajos.CONCURRENCIA, {"ALPR": 2}, clear=True):
+            primero = trabajos.tomar_trabajos(limite=10)
+            segundo = trabajos.tomar_trabajos(limite=10)
+        self.assertEqual(sorted(t.tipo for t in primero), ["ALPR", "IMAGEN", "IMAGEN"])
+        self.assertEqual(segundo, [])
+        self.assertEqual(Trabajo.objects.filter(tipo="ALPR", estado="PROCESANDO").count(), 2)
+        self.assertTrue(ConcurrenciaTrabajo.objects.filter(tipo="ALPR").exists())
+
+    def test_no_toma_trabajos_que_aun_no_estan_disponibles(self):
+        Trabajo.objects.create(tipo="IMAGEN", disponible_en=timezone.now() + timedelta(minutes=1))
+        self.assertEqual(trabajos.tomar_trabajos(), [])
+
+
+class EjecutarTrabajosTests(TestCase):
+    def _ejecutar(self, manejador, al_fallar=None):
+        Trabajo.objects.create(tipo="IMAGEN", max_intentos=2)
+        with mock.patch.dict(trabajos._MANEJADORES, {"IMAGEN": manejador}), \
+                mock.patch.dict(trabajos._AL_FALLAR, {"IMAGEN": al_fallar} if al_fallar else {}):
+            trabajos.procesar_pendientes()
+        return Trabajo.objects.get()
+
+    def test_error_temporal_reprograma_con_backoff(self):
+        def falla(trabajo):
+            raise RuntimeError("sin red")
+
+        antes = timezone.now()
+        trabajo = self._ejecutar(falla)
+        self.assertEqual((trabajo.estado, trabajo.intentos, trabajo.ultimo_error), ("PENDIENTE", 1, "sin red"))
+        self.assertGreaterEqual(trabajo.disponible_en, antes + timedelta(seconds=trabajos.BACKOFF_BASE))
+
+    def test_reintentar_en_reemplaza_al_backoff(self):
+        def cuota(trabajo):
+            raise trabajos.ErrorReintentable("cuota", reintentar_en=120)
+
+        antes = timezone.now()
+        trabajo = self._ejecutar(cuota)
+        self.assertGreaterEqual(trabajo.disponible_en, antes + timedelta(seconds=120))
+
+    def test_agotados_los_intentos_queda_fallido_y_se_puede_reintentar(self):
+        al_fallar = mock.Mock()
+
+        def falla(trabajo):
+            raise RuntimeError("sin red")
+
+        self._ejecutar(falla)
+        Trabajo.objects.update(disponible_en=timezone.now())
+        with mock.patch.dict(trabajos._MANEJADORES, {"IMAGEN": falla}), \
+                mock.patch.dict(trabajos._AL_FALLAR, {"IMAGEN": al_fallar}):
+            trabajos.procesar_pendientes()
+        trabajo = Trabajo.objects.get()
+        self.assertEqual((trabajo.estado, trabajo.intentos), ("FALLIDO", 2))
+        al_fallar.assert_called_once()
+        trabajo = trabajos.reintentar(trabajo)
+        self.assertEqual((trabajo.estado, trabajo.intentos), ("PENDIENTE", 0))
+
+    def test_error_permanente_no_se_reintenta(self):
+        def invalido(trabajo):
+            raise trabajos.ErrorPermanente("imagen corrupta")
+
+        trabajo = self._ejecutar(invalido)
+        self.assertEqual((trabajo.estado, trabajo.intentos), ("FALLIDO", 1))
+
+    def test_exito_guarda_el_resultado(self):
+        trabajo = self._ejecutar(lambda trabajo: {"url": "https://a.test/1.jpg"})
+        self.assertEqual(trabajo.estado, "COMPLETADO")
+        self.assertEqual(trabajo.resultado, {"url": "https://a.test/1.jpg"})
+
+    def test_liberar_bloqueados_devuelve_a_la_cola(self):
+        Trabajo.objects.create(tipo="IMAGEN", estado="PROCESANDO")
+        Trabajo.objects.update(fecha_actualizacion=timezone.now() - timedelta(minutes=trabajos.BLOQUEO_MINUTOS + 1))
+        self.assertEqual(trabajos.liberar_bloqueados(), 1)
+        self.assertEqual(Trabajo.objects.get().estado, "PENDIENTE")
+
+
+class CuotasTests(TestCase):
+    def setUp(self):
+        self.ahora = timezone.now()
+        patcher = mock.patch.object(cuotas.timezone, "now", lambda: self.ahora)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _reservar(self, espera_maxima=10):
+        return cuotas.reservar("luxand", por_segundo=2, rafaga=3, espera_maxima=espera_maxima)
+
+    def test_rafaga_y_luego_turnos_espaciados(self):
+        self.assertEqual([self._reservar() for _ in range(3)], [0, 0, 0])
+        # Sin tokens: cada reserva espera medio segundo más que la anterior
+        self.assertEqual([self._reservar() for _ in range(3)], [0.5, 1.0, 1.5])
+        self.assertAlmostEqual(CuotaProveedor.objects.get(proveedor="luxand").tokens, -3)
+
+    def test_se_recarga_con_el_tiempo_hasta_la_rafaga(self):
+        for _ in range(3):
+            self._reservar()
+        self.ahora += timedelta(seconds=1)
+        self.assertEqual([self._reservar() for _ in range(2)], [0, 0])
+        self.assertEqual(self._reservar(), 0.5)
+        self.ahora += timedelta(minutes=10)
+        self.assertEqual([self._reservar() for _ in range(3)], [0, 0, 0])
+
+    def test_cuota_agotada_no_reserva(self):
+        for _ in range(3):
+            self._reservar()
+        with self.assertRaises(cuotas.CuotaAgotada) as error:
+            self._reservar(espera_maxima=0.1)
+        self.assertEqual(error.exception.espera, 0.5)
+        self.assertEqual(self._reservar(), 0.5)
+
+
+def png(lado=8):
+    salida = BytesIO()
+    Image.new("RGB", (lado, lado), "red").save(salida, format="PNG")
+    return salida.getvalue()
+
+
+class SubidaDirectaTests(TestCase):
+    def setUp(self):
+        self.raiz = tempfile.TemporaryDirectory()
+        self.addCleanup(self.raiz.cleanup)
+        backend = almacenamiento.AlmacenamientoLocal(raiz=self.raiz.name, url_base="http://localhost/media/")
+        patcher = mock.patch.object(almacenamiento, "_backend", backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.usuario = User.objects.create_user("subidor")
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(self.usuario)
+
+    def _subir(self, token):
+        archivo = SimpleUploadedFile("a.png", png(), content_type="image/png")
+        return APIClient().post("/api/imagenes/subida-local/", {"token": token, "file": archivo}, format="multipart")
+
+    def _token(self):
+        return self.cliente.post("/api/imagenes/firma/").data["campos"]["token"]
+
+    def test_el_token_de_subida_es_de_un_solo_uso(self):
+        token = self._token()
+        self.assertEqual(self._subir(token).status_code, 201)
+        self.assertEqual(self._subir(token).status_code, 401)
+
+    def test_la_firma_es_del_usuario_y_de_un_solo_uso(self):
+        r = self._subir(self._token())
+        url, firma = r.data["secure_url"], r.data["signature"]
+        otro = User.objects.create_user("otro")
+        self.assertIsNone(almacenamiento.verificar_subida(url, firma, otro))
+        self.assertEqual(almacenamiento.verificar_subida(url, firma, self.usuario)["original"], url)
+        self.assertIsNone(almacenamiento.verificar_subida(url, firma, self.usuario))
+
+    def test_cloudinary_sin_api_secret_responde_400(self):
+        import cloudinary
+
+        with mock.patch.object(almacenamiento, "_backend", almacenamiento.AlmacenamientoCloudinary()), \
+                mock.patch.object(cloudinary.config(), "api_secret", None):
+            self.assertEqual(self.cliente.post("/api/imagenes/firma/").status_code, 400)
+            self.assertIsNone(almacenamiento.verificar_subida(
+                "https://res.cloudinary.com/x/image/upload/v1/imagenes/a.jpg", "firma"))
+
+    def test_la_firma_sigue_valiendo_si_el_registro_no_se_guarda(self):
+        from residencial.tests import crear_persona, crear_vehiculo
+
+        vehiculo = crear_vehiculo("FIR123", crear_persona("C-1"))
+        r = self._subir(self._token())
+        datos = {"imagen": r.data["secure_url"], "imagen_firma": r.data["signature"]}
+        invalido = self.cliente.patch(f"/api/vehiculos/{vehiculo.pk}/", dict(datos, color=""), format="json")
+        self.assertEqual(invalido.status_code, 400)
+        valido = self.cliente.patch(f"/api/vehiculos/{vehiculo.pk}/", datos, format="json")
+        self.assertEqual(valido.status_code, 200, valido.data)
+        vehiculo.refresh_from_db()
+        self.assertEqual(vehiculo.imagen, r.data["secure_url"])
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        from residencial.modelsVehiculo import Vehiculo
+        from residencial.tests import crear_persona, crear_vehiculo
+
+        persona = crear_persona("K-1")
+        # Valores repetidos y nulos en la columna de orden
+        for i, imagen in enumerate([None, "https://a.test/1", None, "https://a.test/1", "https://a.test/0",
+                                    None, "https://a.test/2"]):
+            vehiculo = crear_vehiculo(f"KEY{i:03}", persona)
+            Vehiculo.objects.filter(pk=vehiculo.pk).update(imagen=imagen)
+        self.queryset = Vehiculo.objects.all()
+        self.vista = mock.Mock(filter_backends=[], ordering=["-imagen"])
+
+    def _pagina(self, url):
+        paginador = KeysetPagination()
+        resultados = paginador.paginate_queryset(self.queryset, Request(APIRequestFactory().get(url)), self.vista)
+        return [v.pk for v in resultados], paginador.get_paginated_response([]).data
+
+    def test_recorre_todo_sin_repetir_ni_saltar(self):
+        esperado = list(self.queryset.order_by(F("imagen").desc(nulls_first=True), "pk").values_list("pk", flat=True))
+        vistos, url, paginas = [], "/api/vehiculos/?page_size=2", []
+        while url:
+            pks, datos = self._pagina(url)
+            vistos += pks
+            paginas.append((pks, datos["previous"]))
+            url = datos["next"]
+        self.assertEqual(vistos, esperado)
+        # Y hacia atrás desde la última página se recupera la anterior
+        pks, _ = self._pagina(paginas[-1][1])
+        self.assertEqual(pks, paginas[-2][0])
+
+    def test_total_opcional(self):
+        _, datos = self._pagina("/api/vehiculos/?page_size=2")
+        self.assertNotIn("count", datos)
+        _, datos = self._pagina("/api/vehiculos/?page_size=2&count=exact")
+        self.assertEqual(datos["count"], 7)
+        self.assertFalse(datos["count_is_estimate"])
+
+    def test_cursor_invalido(self):
+        with self.assertRaises(NotFound):
+            self._pagina("/api/vehiculos/?cursor=no-es-un-cursor")
+
+
+class ImagenUploadHandlerTests(SimpleTestCase):
+    def _archivos(self, contenido, campo="imagen"):
+        archivo = SimpleUploadedFile("a.bin", contenido, content_type="image/png")
+        request = RequestFactory().post("/", {campo: archivo, "nombre": "x"})
+        request.upload_handlers = [subidas.ImagenUploadHandler(request)]
+        return request.FILES
+
+    def test_imagen_valida_con_hash_y_tipo_por_contenido(self):
+        contenido = png()
+        subida = self._archivos(contenido)["imagen"]
+        self.assertIsInstance(subida, subidas.ImagenSubida)
+        self.assertEqual(subida.content_type, "image/png")
+        self.assertEqual(subida.sha256, hashlib.sha256(contenido).hexdigest())
+        self.assertEqual(subida.read(), contenido)
+
+    def test_rechaza_lo_que_no_es_imagen(self):
+        with self.assertRaisesMessage(MultiPartParserError, "no es una imagen"):
+            self._archivos(b"%PDF-1.4 esto no es una imagen")
+        with self.assertRaisesMessage(MultiPartParserError, "no es una imagen"):
+            self._archivos(b"GIF")
+
+    def test_corta_al_superar_el_tamano_maximo(self):
+        with mock.patch.object(subidas, "TAMANO_MAXIMO", 1024):
+            with self.assertRaisesMessage(MultiPartParserError, "supera el máximo"):
+                self._archivos(png(lado=200) + bytes(4096))
+
+    def test_otros_campos_siguen_sin_validar(self):
+        archivo = SimpleUploadedFile("a.txt", b"texto", content_type="text/plain")
+        request = RequestFactory().post("/", {"adjunto": archivo})
+        request.upload_handlers = [subidas.ImagenUploadHandler(request)] + request.upload_handlers
+        self.assertEqual(request.FILES["adjunto"].read(), b"texto")
@@ -0,0 +1,229 @@
+# core/trabajos.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ConcurrenciaTrabajo, Trabajo
+
+BACKOFF_BASE = getattr(settings, "TRABAJOS_BACKOFF_BASE", 5)      # segundos
+BACKOFF_MAX = getattr(settings, "TRABAJOS_BACKOFF_MAX", 600)      # segundos
+MAX_INTENTOS = getattr(settings, "TRABAJOS_MAX_INTENTOS", 5)
+BLOQUEO_MINUTOS = getattr(settings, "TRABAJOS_BLOQUEO_MINUTOS", 10)
+# Máximo de trabajos PROCESANDO a la vez por tipo, sumando todos los workers
+CONCURRENCIA = getattr(settings, "TRABAJOS_CONCURRENCIA", {})
+
+_MANEJADORES = {}
+_AL_FALLAR = {}
+
+
+class ErrorReintentable(Exception):
+    """
+    Error temporal (red, cuota): el trabajo vuelve a la cola.
+    `reintentar_en` (segundos) reemplaza al backoff exponencial si se indica.
+    """
+    def __init__(self, mensaje, reintentar_en=None):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+
+class ErrorPermanente(Exception):
+    """Error que no se arregla reintentando: el trabajo queda FALLIDO."""
+
+
+def manejador(tipo, al_fallar=None):
+    """
+    Registra la función que procesa los trabajos de un tipo.
+    La función recibe el Trabajo y devuelve el `resultado` (JSON).
+    `al_fallar(trabajo, error)` se llama cuando el trabajo queda FALLIDO.
+    """
+    def decorador(func):
+        _MANEJADORES[tipo] = func
+        if al_fallar:
+            _AL_FALLAR[tipo] = al_fallar
+        return func
+    return decorador
+
+
+def encolar(tipo, modelo=None, objeto_id=None, campo="", archivo=None, nombre_archivo="", parametros=None, clave=None):
+    """
+    Crea un trabajo PENDIENTE. `modelo` puede ser la clase o una instancia.
+    Con `clave`, si ya hay un trabajo activo con la misma clave se devuelve ese.
+    """
+    content_type = None
+    if modelo is not None:
+        content_type = ContentType.objects.get_for_model(modelo, for_concrete_model=True)
+        if objeto_id is None and not isinstance(modelo, type):
+            objeto_id = modelo.pk
+    if clave:
+        existente = Trabajo.objects.filter(clave=clave, estado__in=['PENDIENTE', 'PROCESANDO']).first()
+        if existente:
+            return existente
+    try:
+        with transaction.atomic():
+            return Trabajo.objects.create(
+                tipo=tipo,
+                content_type=content_type,
+                objeto_id=objeto_id,
+                campo=campo,
+                clave=clave,
+                archivo=archivo,
+                nombre_archivo=nombre_archivo or "",
+                parametros=parametros or {},
+                max_intentos=MAX_INTENTOS,
+            )
+    except IntegrityError:
+        # Otro proceso lo encoló al mismo tiempo
+        existente = Trabajo.objects.filter(clave=clave, estado__in=['PENDIENTE', 'PROCESANDO']).first()
+        if existente is None:
+            raise
+        return existente
+
+
+def tomar_trabajos(limite=10, tipos=None):
+    """
+    Reserva hasta `limite` trabajos listos. Con SKIP LOCKED varios workers
+    pueden tomar de la misma cola sin pisarse; los cupos de los tipos con
+    concurrencia limitada se cuentan con la fila del tipo bloqueada.
+    """
+    ahora = timezone.now()
+    limitados = sorted(t for t in CONCURRENCIA if not tipos or t in tipos)
+    with transaction.atomic():
+        # Hasta el commit ningún otro worker cuenta cupos de estos tipos
+        _bloquear_tipos(limitados)
+        qs = (Trabajo.objects.select_for_update(skip_locked=True)
+              .filter(estado='PENDIENTE', disponible_en__lte=ahora))
+        if tipos:
+            qs = qs.filter(tipo__in=tipos)
+        # Cupos libres de los tipos con concurrencia limitada; los que están al tope no se toman
+        cupos = {t: CONCURRENCIA[t] - Trabajo.objects.filter(tipo=t, estado='PROCESANDO').count()
+                 for t in limitados}
+        llenos = [t for t, libres in cupos.items() if libres <= 0]
+        if llenos:
+            qs = qs.exclude(tipo__in=llenos)
+        trabajos = _respetar_concurrencia(list(qs.order_by('disponible_en', 'id')[:limite]), cupos)
+        if trabajos:
+            Trabajo.objects.filter(id__in=[t.id for t in trabajos]).update(
+                estado='PROCESANDO', intentos=F('intentos') + 1, fecha_actualizacion=ahora
+            )
+    for t in trabajos:
+        t.estado = 'PROCESANDO'
+        t.intentos += 1
+    return trabajos
+
+
+def _bloquear_tipos(tipos):
+    """Bloquea las filas de concurrencia_trabajo de `tipos` (en orden, sin deadlocks); las crea si faltan."""
+    if not tipos:
+        return
+    existentes = set(ConcurrenciaTrabajo.objects.filter(tipo__in=tipos).values_list('tipo', flat=True))
+    for tipo in set(tipos) - existentes:
+        try:
+            with transaction.atomic():
+                ConcurrenciaTrabajo.objects.create(tipo=tipo)
+        except IntegrityError:
+            pass  # la creó otro worker
+    list(ConcurrenciaTrabajo.objects.select_for_update().filter(tipo__in=tipos).order_by('tipo'))
+
+
+def _respetar_concurrencia(trabajos, cupos):
+    elegidos = []
+    for t in trabajos:
+        if t.tipo in cupos:
+            if cupos[t.tipo] <= 0:
+                continue
+            cupos[t.tipo] -= 1
+        elegidos.append(t)
+    return elegidos
+
+
+def ejecutar(trabajo):
+    """
+    Ejecuta un trabajo ya reservado y guarda su estado final o lo reprograma.
+    """
+    func = _MANEJADORES.get(trabajo.tipo)
+    if func is None:
+        _marcar_fallido(trabajo, f"No hay manejador para el tipo {trabajo.tipo}")
+        return
+    try:
+        resultado = func(trabajo)
+    except ErrorPermanente as e:
+        _marcar_fallido(trabajo, str(e))
+    except ErrorReintentable as e:
+        _reprogramar(trabajo, str(e), e.reintentar_en)
+    except Exception as e:
+        _reprogramar(trabajo, str(e))
+    else:
+        Trabajo.objects.filter(id=trabajo.id).update(
+            estado='COMPLETADO', resultado=resultado, archivo=None,
+            ultimo_error=None, fecha_actualizacion=timezone.now()
+        )
+        trabajo.estado = 'COMPLETADO'
+        trabajo.resultado = resultado
+
+
+def procesar_pendientes(limite=10, tipos=None):
+    """
+    Toma y ejecuta un lote. Devuelve cuántos trabajos se procesaron.
+    """
+    trabajos = tomar_trabajos(limite, tipos)
+    for trabajo in trabajos:
+        ejecutar(trabajo)
+    return len(trabajos)
+
+
+def liberar_bloqueados(minutos=BLOQUEO_MINUTOS):
+    """
+    Devuelve a la cola los trabajos que quedaron PROCESANDO porque su worker murió.
+    """
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return Trabajo.objects.filter(estado='PROCESANDO', fecha_actualizacion__lt=limite).update(
+        estado='PENDIENTE', fecha_actualizacion=timezone.now()
+    )
+
+
+def reintentar(trabajo):
+    """
+    Vuelve a poner en cola un trabajo FALLIDO, con los intentos en cero.
+    """
+    if trabajo.clave:
+        activo = Trabajo.objects.filter(clave=trabajo.clave, estado__in=['PENDIENTE', 'PROCESANDO']).first()
+        if activo:
+            return activo
+    Trabajo.objects.filter(id=trabajo.id).update(
+        estado='PENDIENTE', intentos=0, disponible_en=timezone.now(), fecha_actualizacion=timezone.now()
+    )
+    trabajo.refresh_from_db()
+    return trabajo
+
+
+def _reprogramar(trabajo, error, reintentar_en=None):
+    if trabajo.intentos >= trabajo.max_intentos:
+        _marcar_fallido(trabajo, error)
+        return
+    if reintentar_en is None:
+        reintentar_en = min(BACKOFF_BASE * (2 ** (trabajo.intentos - 1)), BACKOFF_MAX)
+    print(f"[Trabajos] {trabajo} intento {trabajo.intentos}/{trabajo.max_intentos} falló: {error}. Reintento en {reintentar_en}s")
+    Trabajo.objects.filter(id=trabajo.id).update(
+        estado='PENDIENTE', ultimo_error=error,
+        disponible_en=timezone.now() + timedelta(seconds=reintentar_en),
+        fecha_actualizacion=timezone.now()
+    )
+    trabajo.estado = 'PENDIENTE'
+
+
+def _marcar_fallido(trabajo, error):
+    print(f"[Trabajos] {trabajo} falló definitivamente: {error}")
+    Trabajo.objects.filter(id=trabajo.id).update(
+        estado='FALLIDO', ultimo_error=error, fecha_actualizacion=timezone.now()
+    )
+    trabajo.estado = 'FALLIDO'
+    al_fallar = _AL_FALLAR.get(trabajo.tipo)
+    if al_fallar:
+        try:
+            al_fallar(trabajo, error)
+        except Exception as e:
+            print(f"[Trabajos] Error en al_fallar de {trabajo}: {e}")
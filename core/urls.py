@@ -0,0 +1,13 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import TrabajoViewSet, MetricasProveedoresView, FirmaSubidaView, SubidaLocalView
+
+router = DefaultRouter()
+router.register(r'trabajos', TrabajoViewSet, basename='trabajos')
+
+urlpatterns = [
+    path('', include(router.urls)),
+    path('proveedores/metricas/', MetricasProveedoresView.as_view(), name='metricas-proveedores'),
+    path('imagenes/firma/', FirmaSubidaView.as_view(), name='firma-subida'),
+    path('imagenes/subida-local/', SubidaLocalView.as_view(), name='subida-local'),
+]
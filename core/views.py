@@ -0,0 +1,106 @@
+from rest_framework import viewsets, filters, status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from . import http
+from .almacenamiento import AlmacenamientoLocal, almacenamiento
+from .models import Trabajo
+from .serializers.serializersTrabajo import TrabajoSerializer
+from .trabajos import reintentar as reintentar_trabajo
+
+
+class TrabajoViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Estado de los trabajos en segundo plano (p. ej. la subida de una imagen)
+    """
+    queryset = Trabajo.objects.select_related('content_type').defer('archivo')
+    serializer_class = TrabajoSerializer
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['fecha_creacion', 'fecha_actualizacion']
+    ordering = ['-fecha_creacion']
+
+    def get_queryset(self):
+        """
+        Filtrar por tipo, estado o registro (?modelo=persona&objeto_id=5)
+        """
+        queryset = super().get_queryset()
+
+        tipo = self.request.query_params.get('tipo', None)
+        if tipo:
+            queryset = queryset.filter(tipo=tipo)
+
+        estado = self.request.query_params.get('estado', None)
+        if estado:
+            queryset = queryset.filter(estado=estado)
+
+        modelo = self.request.query_params.get('modelo', None)
+        if modelo:
+            queryset = queryset.filter(content_type__model=modelo.lower())
+
+        objeto_id = self.request.query_params.get('objeto_id', None)
+        if objeto_id:
+            queryset = queryset.filter(objeto_id=objeto_id)
+
+        return queryset
+
+    @action(detail=True, methods=["post"])
+    def reintentar(self, request, pk=None):
+        """
+        Vuelve a encolar un trabajo fallido
+        """
+        trabajo = self.get_object()
+        if trabajo.estado != 'FALLIDO':
+            return Response({"detail": "Solo se pueden reintentar trabajos fallidos."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(TrabajoSerializer(reintentar_trabajo(trabajo)).data)
+
+
+class MetricasProveedoresView(APIView):
+    """
+    Reutilización del pool de conexiones hacia Luxand, PlateRecognizer e ImgBB
+    (por worker: cada proceso de gunicorn tiene sus propios pools).
+    """
+    def get(self, request, *args, **kwargs):
+        return Response(http.metricas())
+
+
+class FirmaSubidaView(APIView):
+    """
+    Parámetros firmados para subir una imagen directo al almacenamiento.
+    El cliente hace POST multipart a `url` con `campos` y el archivo en `file`;
+    después crea/edita el registro mandando `imagen` (o `foto`) con la `secure_url`
+    de la respuesta y `imagen_firma` (o `foto_firma`) con su `signature`.
+    """
+    def post(self, request, *args, **kwargs):
+        parametros = almacenamiento().firmar_subida(request)
+        if parametros is None:
+            return Response({"detail": "El almacenamiento configurado no admite subidas directas."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(parametros)
+
+
+class SubidaLocalView(APIView):
+    """
+    Sustituto local del endpoint de subida de Cloudinary (ALMACENAMIENTO_IMAGENES=local).
+    Se autentica con el token de FirmaSubidaView (un solo uso, atado al usuario que
+    lo pidió); responde secure_url y signature.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        backend = almacenamiento()
+        if not isinstance(backend, AlmacenamientoLocal):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        archivo = request.FILES.get("file")
+        if archivo is None:
+            return Response({"error": {"message": "Falta el archivo (file)"}}, status=status.HTTP_400_BAD_REQUEST)
+        token = backend.usar_token(request.data.get("token", ""))
+        if token is None:
+            return Response({"error": {"message": "Token de subida inválido, vencido o ya usado"}},
+                            status=status.HTTP_401_UNAUTHORIZED)
+        urls = backend.guardar_imagen(archivo.read(), archivo.name)
+        return Response({"secure_url": urls["original"], "signature": backend.firmar_resultado(urls, token)},
+                        status=status.HTTP_201_CREATED)
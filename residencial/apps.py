@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ResidencialConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'residencial'
+
+    def ready(self):
+        # Invalida el mapa de placas en memoria cuando cambia un Vehiculo
+        from . import placas  # noqa: F401
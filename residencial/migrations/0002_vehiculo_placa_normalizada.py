@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:34
+
+import re
+
+from django.db import migrations, models
+
+
+def llenar_placa_normalizada(apps, schema_editor):
+    # Las placas repetidas (p.ej. "ABC-123" y "abc 123") se corrigen a mano antes de
+    # migrar: dejar una en NULL la sacaría del reconocimiento y su próximo save() chocaría
+    Vehiculo = apps.get_model('residencial', 'Vehiculo')
+    por_placa = {}
+    for v in Vehiculo.objects.order_by('id').only('id', 'placa'):
+        normalizada = re.sub(r"[^0-9A-Z]", "", (v.placa or "").upper())
+        if normalizada:
+            por_placa.setdefault(normalizada, []).append(v)
+    repetidas = {p: vs for p, vs in por_placa.items() if len(vs) > 1}
+    if repetidas:
+        detalle = "\n".join(f"  {p}: " + ", ".join(f"id={v.id} ({v.placa!r})" for v in vs)
+                             for p, vs in sorted(repetidas.items()))
+        raise RuntimeError(
+            "Hay vehículos con la misma placa (sin contar mayúsculas, espacios ni guiones). "
+            f"Corrija o borre los repetidos y vuelva a migrar:\n{detalle}")
+    for normalizada, (v,) in por_placa.items():
+        Vehiculo.objects.filter(id=v.id).update(placa_normalizada=normalizada)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residencial', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehiculo',
+            name='placa_normalizada',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='Placa normalizada'),
+        ),
+        migrations.RunPython(llenar_placa_normalizada, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='vehiculo',
+            name='placa_normalizada',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, unique=True, verbose_name='Placa normalizada'),
+        ),
+    ]
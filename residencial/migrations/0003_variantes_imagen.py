@@ -0,0 +1,43 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residencial', '0002_vehiculo_placa_normalizada'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mascota',
+            name='foto_mediana',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Foto (mediana)'),
+        ),
+        migrations.AddField(
+            model_name='mascota',
+            name='foto_miniatura',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Foto (miniatura)'),
+        ),
+        migrations.AddField(
+            model_name='unidad',
+            name='imagen_mediana',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (mediana)'),
+        ),
+        migrations.AddField(
+            model_name='unidad',
+            name='imagen_miniatura',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (miniatura)'),
+        ),
+        migrations.AddField(
+            model_name='vehiculo',
+            name='imagen_mediana',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (mediana)'),
+        ),
+        migrations.AddField(
+            model_name='vehiculo',
+            name='imagen_miniatura',
+            field=models.URLField(blank=True, editable=False, null=True, verbose_name='Imagen (miniatura)'),
+        ),
+    ]
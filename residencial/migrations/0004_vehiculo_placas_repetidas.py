@@ -0,0 +1,34 @@
+import re
+
+from django.db import migrations
+
+
+def revisar_placas_repetidas(apps, schema_editor):
+    # Una versión anterior de 0002 dejaba en NULL la placa_normalizada de los repetidos;
+    # esos vehículos no se reconocían y su próximo save() fallaba por el índice único
+    Vehiculo = apps.get_model('residencial', 'Vehiculo')
+    sueltos = []
+    for v in Vehiculo.objects.filter(placa_normalizada__isnull=True).order_by('id').only('id', 'placa'):
+        normalizada = re.sub(r"[^0-9A-Z]", "", (v.placa or "").upper())
+        if not normalizada:
+            continue
+        duenio = Vehiculo.objects.filter(placa_normalizada=normalizada).only('id').first()
+        if duenio is None:
+            Vehiculo.objects.filter(id=v.id).update(placa_normalizada=normalizada)
+        else:
+            sueltos.append(f"  {normalizada}: id={duenio.id}, id={v.id} ({v.placa!r})")
+    if sueltos:
+        raise RuntimeError(
+            "Hay vehículos con la misma placa (sin contar mayúsculas, espacios ni guiones). "
+            "Corrija o borre los repetidos y vuelva a migrar:\n" + "\n".join(sueltos))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residencial', '0003_variantes_imagen'),
+    ]
+
+    operations = [
+        migrations.RunPython(revisar_placas_repetidas, migrations.RunPython.noop),
+    ]
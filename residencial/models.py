@@ -162,6 +162,9 @@ class Mascota(models.Model):
         verbose_name="Tipo"
     )
     foto = models.URLField(blank=True, null=True, verbose_name='Foto')
+    # Variantes generadas al subir la foto (core/almacenamiento.py); las usan los listados
+    foto_miniatura = models.URLField(blank=True, null=True, editable=False, verbose_name='Foto (miniatura)')
+    foto_mediana = models.URLField(blank=True, null=True, editable=False, verbose_name='Foto (mediana)')
     nombre = models.CharField(max_length=50, verbose_name="Nombre de la Mascota")
     raza = models.CharField(max_length=50, blank=True, null=True, verbose_name="Raza")
     fecha_nacimiento = models.DateField(blank=True, null=True, verbose_name="Fecha de Nacimiento")
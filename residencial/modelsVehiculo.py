@@ -1,6 +1,14 @@
+import re
+
 from django.db import models
 from django.utils import timezone
 
+
+def normalizar_placa(placa):
+    """Forma canónica de una placa: mayúsculas, sin espacios, guiones ni otros separadores."""
+    return re.sub(r"[^0-9A-Z]", "", (placa or "").upper())
+
+
 class Vehiculo(models.Model):
     TIPO_CHOICES = [
         ('Automóvil', 'Automóvil'),
@@ -16,8 +24,13 @@ class Vehiculo(models.Model):
     marca = models.CharField(max_length=20, verbose_name='Marca')
     modelo = models.CharField(max_length=20, verbose_name='Modelo')
     placa = models.CharField(max_length=20, verbose_name='Placa')
+    # Se llena en save(); es la columna que usan las búsquedas (índice único)
+    placa_normalizada = models.CharField(max_length=20, unique=True, null=True, blank=True, editable=False, verbose_name='Placa normalizada')
     tipo = models.CharField(max_length=20, choices=TIPO_CHOICES, verbose_name='Tipo')
     imagen = models.URLField(blank=True, null=True, verbose_name='Imagen')
+    # Variantes generadas al subir la imagen (core/almacenamiento.py); las usan los listados
+    imagen_miniatura = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (miniatura)')
+    imagen_mediana = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (mediana)')
     fecha_registro = models.DateTimeField(auto_now_add=True, verbose_name='Fecha de Registro')
     persona = models.ForeignKey('administracion.Persona',on_delete=models.CASCADE,verbose_name='Propietario')
     
@@ -30,6 +43,13 @@ class Vehiculo(models.Model):
     def __str__(self):
         return f"{self.marca} {self.modelo} - {self.placa}"
 
+    def save(self, *args, **kwargs):
+        self.placa_normalizada = normalizar_placa(self.placa) or None
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "placa" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"placa_normalizada"}
+        super().save(*args, **kwargs)
+
 class Bloque(models.Model):
     id = models.AutoField(primary_key=True)
     nombre = models.CharField(max_length=20, verbose_name="Nombre del Bloque")
@@ -63,6 +83,9 @@ class Unidad(models.Model):
     codigo = models.CharField(max_length=20, unique=True, verbose_name="Código de Unidad")
     descripcion = models.TextField(blank=True, null=True, verbose_name="Descripción")
     imagen = models.URLField(blank=True, null=True, verbose_name='Imagen')
+    # Variantes generadas al subir la imagen (core/almacenamiento.py); las usan los listados
+    imagen_miniatura = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (miniatura)')
+    imagen_mediana = models.URLField(blank=True, null=True, editable=False, verbose_name='Imagen (mediana)')
     dimensiones = models.CharField(max_length=100, blank=True, null=True, verbose_name="Dimensiones")
     tipo_unidad = models.CharField(max_length=1, choices=TIPO_UNIDAD_CHOICES, default='A', verbose_name="Tipo de Unidad")
     estado = models.CharField(max_length=1, choices=ESTADO_CHOICES, default='D', verbose_name="Estado")
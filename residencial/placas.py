@@ -0,0 +1,249 @@
+# residencial/placas.py
+import threading
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache_local import CacheLocal
+from .modelsVehiculo import Vehiculo, normalizar_placa
+
+# Caracteres que el OCR confunde entre sí; cada grupo se reduce a un representante
+CONFUSIONES = {
+    "O": "0", "Q": "0", "D": "0",
+    "I": "1", "L": "1",
+    "B": "8",
+    "S": "5",
+    "Z": "2",
+    "G": "6",
+}
+# Costo de cambiar un carácter por otro de su mismo grupo (0/O, 1/I, 8/B, ...)
+COSTO_CONFUSION = 0.25
+MAX_DISTANCIA = getattr(settings, "PLACAS_FUZZY_MAX_DISTANCIA", 2)
+CONFIANZA_MINIMA = getattr(settings, "PLACAS_FUZZY_CONFIANZA_MIN", 0.6)
+# Ventaja mínima de la mejor coincidencia sobre la segunda para aceptarla sola
+MARGEN_MINIMO = getattr(settings, "PLACAS_FUZZY_MARGEN", 0.1)
+
+# Un solo item: el índice completo de este worker
+_cache = CacheLocal(ttl=getattr(settings, "PLACAS_CACHE_TTL", 60), max_items=1)
+
+
+def canonica(placa):
+    """Placa normalizada con los caracteres confundibles reducidos (B0S -> 805)."""
+    return "".join(CONFUSIONES.get(c, c) for c in normalizar_placa(placa))
+
+
+def levenshtein(a, b):
+    previa = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i]
+        for j, cb in enumerate(b, 1):
+            actual.append(min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + (ca != cb)))
+        previa = actual
+    return previa[-1]
+
+
+def distancia_ponderada(a, b):
+    """
+    Edición con pesos: insertar/borrar (carácter perdido) = 1, sustitución = 1,
+    sustitución entre caracteres confundibles = COSTO_CONFUSION.
+    """
+    previa = [float(j) for j in range(len(b) + 1)]
+    for i, ca in enumerate(a, 1):
+        actual = [float(i)]
+        for j, cb in enumerate(b, 1):
+            if ca == cb:
+                costo = 0.0
+            elif CONFUSIONES.get(ca, ca) == CONFUSIONES.get(cb, cb):
+                costo = COSTO_CONFUSION
+            else:
+                costo = 1.0
+            actual.append(min(previa[j] + 1, actual[j - 1] + 1, previa[j - 1] + costo))
+        previa = actual
+    return previa[-1]
+
+
+def solo_confusiones(leida, registrada):
+    """True si las placas difieren solo en caracteres que el OCR confunde (0/O, 1/I, 8/B, ...)."""
+    leida, registrada = normalizar_placa(leida), normalizar_placa(registrada)
+    return len(leida) == len(registrada) and canonica(leida) == canonica(registrada)
+
+
+def aceptable(coincidencias):
+    """
+    La mejor coincidencia de buscar_similares si se puede aceptar sin revisión humana:
+    confianza >= CONFIANZA_MINIMA, todas sus diferencias son confusiones de OCR y le
+    saca MARGEN_MINIMO a la segunda. Si no, None (empates, sustituciones cualquiera).
+    """
+    if not coincidencias:
+        return None
+    mejor = coincidencias[0]
+    if mejor["confianza"] < CONFIANZA_MINIMA or not mejor["solo_confusiones"]:
+        return None
+    if len(coincidencias) > 1 and mejor["confianza"] - coincidencias[1]["confianza"] < MARGEN_MINIMO:
+        return None
+    return mejor
+
+
+def _borrados(clave, n):
+    """Todas las variantes de `clave` con hasta `n` caracteres borrados (incluida ella misma)."""
+    variantes = {clave}
+    frontera = {clave}
+    for _ in range(n):
+        frontera = {v[:i] + v[i + 1:] for v in frontera for i in range(len(v))}
+        variantes |= frontera
+    return variantes
+
+
+class IndicePlacas:
+    """
+    Índice en memoria de las placas registradas:
+      - `exactas`: placa normalizada -> vehiculo_id (match exacto O(1))
+      - índice de borrados sobre la forma canónica: cada variante con hasta MAX_DISTANCIA
+        caracteres borrados -> ids. Dos placas a <= k ediciones comparten alguna variante,
+        así que una búsqueda aproximada son unos pocos lookups en dict más una verificación.
+    Altas, bajas y cambios de placa se aplican en su lugar, sin reconstruir.
+    """
+    def __init__(self, vehiculos=(), max_distancia=MAX_DISTANCIA):
+        self._lock = threading.Lock()
+        self.max_distancia = max_distancia
+        self.exactas = {}
+        self._placa_de = {}
+        self._variantes = {}
+        for vehiculo_id, placa in vehiculos:
+            self.agregar(vehiculo_id, placa)
+
+    @classmethod
+    def desde_bd(cls):
+        return cls(Vehiculo.objects.exclude(placa_normalizada__isnull=True)
+                   .values_list("id", "placa_normalizada"))
+
+    def agregar(self, vehiculo_id, placa):
+        """Alta o cambio de placa de un vehículo; sin placa equivale a quitarlo."""
+        normalizada = normalizar_placa(placa)
+        with self._lock:
+            self._quitar(vehiculo_id)
+            if not normalizada:
+                return
+            self.exactas[normalizada] = vehiculo_id
+            self._placa_de[vehiculo_id] = normalizada
+            for variante in _borrados(canonica(normalizada), self.max_distancia):
+                self._variantes.setdefault(variante, set()).add(vehiculo_id)
+
+    def quitar(self, vehiculo_id):
+        with self._lock:
+            self._quitar(vehiculo_id)
+
+    def _quitar(self, vehiculo_id):
+        normalizada = self._placa_de.pop(vehiculo_id, None)
+        if normalizada is None:
+            return
+        if self.exactas.get(normalizada) == vehiculo_id:
+            del self.exactas[normalizada]
+        for variante in _borrados(canonica(normalizada), self.max_distancia):
+            ids = self._variantes.get(variante)
+            if ids is not None:
+                ids.discard(vehiculo_id)
+                if not ids:
+                    del self._variantes[variante]
+
+    def cercanas(self, placa, radio=None):
+        """[(vehiculo_id, placa_normalizada)] cuya forma canónica está a <= radio ediciones."""
+        radio = self.max_distancia if radio is None else min(radio, self.max_distancia)
+        clave = canonica(placa)
+        if not clave:
+            return []
+        with self._lock:
+            posibles = set()
+            for variante in _borrados(clave, radio):
+                posibles |= self._variantes.get(variante, set())
+            candidatas = [(i, self._placa_de[i]) for i in posibles]
+        return [(i, p) for i, p in candidatas if levenshtein(clave, canonica(p)) <= radio]
+
+
+def _indice():
+    indice = _cache.get("indice")
+    if indice is None:
+        indice = IndicePlacas.desde_bd()
+        _cache.set("indice", indice)
+    return indice
+
+
+def buscar_vehiculo_id(placa):
+    """
+    Devuelve el id del Vehiculo con esa placa (cualquier formato) o None.
+    Es una búsqueda en un dict en memoria; el índice se actualiza al cambiar un Vehiculo
+    en este worker y se recarga al vencer el TTL (cambios hechos en otros workers).
+    """
+    normalizada = normalizar_placa(placa)
+    if not normalizada:
+        return None
+    return _indice().exactas.get(normalizada)
+
+
+def buscar_vehiculo(placa):
+    """
+    Igual que buscar_vehiculo_id pero devuelve el Vehiculo (una consulta por PK solo si hay match).
+    Si el índice quedó viejo (el vehículo cambió de placa o se volvió a registrar en otro
+    worker) se descarta y la placa se busca directo en la BD (índice único).
+    """
+    vehiculo_id = buscar_vehiculo_id(placa)
+    if vehiculo_id is None:
+        return None
+    vehiculo = Vehiculo.objects.select_related("persona").filter(pk=vehiculo_id).first()
+    if vehiculo is None or vehiculo.placa_normalizada != normalizar_placa(placa):
+        _cache.invalidar()
+        vehiculo = Vehiculo.objects.select_related("persona").filter(placa_normalizada=normalizar_placa(placa)).first()
+    return vehiculo
+
+
+def buscar_similares(lecturas, limite=5, radio=None):
+    """
+    Coincidencias aproximadas para las lecturas del ALPR: [(placa, score), ...]
+    (la mejor lectura y sus `candidates`). Devuelve una lista ordenada por confianza:
+      [{vehiculo_id, placa, lectura, distancia, confianza, solo_confusiones}]
+    confianza = score de la lectura * (1 - distancia ponderada / largo de la placa).
+    Para aceptar una sin revisión usar aceptable().
+    """
+    indice = _indice()
+    mejores = {}
+    for placa, score in lecturas:
+        leida = normalizar_placa(placa)
+        if not leida:
+            continue
+        for vehiculo_id, registrada in indice.cercanas(leida, radio):
+            distancia = distancia_ponderada(leida, registrada)
+            confianza = float(score or 0.0) * max(0.0, 1 - distancia / max(len(leida), len(registrada)))
+            previa = mejores.get(vehiculo_id)
+            if previa is None or confianza > previa["confianza"]:
+                mejores[vehiculo_id] = {
+                    "vehiculo_id": vehiculo_id,
+                    "placa": registrada,
+                    "lectura": leida,
+                    "distancia": round(distancia, 2),
+                    "confianza": round(confianza, 4),
+                    "solo_confusiones": solo_confusiones(leida, registrada),
+                }
+    return sorted(mejores.values(), key=lambda m: (-m["confianza"], m["distancia"]))[:limite]
+
+
+def placa_en_uso(placa, excluir_pk=None):
+    """Validación de escritura: siempre contra la BD (índice único), nunca contra el índice en memoria."""
+    qs = Vehiculo.objects.filter(placa_normalizada=normalizar_placa(placa))
+    if excluir_pk is not None:
+        qs = qs.exclude(pk=excluir_pk)
+    return qs.exists()
+
+
+@receiver(post_save, sender=Vehiculo)
+def actualizar_indice(sender, instance, **kwargs):
+    indice = _cache.get("indice")
+    if indice is not None:
+        indice.agregar(instance.pk, instance.placa_normalizada)
+
+
+@receiver(post_delete, sender=Vehiculo)
+def quitar_del_indice(sender, instance, **kwargs):
+    indice = _cache.get("indice")
+    if indice is not None:
+        indice.quitar(instance.pk)
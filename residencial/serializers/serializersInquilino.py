@@ -4,7 +4,8 @@ from administracion.models import Persona
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from datetime import date
-from ..modelsVehiculo import Vehiculo
+from ..modelsVehiculo import Vehiculo, normalizar_placa
+from ..placas import placa_en_uso
 
 
 
@@ -17,19 +18,20 @@ class InquilinoSerializer(serializers.ModelSerializer):
     propietario_ci = serializers.CharField(source='propietario.CI', read_only=True)
     nombre_completo = serializers.ReadOnlyField()
     luxand_uuid = serializers.ReadOnlyField()
+    luxand_estado = serializers.ReadOnlyField()
     
     class Meta:
         model = Inquilino
         fields = [
             # Atributos heredados de Persona
-            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'estado', 'sexo', 
-            'tipo', 'fecha_registro', 'CI', 'fecha_nacimiento', 'nombre_completo', 'luxand_uuid',
+            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'imagen_miniatura', 'imagen_mediana', 'estado', 'sexo', 
+            'tipo', 'fecha_registro', 'CI', 'fecha_nacimiento', 'nombre_completo', 'luxand_uuid', 'luxand_estado',
             # Atributos específicos de Inquilino
             'propietario', 'fecha_inicio', 'fecha_fin', 'estado_inquilino',
             # Campos calculados
             'propietario_nombre', 'propietario_ci'
         ]
-        read_only_fields = ['id', 'fecha_registro', 'tipo', 'nombre_completo', 'luxand_uuid']
+        read_only_fields = ['id', 'fecha_registro', 'tipo', 'nombre_completo', 'luxand_uuid', 'luxand_estado']
     
     def validate_fecha_fin(self, value):
         """
@@ -75,13 +77,14 @@ class InquilinoListSerializer(serializers.ModelSerializer):
     propietario_ci = serializers.CharField(source='propietario.CI', read_only=True)
     nombre_completo = serializers.ReadOnlyField()
     luxand_uuid = serializers.ReadOnlyField()
+    luxand_estado = serializers.ReadOnlyField()
     
     class Meta:
         model = Inquilino
         fields = [
             # Atributos heredados de Persona
-            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'estado', 'sexo', 
-            'tipo', 'fecha_registro', 'CI', 'fecha_nacimiento', 'nombre_completo', 'luxand_uuid',
+            'id', 'nombre', 'apellido', 'telefono', 'imagen', 'imagen_miniatura', 'imagen_mediana', 'estado', 'sexo', 
+            'tipo', 'fecha_registro', 'CI', 'fecha_nacimiento', 'nombre_completo', 'luxand_uuid', 'luxand_estado',
             # Atributos específicos de Inquilino
             'propietario', 'fecha_inicio', 'fecha_fin', 'estado_inquilino',
             # Campos calculados
@@ -98,19 +101,19 @@ class VehiculoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehiculo
         fields = [
-            'id', 'color', 'marca', 'modelo', 'placa', 'tipo', 'imagen', 
+            'id', 'color', 'marca', 'modelo', 'placa', 'tipo', 'imagen', 'imagen_miniatura', 'imagen_mediana', 
             'fecha_registro', 'persona', 'propietario_nombre'
         ]
         read_only_fields = ['id', 'fecha_registro']
     
-    def validate_placa(self, value):
+    def validate(self, attrs):
         """
-        Validar que la placa sea única
+        Placa única comparando la forma normalizada ("ABC-123" == "abc 123"). Se revisa
+        aunque la petición no traiga la placa: save() siempre recalcula placa_normalizada.
         """
-        if self.instance:
-            if Vehiculo.objects.filter(placa=value).exclude(pk=self.instance.pk).exists():
-                raise serializers.ValidationError("Ya existe un vehículo con esta placa.")
-        else:
-            if Vehiculo.objects.filter(placa=value).exists():
-                raise serializers.ValidationError("Ya existe un vehículo con esta placa.")
-        return value
+        placa = attrs.get("placa", getattr(self.instance, "placa", None))
+        if not normalizar_placa(placa):
+            raise serializers.ValidationError({"placa": "La placa debe tener letras o números."})
+        if placa_en_uso(placa, excluir_pk=self.instance.pk if self.instance else None):
+            raise serializers.ValidationError({"placa": "Ya existe un vehículo con esta placa."})
+        return attrs
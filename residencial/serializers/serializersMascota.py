@@ -11,7 +11,7 @@ class MascotaSerializer(serializers.ModelSerializer):
     class Meta:
         model = Mascota
         fields = [
-            'id', 'nombre', 'especie', 'tipo', 'foto', 'raza', 
+            'id', 'nombre', 'especie', 'tipo', 'foto', 'foto_miniatura', 'foto_mediana', 'raza', 
             'fecha_nacimiento', 'observaciones', 'fecha_registro',
             'persona', 'persona_nombre', 'persona_ci'
         ]
@@ -36,7 +36,7 @@ class MascotaListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Mascota
         fields = [
-            'id', 'nombre', 'especie', 'tipo', 'foto', 'raza', 
+            'id', 'nombre', 'especie', 'tipo', 'foto', 'foto_miniatura', 'foto_mediana', 'raza', 
             'fecha_nacimiento', 'observaciones', 'fecha_registro',
             'persona', 'persona_nombre', 'persona_ci'
         ]
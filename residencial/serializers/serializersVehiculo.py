@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from ..modelsVehiculo import Vehiculo
+from ..modelsVehiculo import Vehiculo, normalizar_placa
+from ..placas import placa_en_uso
 from administracion.models import Persona  
 
 
@@ -7,7 +8,19 @@ class VehiculoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Vehiculo
         fields = '__all__'
-        read_only_fields = ['fecha_registro']
+        read_only_fields = ['fecha_registro', 'placa_normalizada']
+
+    def validate(self, attrs):
+        """
+        Placa única comparando la forma normalizada ("ABC-123" == "abc 123"). Se revisa
+        aunque la petición no traiga la placa: save() siempre recalcula placa_normalizada.
+        """
+        placa = attrs.get("placa", getattr(self.instance, "placa", None))
+        if not normalizar_placa(placa):
+            raise serializers.ValidationError({"placa": "La placa debe tener letras o números."})
+        if placa_en_uso(placa, excluir_pk=self.instance.pk if self.instance else None):
+            raise serializers.ValidationError({"placa": "Ya existe un vehículo con esta placa."})
+        return attrs
 
 class PersonaAuxSerializers(serializers.ModelSerializer):
     class Meta:
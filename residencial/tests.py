@@ -1,3 +1,149 @@
-from django.test import TestCase
+import importlib
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from administracion.models import Persona
+from residencial import placas
+from residencial.modelsVehiculo import Vehiculo
+
+
+def crear_persona(ci, **extra):
+    datos = {"nombre": "Ana", "apellido": "Rojas", "tipo": "P", "sexo": "F",
+             "fecha_nacimiento": "1990-01-01", "CI": ci}
+    datos.update(extra)
+    return Persona.objects.create(**datos)
+
+
+def crear_vehiculo(placa, persona):
+    return Vehiculo.objects.create(color="Rojo", marca="Toyota", modelo="Yaris", tipo="SUV",
+                                   placa=placa, persona=persona)
+
+
+class ConfusionesTests(SimpleTestCase):
+    def test_solo_confusiones(self):
+        self.assertTrue(placas.solo_confusiones("2345XYZ", "2345XY2"))
+        self.assertTrue(placas.solo_confusiones("B0S-123", "80S123"))
+        self.assertFalse(placas.solo_confusiones("2345XYW", "2345XYZ"))
+        self.assertFalse(placas.solo_confusiones("2345XY", "2345XYZ"))
+
+    def test_aceptable_exige_margen_y_confusiones(self):
+        mejor = {"vehiculo_id": 1, "confianza": 0.9, "solo_confusiones": True}
+        self.assertEqual(placas.aceptable([mejor]), mejor)
+        empate = {"vehiculo_id": 2, "confianza": 0.85, "solo_confusiones": True}
+        self.assertIsNone(placas.aceptable([mejor, empate]))
+        self.assertIsNone(placas.aceptable([dict(mejor, solo_confusiones=False)]))
+        self.assertIsNone(placas.aceptable([dict(mejor, confianza=0.3)]))
+        self.assertIsNone(placas.aceptable([]))
+
+
+class BuscarSimilaresTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        self.persona = crear_persona("R-1")
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def test_empate_no_se_acepta(self):
+        crear_vehiculo("2345XYZ", self.persona)
+        crear_vehiculo("2345XYK", self.persona)
+        coincidencias = placas.buscar_similares([("2345XYW", 0.9)])
+        self.assertEqual(len(coincidencias), 2)
+        self.assertEqual(coincidencias[0]["confianza"], coincidencias[1]["confianza"])
+        self.assertIsNone(placas.aceptable(coincidencias))
+
+    def test_sustitucion_no_confundible_no_se_acepta(self):
+        crear_vehiculo("2345XYZ", self.persona)
+        coincidencias = placas.buscar_similares([("2345XYW", 0.99)])
+        self.assertEqual(len(coincidencias), 1)
+        self.assertFalse(coincidencias[0]["solo_confusiones"])
+        self.assertIsNone(placas.aceptable(coincidencias))
+
+    def test_confusion_de_ocr_se_acepta(self):
+        vehiculo = crear_vehiculo("2345XYZ", self.persona)
+        coincidencias = placas.buscar_similares([("2345XY2", 0.9)])
+        self.assertEqual(placas.aceptable(coincidencias)["vehiculo_id"], vehiculo.pk)
+
+
+class BuscarVehiculoTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        self.persona = crear_persona("R-2")
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def test_exacta_en_cualquier_formato(self):
+        vehiculo = crear_vehiculo("ABC-123", self.persona)
+        self.assertEqual(placas.buscar_vehiculo("abc 123"), vehiculo)
+        self.assertIsNone(placas.buscar_vehiculo("ABC124"))
+
+    def test_indice_viejo_por_cambio_en_otro_worker(self):
+        viejo = crear_vehiculo("ABC123", self.persona)
+        placas.buscar_vehiculo("ABC123")  # este worker ya tiene el índice
+        # Otro worker le cambia la placa y registra otro vehículo con la anterior (sin señales aquí)
+        Vehiculo.objects.filter(pk=viejo.pk).update(placa="XYZ999", placa_normalizada="XYZ999")
+        Vehiculo.objects.bulk_create([Vehiculo(color="Azul", marca="Kia", modelo="Rio", tipo="SUV",
+                                               placa="ABC123", placa_normalizada="ABC123", persona=self.persona)])
+        nuevo = placas.buscar_vehiculo("ABC123")
+        self.assertIsNotNone(nuevo)
+        self.assertNotEqual(nuevo.pk, viejo.pk)
+        self.assertIsNone(placas._cache.get("indice"))
+
+
+class ImagenVehiculoTests(TestCase):
+    def setUp(self):
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(User.objects.create_user("admin-imagen"))
+        self.vehiculo = crear_vehiculo("IMG123", crear_persona("R-3"))
+        Vehiculo.objects.filter(pk=self.vehiculo.pk).update(
+            imagen="https://cdn.test/a.jpg", imagen_miniatura="https://cdn.test/a_min.jpg",
+            imagen_mediana="https://cdn.test/a_med.jpg")
+
+    def test_url_externa_nueva_reinicia_las_variantes(self):
+        r = self.cliente.patch(f"/api/vehiculos/{self.vehiculo.pk}/", {"imagen": "https://otro.test/b.jpg"},
+                               format="json")
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(r.data["imagen_miniatura"], "https://otro.test/b.jpg")
+        self.vehiculo.refresh_from_db()
+        self.assertEqual(self.vehiculo.imagen_miniatura, "https://otro.test/b.jpg")
+        self.assertEqual(self.vehiculo.imagen_mediana, "https://otro.test/b.jpg")
+
+    def test_sin_cambiar_la_imagen_se_conservan_las_variantes(self):
+        r = self.cliente.patch(f"/api/vehiculos/{self.vehiculo.pk}/", {"color": "Verde"}, format="json")
+        self.assertEqual(r.status_code, 200)
+        self.vehiculo.refresh_from_db()
+        self.assertEqual(self.vehiculo.imagen_miniatura, "https://cdn.test/a_min.jpg")
+
+
+class PlacaRepetidaTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(User.objects.create_user("admin-placas"))
+        persona = crear_persona("R-4")
+        self.original = crear_vehiculo("DUP-123", persona)
+        self.otro = crear_vehiculo("OTR123", persona)
+        # Como lo dejaba la versión anterior de la migración 0002
+        Vehiculo.objects.filter(pk=self.otro.pk).update(placa="dup 123", placa_normalizada=None)
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def test_guardar_sin_tocar_la_placa_responde_400(self):
+        r = self.cliente.patch(f"/api/vehiculos/{self.otro.pk}/", {"color": "Verde"}, format="json")
+        self.assertEqual(r.status_code, 400)
+        self.assertIn("placa", r.data)
+        r = self.cliente.patch(f"/api/vehiculos/{self.otro.pk}/", {"placa": "DUP124"}, format="json")
+        self.assertEqual(r.status_code, 200)
+
+    def test_la_migracion_lista_los_repetidos(self):
+        migracion = importlib.import_module("residencial.migrations.0004_vehiculo_placas_repetidas")
+        with self.assertRaisesMessage(RuntimeError, f"DUP123: id={self.original.pk}, id={self.otro.pk}"):
+            migracion.revisar_placas_repetidas(apps, None)
+        Vehiculo.objects.filter(pk=self.otro.pk).update(placa="DUP-124")
+        migracion.revisar_placas_repetidas(apps, None)
+        self.assertEqual(Vehiculo.objects.get(pk=self.otro.pk).placa_normalizada, "DUP124")
@@ -12,14 +12,13 @@ from .models import Inquilino, Familiares, Visitante, Mascota
 from .serializers.serializersInquilino import InquilinoSerializer, InquilinoListSerializer
 from .serializers.serializersFamiliares import FamiliaresSerializer, FamiliaresListSerializer
 from .serializers.serializersMascota import MascotaSerializer, MascotaListSerializer
-import requests
-from django.conf import settings
+from core.imagenes import ImagenAsincronaMixin
 
 # Create your views here.
 
 # ==================== VISTAS ESPECÍFICAS POR TIPO DE PERSONA ====================
 
-class PropietarioViewSet(viewsets.ModelViewSet):
+class PropietarioViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD completo de propietarios con subida de imágenes a ImgBB
     """
@@ -48,47 +47,9 @@ class PropietarioViewSet(viewsets.ModelViewSet):
         Actualizar propietario con subida de imagen a ImgBB
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
-    
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.IMGBB_API_KEY}
-            files = {"image": imagen_file.read()}
-            
-            response = requests.post(url, payload, files=files)
-            
-            if response.status_code == 200:
-                # Extraer URL de la imagen subida
-                image_url = response.json()["data"]["url"]
-                
-                # Actualizar los datos de la request con la URL de la imagen
-                data = request.data.copy()
-                data["imagen"] = image_url
-                request._full_data = data
-            else:
-                return Response(
-                    {"error": "Error al subir imagen a ImgBB"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
 
 
-class InquilinoViewSet(viewsets.ModelViewSet):
+class InquilinoViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD completo de inquilinos que hereda de Persona
     """
@@ -143,47 +104,9 @@ class InquilinoViewSet(viewsets.ModelViewSet):
         Actualizar inquilino con subida de imagen a ImgBB
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
-    
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.IMGBB_API_KEY}
-            files = {"image": imagen_file.read()}
-            
-            response = requests.post(url, payload, files=files)
-            
-            if response.status_code == 200:
-                # Extraer URL de la imagen subida
-                image_url = response.json()["data"]["url"]
-                
-                # Actualizar los datos de la request con la URL de la imagen
-                data = request.data.copy()
-                data["imagen"] = image_url
-                request._full_data = data
-            else:
-                return Response(
-                    {"error": "Error al subir imagen a ImgBB"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
 
 
-class FamiliaresViewSet(viewsets.ModelViewSet):
+class FamiliaresViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD completo de familiares que hereda de Persona
     """
@@ -238,44 +161,6 @@ class FamiliaresViewSet(viewsets.ModelViewSet):
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
     
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.IMGBB_API_KEY}
-            files = {"image": imagen_file.read()}
-            
-            response = requests.post(url, payload, files=files)
-            
-            if response.status_code == 200:
-                # Extraer URL de la imagen subida
-                image_url = response.json()["data"]["url"]
-                
-                # Actualizar los datos de la request con la URL de la imagen
-                data = request.data.copy()
-                data["imagen"] = image_url
-                request._full_data = data
-            else:
-                return Response(
-                    {"error": "Error al subir imagen a ImgBB"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
-
     @action(detail=False, methods=['get'])
     def personas_disponibles(self, request):
         """
@@ -295,7 +180,7 @@ class FamiliaresViewSet(viewsets.ModelViewSet):
         return Response(personas_data)
 
 
-class VisitanteViewSet(viewsets.ModelViewSet):
+class VisitanteViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD completo de visitantes con subida de imágenes a ImgBB
     """
@@ -324,42 +209,3 @@ class VisitanteViewSet(viewsets.ModelViewSet):
         Actualizar visitante con subida de imagen a ImgBB
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
-    
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('imagen')
-        
-        if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.IMGBB_API_KEY}
-            files = {"image": imagen_file.read()}
-            
-            response = requests.post(url, payload, files=files)
-            
-            if response.status_code == 200:
-                # Extraer URL de la imagen subida
-                image_url = response.json()["data"]["url"]
-                
-                # Actualizar los datos de la request con la URL de la imagen
-                data = request.data.copy()
-                data["imagen"] = image_url
-                request._full_data = data
-            else:
-                return Response(
-                    {"error": "Error al subir imagen a ImgBB"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("imagen"):
-                    data["imagen"] = instance.imagen
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
-
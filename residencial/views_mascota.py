@@ -2,14 +2,14 @@ from rest_framework import status, viewsets, filters
 from rest_framework.response import Response
 from .models import Mascota
 from .serializers.serializersMascota import MascotaSerializer, MascotaListSerializer
-import requests
-from django.conf import settings
+from core.imagenes import ImagenAsincronaMixin
 
-class MascotaViewSet(viewsets.ModelViewSet):
+class MascotaViewSet(ImagenAsincronaMixin, viewsets.ModelViewSet):
     """
     ViewSet para CRUD completo de mascotas con subida de imágenes a ImgBB
     """
     queryset = Mascota.objects.select_related('persona').all()
+    campo_imagen = 'foto'
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = [
         'nombre', 'especie', 'raza', 'persona__nombre', 'persona__apellido', 'persona__CI'
@@ -53,41 +53,3 @@ class MascotaViewSet(viewsets.ModelViewSet):
         Actualizar mascota con subida de imagen a ImgBB
         """
         return self.handle_image_upload(request, super().update, *args, **kwargs)
-    
-    def handle_image_upload(self, request, action, *args, **kwargs):
-        """
-        Maneja la subida de imágenes a ImgBB API
-        """
-        imagen_file = request.FILES.get('foto')
-        
-        if imagen_file:
-            # Subir imagen a ImgBB
-            url = "https://api.imgbb.com/1/upload"
-            payload = {"key": settings.IMGBB_API_KEY}
-            files = {"image": imagen_file.read()}
-            
-            response = requests.post(url, payload, files=files)
-            
-            if response.status_code == 200:
-                # Extraer URL de la imagen subida
-                image_url = response.json()["data"]["url"]
-                
-                # Actualizar los datos de la request con la URL de la imagen
-                data = request.data.copy()
-                data["foto"] = image_url
-                request._full_data = data
-            else:
-                return Response(
-                    {"error": "Error al subir imagen a ImgBB"}, 
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        else:
-            # Si no se sube nueva imagen en PUT/PATCH, mantener la existente
-            if request.method in ["PUT", "PATCH"]:
-                instance = self.get_object()
-                data = request.data.copy()
-                if not data.get("foto"):
-                    data["foto"] = instance.foto
-                request._full_data = data
-        
-        return action(request, *args, **kwargs)
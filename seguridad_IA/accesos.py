@@ -0,0 +1,367 @@
+# seguridad_IA/accesos.py
+"""
+Tabla de accesos precalculados (AccesoPrecalculado): cada placa registrada y cada
+UUID de Luxand apuntan a una fila con la decisión ya resuelta (persona o empleado,
+unidad, estado, vigencia del alquiler). En la barrera basta una búsqueda por clave,
+cacheada por proceso, para responder permitido/denegado.
+
+Reglas:
+  - Empleado: estado A.
+  - Persona: estado A. Inquilino: además estado_inquilino A y hoy dentro de
+    fecha_inicio/fecha_fin. Familiar: también su titular (y la vigencia de este si
+    es inquilino). Visitante: con una Visita ACTIVA.
+  - Unidad: la del contrato activo del propietario (el del inquilino, el del titular
+    del familiar o el del anfitrión de la visita).
+
+Cache: cada entrada guarda la versión de acceso_version con la que se leyó. La versión
+sube con cada cambio en la tabla y cada worker la consulta como mucho cada
+ACCESOS_VERSION_SEGUNDOS: un cambio hecho en otro worker se ve a lo sumo ese tiempo después.
+"""
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from administracion.models import Persona, Empleado
+from core.cache_local import CacheLocal
+from finanzas.models import contrato
+from residencial.models import Inquilino, Familiares, Visita
+from residencial.modelsVehiculo import Vehiculo
+from .models import AccesoPrecalculado, VersionAccesos
+
+# "tipo:clave" -> (versión, dict de la fila o None si no existe)
+_cache = CacheLocal(ttl=getattr(settings, "ACCESOS_CACHE_TTL", 60), max_items=50000)
+# Versión de la tabla vista por este worker; se vuelve a consultar al vencer
+_version = CacheLocal(ttl=getattr(settings, "ACCESOS_VERSION_SEGUNDOS", 1), max_items=1)
+
+_CAMPOS = ["tipo", "clave", "sujeto_tipo", "sujeto_id", "vehiculo_id", "nombre", "categoria",
+           "unidad", "estado", "vigente_desde", "vigente_hasta", "permitido", "motivo"]
+_MOTIVOS_ESTADO = {"I": "inactivo", "S": "suspendido", "F": "finalizado"}
+# Campos que cambian la decisión; los save(update_fields=...) de otros campos se ignoran
+_RELEVANTES = {"estado", "estado_inquilino", "luxand_uuid", "nombre", "apellido", "tipo", "fecha_inicio",
+               "fecha_fin", "propietario", "persona_relacionada", "placa", "persona", "unidad",
+               "visitante", "recibe_persona"}
+
+# Modelos de los que se calcula la tabla; una migración pasa los históricos (modelos_de)
+_MODELOS = SimpleNamespace(
+    Persona=Persona, Empleado=Empleado, Inquilino=Inquilino, Familiares=Familiares, Visita=Visita,
+    contrato=contrato, Vehiculo=Vehiculo, AccesoPrecalculado=AccesoPrecalculado, VersionAccesos=VersionAccesos,
+)
+
+
+def modelos_de(apps):
+    """Los mismos modelos sacados del registro histórico de una migración."""
+    return SimpleNamespace(
+        Persona=apps.get_model("administracion", "Persona"),
+        Empleado=apps.get_model("administracion", "Empleado"),
+        Inquilino=apps.get_model("residencial", "Inquilino"),
+        Familiares=apps.get_model("residencial", "Familiares"),
+        Visita=apps.get_model("residencial", "Visita"),
+        contrato=apps.get_model("finanzas", "contrato"),
+        Vehiculo=apps.get_model("residencial", "Vehiculo"),
+        AccesoPrecalculado=apps.get_model("seguridad_IA", "AccesoPrecalculado"),
+        VersionAccesos=apps.get_model("seguridad_IA", "VersionAccesos"),
+    )
+
+
+class _Datos:
+    """
+    Acceso a los datos de origen. Con precargar=True (reconstrucción completa) todo
+    se lee en unas pocas consultas; si no, cada dato se consulta al pedirlo.
+    """
+
+    def __init__(self, precargar=False, modelos=_MODELOS):
+        self.m = m = modelos
+        self.completo = precargar
+        self.personas, self.inquilinos, self.familiares = {}, {}, {}
+        self.visitas, self.unidades, self.vehiculos = {}, {}, {}
+        if precargar:
+            self.personas = {p.pk: p for p in m.Persona.objects.all()}
+            self.inquilinos = {i.pk: i for i in m.Inquilino.objects.all()}
+            self.familiares = {f.pk: f for f in m.Familiares.objects.all()}
+            for v in m.Visita.objects.filter(estado='ACTIVA').order_by('fecha_hora_entrada'):
+                self.visitas[v.visitante_id] = v
+            for c in m.contrato.objects.filter(estado='A').select_related('unidad').order_by('-id'):
+                self.unidades[c.propietario_id] = c.unidad.codigo
+            for v in m.Vehiculo.objects.exclude(placa_normalizada__isnull=True):
+                self.vehiculos.setdefault(v.persona_id, []).append(v)
+
+    def _buscar(self, cache, clave, consulta):
+        if clave not in cache and not self.completo:
+            cache[clave] = consulta()
+        return cache.get(clave)
+
+    def persona(self, pk):
+        return self._buscar(self.personas, pk, lambda: self.m.Persona.objects.filter(pk=pk).first())
+
+    def inquilino(self, pk):
+        return self._buscar(self.inquilinos, pk, lambda: self.m.Inquilino.objects.filter(pk=pk).first())
+
+    def familiar(self, pk):
+        return self._buscar(self.familiares, pk, lambda: self.m.Familiares.objects.filter(pk=pk).first())
+
+    def visita_activa(self, visitante_id):
+        return self._buscar(self.visitas, visitante_id, lambda: self.m.Visita.objects.filter(
+            visitante_id=visitante_id, estado='ACTIVA').order_by('fecha_hora_entrada').first())
+
+    def unidad(self, propietario_id):
+        def consulta():
+            c = self.m.contrato.objects.filter(propietario_id=propietario_id, estado='A').select_related('unidad').order_by('-id').first()
+            return c.unidad.codigo if c else ""
+        return self._buscar(self.unidades, propietario_id, consulta) or ""
+
+    def vehiculos_de(self, persona_id):
+        return self._buscar(self.vehiculos, persona_id, lambda: list(
+            self.m.Vehiculo.objects.filter(persona_id=persona_id).exclude(placa_normalizada__isnull=True))) or []
+
+
+def _decision_persona(persona, datos):
+    """(permitido, motivo, unidad, vigente_desde, vigente_hasta) de una persona."""
+    if persona.estado != 'A':
+        return False, f"persona_{_MOTIVOS_ESTADO.get(persona.estado, 'inactiva')}", "", None, None
+
+    if persona.tipo == 'V':
+        visita = datos.visita_activa(persona.pk)
+        if visita is None:
+            return False, "visita_no_activa", "", None, None
+        return True, "", _unidad_de(datos.persona(visita.recibe_persona_id), datos), None, None
+
+    titular = persona
+    if persona.tipo == 'F':
+        familiar = datos.familiar(persona.pk)
+        titular = datos.persona(familiar.persona_relacionada_id) if familiar else None
+        if titular is None or titular.estado != 'A':
+            return False, "titular_inactivo", "", None, None
+
+    desde = hasta = None
+    if titular.tipo == 'I':
+        inquilino = datos.inquilino(titular.pk)
+        if inquilino is not None:
+            if inquilino.estado_inquilino != 'A':
+                return False, f"inquilino_{_MOTIVOS_ESTADO.get(inquilino.estado_inquilino, 'inactivo')}", "", None, None
+            desde, hasta = inquilino.fecha_inicio, inquilino.fecha_fin
+    return True, "", _unidad_de(titular, datos), desde, hasta
+
+
+def _unidad_de(persona, datos):
+    if persona is None:
+        return ""
+    if persona.tipo == 'I':
+        inquilino = datos.inquilino(persona.pk)
+        return datos.unidad(inquilino.propietario_id) if inquilino else ""
+    if persona.tipo == 'F':
+        familiar = datos.familiar(persona.pk)
+        return _unidad_de(datos.persona(familiar.persona_relacionada_id), datos) if familiar else ""
+    return datos.unidad(persona.pk)
+
+
+def filas_persona(persona, datos):
+    permitido, motivo, unidad, desde, hasta = _decision_persona(persona, datos)
+    comun = {
+        "sujeto_tipo": "persona", "sujeto_id": persona.pk,
+        "nombre": f"{persona.nombre} {persona.apellido}".strip(), "categoria": persona.tipo,
+        "unidad": unidad, "estado": persona.estado, "vigente_desde": desde, "vigente_hasta": hasta,
+        "permitido": permitido, "motivo": motivo,
+    }
+    modelo = datos.m.AccesoPrecalculado
+    filas = [modelo(tipo="placa", clave=v.placa_normalizada, vehiculo_id=v.pk, **comun)
+             for v in datos.vehiculos_de(persona.pk)]
+    if persona.luxand_uuid:
+        filas.append(modelo(tipo="rostro", clave=persona.luxand_uuid, **comun))
+    return filas
+
+
+def filas_empleado(empleado, modelo=AccesoPrecalculado):
+    if not empleado.luxand_uuid:
+        return []
+    permitido = empleado.estado == 'A'
+    return [modelo(
+        tipo="rostro", clave=empleado.luxand_uuid, sujeto_tipo="empleado", sujeto_id=empleado.pk,
+        nombre=f"{empleado.nombre} {empleado.apellido}".strip(), categoria="E", estado=empleado.estado,
+        permitido=permitido, motivo="" if permitido else f"empleado_{_MOTIVOS_ESTADO.get(empleado.estado, 'inactivo')}",
+    )]
+
+
+def _reemplazar(borrar, filas):
+    """Borra las filas de `borrar` (queryset) y las que choquen con las nuevas, e inserta `filas`."""
+    with transaction.atomic():
+        viejas = list(borrar.values_list("tipo", "clave"))
+        for tipo in ("placa", "rostro"):
+            claves = [f.clave for f in filas if f.tipo == tipo]
+            if claves:
+                viejas += [(tipo, c) for c in claves]
+                AccesoPrecalculado.objects.filter(tipo=tipo, clave__in=claves).delete()
+        borrar.delete()
+        AccesoPrecalculado.objects.bulk_create(filas)
+        _subir_version()
+    for tipo, clave in viejas:
+        _cache.invalidar(f"{tipo}:{clave}")
+
+
+def _subir_version(modelo=VersionAccesos):
+    """Avisa a los demás workers que la tabla cambió (dentro de la transacción del cambio)."""
+    if not modelo.objects.filter(pk=1).update(version=F("version") + 1):
+        modelo.objects.get_or_create(pk=1, defaults={"version": 1})
+    _version.invalidar()
+
+
+def version_actual():
+    """Versión de acceso_version (consultada como mucho cada ACCESOS_VERSION_SEGUNDOS)."""
+    version = _version.get("version")
+    if version is None:
+        version = VersionAccesos.objects.filter(pk=1).values_list("version", flat=True).first() or 0
+        _version.set("version", version)
+    return version
+
+
+def _afectadas(persona_ids):
+    """Las personas dadas más las que dependen de ellas (inquilinos, familiares, visitantes)."""
+    todas, nuevas = set(), set(persona_ids)
+    while nuevas:
+        todas |= nuevas
+        dependientes = set(Inquilino.objects.filter(propietario_id__in=nuevas).values_list("pk", flat=True))
+        dependientes |= set(Familiares.objects.filter(persona_relacionada_id__in=nuevas).values_list("pk", flat=True))
+        dependientes |= set(Visita.objects.filter(recibe_persona_id__in=nuevas, estado='ACTIVA')
+                            .values_list("visitante_id", flat=True))
+        nuevas = dependientes - todas
+    return todas
+
+
+def reconstruir_personas(persona_ids):
+    """Recalcula las filas de esas personas y de quienes dependen de ellas."""
+    ids = _afectadas(persona_ids)
+    datos = _Datos()
+    filas = []
+    for pk in ids:
+        persona = datos.persona(pk)
+        if persona is not None:
+            filas += filas_persona(persona, datos)
+    _reemplazar(AccesoPrecalculado.objects.filter(sujeto_tipo="persona", sujeto_id__in=ids), filas)
+
+
+def reconstruir_empleado(empleado_id):
+    empleado = Empleado.objects.filter(pk=empleado_id).first()
+    _reemplazar(AccesoPrecalculado.objects.filter(sujeto_tipo="empleado", sujeto_id=empleado_id),
+                filas_empleado(empleado) if empleado else [])
+
+
+def reconstruir_todo(apps=None):
+    """
+    Reconstruye la tabla completa. Devuelve la cantidad de filas. `apps` es el
+    registro histórico cuando la llama una migración.
+    """
+    m = modelos_de(apps) if apps is not None else _MODELOS
+    datos = _Datos(precargar=True, modelos=m)
+    filas = []
+    for persona in datos.personas.values():
+        filas += filas_persona(persona, datos)
+    for empleado in m.Empleado.objects.exclude(luxand_uuid__isnull=True).exclude(luxand_uuid=""):
+        filas += filas_empleado(empleado, m.AccesoPrecalculado)
+    with transaction.atomic():
+        m.AccesoPrecalculado.objects.all().delete()
+        m.AccesoPrecalculado.objects.bulk_create(filas, batch_size=1000)
+        _subir_version(m.VersionAccesos)
+    _cache.invalidar()
+    return len(filas)
+
+
+def _como_dict(fila):
+    return {campo: getattr(fila, campo) for campo in _CAMPOS}
+
+
+def buscar(tipo, clave):
+    """
+    Fila de acceso (dict) para una placa normalizada o un UUID, o None. Cacheada por
+    proceso mientras no cambie la versión de la tabla.
+    """
+    if not clave:
+        return None
+    return buscar_varios(tipo, [clave])[clave]
+
+
+def buscar_varios(tipo, claves):
+    """buscar() para varias claves con una sola consulta clave__in. Devuelve {clave: dict o None}."""
+    version = version_actual()
+    resultado, faltan = {}, []
+    for clave in dict.fromkeys(c for c in claves if c):
+        item = _cache.get(f"{tipo}:{clave}")
+        if item is not None and item[0] == version:
+            resultado[clave] = item[1]
+        else:
+            faltan.append(clave)
+    if faltan:
+        encontradas = {f.clave: _como_dict(f) for f in AccesoPrecalculado.objects.filter(tipo=tipo, clave__in=faltan)}
+        for clave in faltan:
+            resultado[clave] = encontradas.get(clave)
+            _cache.set(f"{tipo}:{clave}", (version, resultado[clave]))
+    return resultado
+
+
+def decidir(fila, hoy=None):
+    """
+    Decisión final de una fila (o None = no registrado), con las fechas del día:
+    {permitido, motivo, tipo, id, nombre, categoria, unidad}
+    """
+    if fila is None:
+        return {"permitido": False, "motivo": "no_registrado", "tipo": None, "id": None,
+                "nombre": None, "categoria": None, "unidad": None}
+    hoy = hoy or timezone.localdate()
+    permitido, motivo = fila["permitido"], fila["motivo"]
+    if permitido and fila["vigente_desde"] and hoy < fila["vigente_desde"]:
+        permitido, motivo = False, "alquiler_no_iniciado"
+    elif permitido and fila["vigente_hasta"] and hoy > fila["vigente_hasta"]:
+        permitido, motivo = False, "alquiler_vencido"
+    return {
+        "permitido": permitido, "motivo": motivo,
+        "tipo": fila["sujeto_tipo"], "id": fila["sujeto_id"], "nombre": fila["nombre"],
+        "categoria": fila["categoria"], "unidad": fila["unidad"] or None,
+    }
+
+
+def acceso_placa(placa_normalizada):
+    return decidir(buscar("placa", placa_normalizada))
+
+
+def acceso_rostro(uuid):
+    return decidir(buscar("rostro", uuid))
+
+
+def _cambio_relevante(kwargs):
+    update_fields = kwargs.get("update_fields")
+    return not update_fields or bool(_RELEVANTES & set(update_fields))
+
+
+@receiver(post_save)
+def acceso_origen_guardado(sender, instance, **kwargs):
+    if not isinstance(instance, (Persona, Empleado, Vehiculo, contrato, Visita)) or not _cambio_relevante(kwargs):
+        return
+    if isinstance(instance, Empleado):
+        reconstruir_empleado(instance.pk)
+    elif isinstance(instance, Persona):
+        reconstruir_personas({instance.pk})
+    elif isinstance(instance, Vehiculo):
+        # El vehículo pudo cambiar de dueño: su fila vieja se va con la del dueño anterior
+        anteriores = set(AccesoPrecalculado.objects.filter(vehiculo_id=instance.pk).values_list("sujeto_id", flat=True))
+        reconstruir_personas(anteriores | {instance.persona_id})
+    elif isinstance(instance, contrato):
+        reconstruir_personas({instance.propietario_id})
+    else:
+        reconstruir_personas({instance.visitante_id})
+
+
+@receiver(post_delete)
+def acceso_origen_borrado(sender, instance, **kwargs):
+    if isinstance(instance, Empleado):
+        reconstruir_empleado(instance.pk)
+    elif isinstance(instance, Persona):
+        reconstruir_personas({instance.pk})
+    elif isinstance(instance, Vehiculo):
+        _reemplazar(AccesoPrecalculado.objects.filter(vehiculo_id=instance.pk), [])
+    elif isinstance(instance, contrato):
+        reconstruir_personas({instance.propietario_id})
+    elif isinstance(instance, Visita):
+        reconstruir_personas({instance.visitante_id})
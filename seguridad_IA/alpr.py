@@ -0,0 +1,263 @@
+# seguridad_IA/alpr.py
+import hashlib
+import math
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from core import http
+from core.cuotas import CuotaAgotada
+from core.models import Trabajo
+from core.trabajos import encolar, manejador, ErrorPermanente, ErrorReintentable
+from residencial.modelsVehiculo import Vehiculo
+from residencial.serializers.serializersVehiculo import VehiculoSerializer
+from .accesos import acceso_placa, decidir
+from . import movimiento
+from .camaras import preparar_frame, mapear_cajas
+from .lecturas import sesion_abierta, en_espera, contar_frame, registrar_lectura, MAX_VOTOS
+from .serializers.serializersPlaca import LecturaPlacaSerializer
+
+PLATE_URL = "https://api.platerecognizer.com/v1/plate-reader/"
+
+# Cola de ingesta: frames pendientes por cámara y en total; al pasarse se descartan los más viejos
+COLA_POR_CAMARA = getattr(settings, "ALPR_COLA_POR_CAMARA", 3)
+COLA_MAXIMA = getattr(settings, "ALPR_COLA_MAXIMA", 200)
+# Un frame que esperó más que esto ya no sirve para abrir la barrera
+EDAD_MAXIMA = getattr(settings, "ALPR_COLA_EDAD_MAXIMA", 30)
+
+
+def leer_placas(archivo, nombre, content_type, camera_id="", regions=None, espera_cuota=None):
+    """
+    POST a PlateRecognizer. `archivo` puede ser un UploadedFile o bytes.
+    Respeta la cuota compartida; si no hay turno a tiempo lanza CuotaAgotada.
+    """
+    payload = {"regions": regions or settings.PLATE_REGIONS}
+    if camera_id:
+        payload["camera_id"] = camera_id
+    headers = {"Authorization": f"Token {settings.PLATE_TOKEN}"}
+    files = {"upload": (nombre or "frame.jpg", archivo, content_type or "image/jpeg")}
+    return http.post("platerecognizer", PLATE_URL, headers=headers, data=payload, files=files,
+                     espera_cuota=espera_cuota)
+
+
+async def aleer_placas(archivo, nombre, content_type, camera_id="", regions=None, espera_cuota=None):
+    """leer_placas() para las vistas async (httpx). `archivo` debe ser bytes."""
+    payload = {"regions": regions or settings.PLATE_REGIONS}
+    if camera_id:
+        payload["camera_id"] = camera_id
+    headers = {"Authorization": f"Token {settings.PLATE_TOKEN}"}
+    files = {"upload": (nombre or "frame.jpg", archivo, content_type or "image/jpeg")}
+    return await http.apost("platerecognizer", PLATE_URL, headers=headers, data=payload, files=files,
+                            espera_cuota=espera_cuota)
+
+
+def huella(archivo):
+    """SHA-256 del frame: el que calculó el upload handler o, si no, leyendo por chunks."""
+    if getattr(archivo, "sha256", None):
+        return archivo.sha256
+    h = hashlib.sha256()
+    for chunk in archivo.chunks():
+        h.update(chunk)
+    archivo.seek(0)
+    return h.hexdigest()
+
+
+def clave_frame(modo, sha256, camera_id="", regions=None):
+    """Clave de coalescencia de un frame: hash del contenido más cámara y regiones."""
+    return f"alpr:{modo}:{camera_id}:{regions or settings.PLATE_REGIONS}:{sha256}"
+
+
+def _acceso(placa, vehiculo_id, vehiculo=None):
+    """Decisión de acceso del vehículo leído (una búsqueda en acceso_precalculado, cacheada)."""
+    if vehiculo_id is None:
+        return decidir(None)
+    if vehiculo is not None:
+        return acceso_placa(vehiculo.placa_normalizada)
+    acceso = acceso_placa(placa)
+    if acceso["id"] is None:
+        # Sesión con match aproximado: la placa de consenso no es la registrada
+        vehiculo = Vehiculo.objects.only("placa_normalizada").filter(pk=vehiculo_id).first()
+        acceso = acceso_placa(vehiculo.placa_normalizada if vehiculo else None)
+    return acceso
+
+
+def respuesta_barrera(status, placa, score, acceso, **extra):
+    """Cuerpo corto (barrera=true): solo lo necesario para abrir o no la barrera."""
+    return {
+        "status": status, "plate": placa, "score": score,
+        "permitido": acceso["permitido"], "motivo": acceso["motivo"],
+        "nombre": acceso["nombre"], "categoria": acceso["categoria"], "unidad": acceso["unidad"],
+        **extra,
+    }
+
+
+def misma_sesion(sesion, hay_cambio, lectura_id):
+    """
+    True si se puede responder con el vehículo ya confirmado sin leer el frame: la sesión
+    está en espera y el frame no cambió respecto de la referencia de movimiento, que es
+    un frame leído en esa misma sesión. Un vehículo nuevo (p.ej. uno que se pega detrás)
+    cambia la escena y se lee.
+    """
+    return en_espera(sesion) and not hay_cambio and lectura_id == sesion.pk
+
+
+def respuesta_confirmada(sesion, barrera=False):
+    acceso = _acceso(sesion.placa, sesion.vehiculo_id)
+    if barrera:
+        return respuesta_barrera("confirmed", sesion.placa, sesion.score, acceso)
+    return {
+        "status": "confirmed",
+        "plate": sesion.placa, "score": sesion.score, "match": sesion.match,
+        "acceso": acceso,
+        "vehiculo": VehiculoSerializer(sesion.vehiculo).data if sesion.vehiculo else None,
+        "lectura": LecturaPlacaSerializer(sesion).data
+    }
+
+
+def releer(sesion):
+    """
+    True si hay que leer el frame aunque la escena no haya cambiado: la sesión abierta
+    todavía no confirmó un vehículo (p.ej. tras una mala lectura) y el consenso necesita
+    más votos. Se deja de insistir al llegar a MAX_VOTOS lecturas.
+    """
+    return bool(sesion and not sesion.confirmada_en and sesion.frames < MAX_VOTOS)
+
+
+def respuesta_sin_cambio(fraccion, sesion=None, lectura_id=None, barrera=False):
+    """
+    Frame descartado por el filtro de movimiento: la escena no cambió desde la última
+    lectura. Si esa lectura es de la sesión abierta se responde con su decisión actual;
+    si no, acceso denegado (sin_placa si aquella lectura no encontró placa).
+    """
+    if sesion is None or lectura_id != sesion.pk:
+        sesion = None
+        acceso = {**decidir(None), "motivo": "sin_placa" if lectura_id is None else "sin_cambio"}
+    else:
+        acceso = _acceso(sesion.placa, sesion.vehiculo_id)
+    placa, score = (sesion.placa, sesion.score) if sesion else (None, None)
+    if barrera:
+        return respuesta_barrera("no-change", placa, score, acceso, cambio=fraccion)
+    return {
+        "status": "no-change",
+        "plate": placa, "score": score, "match": bool(sesion and sesion.match),
+        "acceso": acceso,
+        "vehiculo": VehiculoSerializer(sesion.vehiculo).data if sesion and sesion.vehiculo else None,
+        "lectura": LecturaPlacaSerializer(sesion).data if sesion else None,
+        "cambio": fraccion,
+    }
+
+
+def procesar_resultado(camera_id, js, sesion=None, barrera=False):
+    """
+    Registra la respuesta de PlateRecognizer en la sesión de la cámara y arma el
+    cuerpo de respuesta (igual en modo directo y en cola). Devuelve (cuerpo, lectura);
+    lectura es None si no se leyó ninguna placa.
+    Con barrera=True el cuerpo es el corto de respuesta_barrera.
+    """
+    results = js.get("results", [])
+
+    if not results:
+        # Los frames vacíos no se guardan: solo se cuentan en la sesión abierta (si hay)
+        if sesion:
+            contar_frame(sesion, vacio=True)
+        if barrera:
+            return respuesta_barrera("no-plate-found", None, None, {**decidir(None), "motivo": "sin_placa"}), None
+        return {
+            "status": "no-plate-found",
+            "plate": None, "score": None, "match": False,
+            "vehiculo": None,
+            "lectura": LecturaPlacaSerializer(sesion).data if sesion else None
+        }, None
+
+    best      = max(results, key=lambda x: x.get("score", 0) or 0.0)
+    plate_raw = (best.get("plate") or "").upper()
+    score     = float(best.get("score") or 0.0)
+    candidatos = [(c.get("plate") or "", float(c.get("score") or 0.0)) for c in (best.get("candidates") or [])]
+
+    # Se funde con las lecturas anteriores del mismo vehículo en esta cámara (consenso por
+    # mejor score y mayoría de caracteres); el match exacto o aproximado se hace sobre el consenso
+    lectura, v_match, match_tipo, coincidencias = registrar_lectura(camera_id, plate_raw, score, candidatos)
+    acceso = _acceso(lectura.placa, v_match.pk if v_match else None, v_match)
+    if barrera:
+        return respuesta_barrera("ok", lectura.placa, lectura.score, acceso, match_tipo=match_tipo), lectura
+
+    return {
+        "status": "ok",
+        "plate": lectura.placa,
+        "score": lectura.score,
+        "match": bool(v_match),
+        "match_tipo": match_tipo,
+        "acceso": acceso,
+        "coincidencias": coincidencias,
+        # Caja de la placa en coordenadas del frame completo (ver camaras.mapear_cajas)
+        "box": best.get("box"),
+        "vehiculo": VehiculoSerializer(v_match).data if v_match else None,
+        "lectura": LecturaPlacaSerializer(lectura).data
+    }, lectura
+
+
+def encolar_frame(camera_id, archivo, regions=None):
+    """
+    Encola un frame para el worker y aplica la contrapresión: por cámara y en total
+    solo quedan los frames pendientes más recientes; los más viejos se descartan.
+    """
+    preparado, info, transformacion = preparar_frame(archivo, camera_id)
+    trabajo = encolar(
+        'ALPR', archivo=preparado.read(), nombre_archivo=preparado.name,
+        parametros={
+            "camera_id": camera_id,
+            "regions": regions or settings.PLATE_REGIONS,
+            "content_type": preparado.content_type,
+            "imagen": info,
+            "transformacion": transformacion,
+        },
+    )
+    pendientes = Trabajo.objects.filter(tipo='ALPR', estado='PENDIENTE')
+    viejos = list(pendientes.filter(parametros__camera_id=camera_id)
+                  .order_by('-id').values_list('id', flat=True)[COLA_POR_CAMARA:])
+    viejos += list(pendientes.order_by('-id').values_list('id', flat=True)[COLA_MAXIMA:])
+    if viejos:
+        Trabajo.objects.filter(id__in=viejos, estado='PENDIENTE').update(
+            estado='CANCELADO', archivo=None, ultimo_error="Descartado: llegó un frame más nuevo",
+            fecha_actualizacion=timezone.now(),
+        )
+    return trabajo
+
+
+@manejador('ALPR')
+def procesar_frame(trabajo):
+    parametros = trabajo.parametros or {}
+    camera_id = parametros.get("camera_id", "")
+    if timezone.now() - trabajo.fecha_creacion > timedelta(seconds=EDAD_MAXIMA):
+        raise ErrorPermanente("Frame vencido")
+
+    # El worker tiene su propia referencia de movimiento: solo un frame igual al último
+    # leído en la sesión confirmada se responde sin llamar al ALPR
+    sesion = sesion_abierta(camera_id)
+    hay_cambio, _, actual, lectura_id = movimiento.comparar(camera_id, bytes(trabajo.archivo))
+    if misma_sesion(sesion, hay_cambio, lectura_id):
+        contar_frame(sesion)
+        return respuesta_confirmada(sesion)
+
+    try:
+        # Sin turno libre no se duerme en el worker: el frame vuelve a la cola
+        r = leer_placas(bytes(trabajo.archivo), trabajo.nombre_archivo, parametros.get("content_type"),
+                        camera_id, parametros.get("regions"), espera_cuota=0)
+    except CuotaAgotada as e:
+        raise ErrorReintentable(str(e), reintentar_en=math.ceil(e.espera))
+    except requests.RequestException as e:
+        raise ErrorReintentable(f"No se pudo contactar al ALPR: {e}", reintentar_en=1)
+    if r.status_code == 429 or r.status_code >= 500:
+        try:
+            retry_after = int(r.headers.get("Retry-After", "1"))
+        except ValueError:
+            retry_after = 1
+        raise ErrorReintentable(f"ALPR respondió {r.status_code}", reintentar_en=retry_after)
+    if r.status_code not in (200, 201):
+        raise ErrorPermanente(f"ALPR respondió {r.status_code}: {r.text[:500]}")
+
+    cuerpo, lectura = procesar_resultado(camera_id, mapear_cajas(r.json(), parametros.get("transformacion")), sesion)
+    movimiento.fijar_referencia(camera_id, actual, lectura.pk if lectura else None)
+    return cuerpo
@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SeguridadIaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seguridad_IA'
+
+    def ready(self):
+        # Mantiene el registro de identidades de Luxand y la cache de reconocimiento al día
+        from . import identidades  # noqa: F401
+        from . import reconocimiento  # noqa: F401
+        from . import alpr  # noqa: F401  (manejador de la cola ALPR)
+        from . import accesos  # noqa: F401  (tabla de accesos precalculados)
@@ -0,0 +1,130 @@
+# seguridad_IA/camaras.py
+"""
+Recorte por cámara antes de subir el frame a PlateRecognizer (ConfiguracionCamara):
+solo la región de interés, reducida a `lado_objetivo`. Las cajas que devuelve el
+ALPR vienen en coordenadas de lo que se subió; `mapear_cajas` las lleva de vuelta
+al frame completo con la `transformacion` que devuelve `preparar_frame`:
+    x_frame = x + x_subida / escala    (igual para y)
+"""
+import os
+from io import BytesIO
+
+from asgiref.sync import sync_to_async
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.cache_local import CacheLocal
+from core.preproceso import CALIDAD, LADO_MAXIMO, preparar
+from .models import ConfiguracionCamara
+
+_SIN_CONFIGURACION = False
+_configuraciones = CacheLocal(ttl=60, max_items=1000)
+
+IDENTIDAD = {"x": 0, "y": 0, "escala": 1.0}
+
+
+def configuracion(camera_id):
+    """ConfiguracionCamara activa de la cámara, o None (cacheado por proceso)."""
+    if not camera_id:
+        return None
+    config = _configuraciones.get(camera_id)
+    if config is None:
+        config = ConfiguracionCamara.objects.filter(camera_id=camera_id, activa=True).first() or _SIN_CONFIGURACION
+        _configuraciones.set(camera_id, config)
+    return config or None
+
+
+@receiver([post_save, post_delete], sender=ConfiguracionCamara)
+def _invalidar(sender, instance, **kwargs):
+    _configuraciones.invalidar(instance.camera_id)
+
+
+def preparar_frame(archivo, camera_id=""):
+    """
+    (archivo, info, transformacion) listos para el ALPR: el recorte de la ROI si la
+    cámara tiene una, si no el frame reducido de siempre (core/preproceso.py).
+    """
+    return _preparar(archivo, configuracion(camera_id))
+
+
+def _preparar(archivo, config):
+    if config is not None and config.roi is not None:
+        recortado = recortar(archivo, config.roi, config.lado_objetivo or LADO_MAXIMO)
+        if recortado is not None:
+            return recortado
+    preparado, info = preparar(archivo)
+    transformacion = dict(IDENTIDAD)
+    if info["dimensiones_final"] and info["dimensiones_original"]:
+        # preparar() solo reduce (y quizá rota por EXIF): las cajas vienen en la escala del frame reducido
+        transformacion["escala"] = max(info["dimensiones_final"]) / max(info["dimensiones_original"])
+    return preparado, info, transformacion
+
+
+def recortar(archivo, roi, lado):
+    """Recorta `roi` (fracciones) y reduce a `lado` px; None si Pillow no puede abrirlo."""
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        fuente = BytesIO(bytes(archivo))
+        nombre = "frame.jpg"
+    else:
+        fuente = archivo
+        fuente.seek(0)
+        nombre = os.path.basename(getattr(archivo, "name", "") or "frame.jpg")
+    tamano = fuente.seek(0, os.SEEK_END)
+    fuente.seek(0)
+    try:
+        with Image.open(fuente) as img:
+            img = ImageOps.exif_transpose(img)
+            ancho, alto = img.size
+            x, y, w, h = roi
+            caja = (round(x * ancho), round(y * alto), round(min(x + w, 1) * ancho), round(min(y + h, 1) * alto))
+            if caja[2] <= caja[0] or caja[3] <= caja[1]:
+                raise ValueError("ROI vacía")
+            region = img.crop(caja)
+            escala = min(1.0, lado / max(region.size))
+            if escala < 1:
+                region = region.resize((max(1, round(region.width * escala)), max(1, round(region.height * escala))),
+                                       Image.LANCZOS)
+            if region.mode not in ("RGB", "L"):
+                region = region.convert("RGB")
+            salida = BytesIO()
+            region.save(salida, "JPEG", quality=CALIDAD, optimize=True)
+            dimensiones = list(region.size)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        print(f"[Camara] No se pudo recortar {nombre}: {e}; se envía el frame completo")
+        return None
+    finally:
+        if fuente is archivo:
+            archivo.seek(0)
+
+    contenido = salida.getvalue()
+    info = {
+        "bytes_original": tamano, "bytes_final": len(contenido),
+        "dimensiones_original": [ancho, alto], "dimensiones_final": dimensiones,
+        "formato": "JPEG", "roi": list(caja),
+    }
+    print(f"[Camara] {nombre}: ROI {list(caja)} de [{ancho}, {alto}] -> {dimensiones}, "
+          f"{tamano // 1024} KB -> {len(contenido) // 1024} KB")
+    transformacion = {"x": caja[0], "y": caja[1], "escala": dimensiones[0] / (caja[2] - caja[0])}
+    return SimpleUploadedFile(f"{os.path.splitext(nombre)[0]}.jpg", contenido, "image/jpeg"), info, transformacion
+
+
+def mapear_cajas(js, transformacion):
+    """Pasa a coordenadas del frame completo las cajas (placa y vehículo) de la respuesta del ALPR."""
+    if not transformacion or transformacion == IDENTIDAD:
+        return js
+    for resultado in js.get("results") or []:
+        for caja in (resultado.get("box"), (resultado.get("vehicle") or {}).get("box")):
+            if not caja:
+                continue
+            for eje, desplazamiento in (("xmin", "x"), ("xmax", "x"), ("ymin", "y"), ("ymax", "y")):
+                if caja.get(eje) is not None:
+                    caja[eje] = round(transformacion[desplazamiento] + caja[eje] / transformacion["escala"])
+    return js
+
+
+async def apreparar_frame(archivo, camera_id=""):
+    """preparar_frame() desde la vista async: la consulta va por el hilo del ORM y Pillow en otro aparte."""
+    config = await sync_to_async(configuracion)(camera_id)
+    return await sync_to_async(_preparar, thread_sensitive=False)(archivo, config)
@@ -0,0 +1,106 @@
+# seguridad_IA/identidades.py
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from administracion.models import Persona, Empleado
+from core.cache_local import CacheLocal
+from .models import IdentidadLuxand
+
+# UUID -> {tipo, id, nombre, categoria} (o None si no existe)
+_cache = CacheLocal(ttl=getattr(settings, "IDENTIDADES_CACHE_TTL", 60), max_items=50000)
+# None es un valor válido en la cache ("UUID desconocido")
+_FALTA = object()
+
+
+def _como_dict(identidad):
+    return {
+        "tipo": identidad.tipo,
+        "id": identidad.objeto_id,
+        "nombre": identidad.nombre,
+        "categoria": identidad.categoria,
+    }
+
+
+def resolver_uuid(uuid):
+    """
+    Resuelve un UUID de Luxand en una sola búsqueda indexada (y cacheada por proceso).
+    Devuelve {tipo, id, nombre, categoria} o None.
+    """
+    if not uuid:
+        return None
+    data = _cache.get(uuid, _FALTA)
+    if data is not _FALTA:
+        return data
+    identidad = IdentidadLuxand.objects.filter(luxand_uuid=uuid).first()
+    data = _como_dict(identidad) if identidad else None
+    _cache.set(uuid, data)
+    return data
+
+
+def resolver_uuids(uuids):
+    """
+    Resuelve varios UUID (p.ej. todas las caras de una foto) con una sola consulta
+    luxand_uuid__in al registro, que cubre Persona y Empleado. Devuelve {uuid: dict o None}.
+    """
+    resultado, faltan = {}, []
+    for uuid in dict.fromkeys(u for u in uuids if u):
+        data = _cache.get(uuid, _FALTA)
+        if data is _FALTA:
+            faltan.append(uuid)
+        else:
+            resultado[uuid] = data
+    if faltan:
+        encontradas = {i.luxand_uuid: _como_dict(i) for i in IdentidadLuxand.objects.filter(luxand_uuid__in=faltan)}
+        for uuid in faltan:
+            resultado[uuid] = encontradas.get(uuid)
+            _cache.set(uuid, resultado[uuid])
+    return resultado
+
+
+def sincronizar(obj):
+    """
+    Crea, actualiza o borra la identidad de una Persona (o subclase) o Empleado
+    según su luxand_uuid actual.
+    """
+    tipo = "empleado" if isinstance(obj, Empleado) else "persona"
+    anteriores = list(IdentidadLuxand.objects.filter(tipo=tipo, objeto_id=obj.pk).values_list("luxand_uuid", flat=True))
+    for uuid in anteriores:
+        _cache.invalidar(uuid)
+
+    if not obj.luxand_uuid:
+        IdentidadLuxand.objects.filter(tipo=tipo, objeto_id=obj.pk).delete()
+        return None
+
+    _cache.invalidar(obj.luxand_uuid)
+    # El UUID pudo haber pertenecido a otro registro (re-enrolamiento)
+    IdentidadLuxand.objects.filter(luxand_uuid=obj.luxand_uuid).exclude(tipo=tipo, objeto_id=obj.pk).delete()
+    identidad, _ = IdentidadLuxand.objects.update_or_create(
+        tipo=tipo, objeto_id=obj.pk,
+        defaults={
+            "luxand_uuid": obj.luxand_uuid,
+            "nombre": f"{obj.nombre} {obj.apellido}".strip(),
+            "categoria": getattr(obj, "tipo", "") if tipo == "persona" else "",
+        },
+    )
+    return identidad
+
+
+@receiver(post_save)
+def identidad_guardada(sender, instance, **kwargs):
+    if not isinstance(instance, (Persona, Empleado)):
+        return
+    update_fields = kwargs.get("update_fields")
+    if update_fields and not {"luxand_uuid", "nombre", "apellido", "tipo"} & set(update_fields):
+        return
+    sincronizar(instance)
+
+
+@receiver(post_delete)
+def identidad_borrada(sender, instance, **kwargs):
+    if not isinstance(instance, (Persona, Empleado)):
+        return
+    tipo = "empleado" if isinstance(instance, Empleado) else "persona"
+    if instance.luxand_uuid:
+        _cache.invalidar(instance.luxand_uuid)
+    IdentidadLuxand.objects.filter(tipo=tipo, objeto_id=instance.pk).delete()
@@ -0,0 +1,135 @@
+# seguridad_IA/lecturas.py
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from residencial.modelsVehiculo import Vehiculo, normalizar_placa
+from residencial.placas import aceptable, buscar_vehiculo, buscar_similares, canonica, levenshtein
+from .models import LecturaPlaca
+from .resumenes import acumular
+
+# Segundos sin lecturas de placa tras los que la sesión de una cámara se cierra
+VENTANA = getattr(settings, "ALPR_SESION_SEGUNDOS", 8)
+# Segundos tras confirmar un vehículo en los que no se vuelve a llamar al ALPR
+ESPERA_CONFIRMADA = getattr(settings, "ALPR_ESPERA_CONFIRMADA", 10)
+MAX_VOTOS = getattr(settings, "ALPR_SESION_MAX_LECTURAS", 20)
+# Dos lecturas son del mismo vehículo si sus formas canónicas están a <= estas ediciones
+DISTANCIA_MISMO_VEHICULO = 2
+# Ninguna sesión dura más que esto; acota created_at para que PostgreSQL
+# solo mire las particiones recientes de lectura_placa
+DURACION_MAXIMA = timedelta(hours=6)
+
+
+def sesion_abierta(camera_id, lock=False):
+    """Última sesión de la cámara con una placa leída hace menos de VENTANA segundos."""
+    if not camera_id:
+        return None
+    ahora = timezone.now()
+    qs = LecturaPlaca.objects.filter(
+        camera_id=camera_id,
+        created_at__gte=ahora - DURACION_MAXIMA,
+        ultima_lectura__gte=ahora - timedelta(seconds=VENTANA),
+    ).order_by("-ultima_lectura")
+    if lock:
+        qs = qs.select_for_update()
+    return qs.first()
+
+
+def en_espera(sesion):
+    """True si la sesión ya confirmó un vehículo hace menos de ESPERA_CONFIRMADA segundos."""
+    return bool(sesion and sesion.confirmada_en
+                and timezone.now() - sesion.confirmada_en < timedelta(seconds=ESPERA_CONFIRMADA))
+
+
+def contar_frame(sesion, vacio=False):
+    """
+    Suma un frame a la sesión sin escribir una fila nueva. Los frames con placa
+    también van a los resúmenes (recalcular() suma LecturaPlaca.frames).
+    """
+    campo = "frames_vacios" if vacio else "frames"
+    with transaction.atomic():
+        LecturaPlaca.objects.filter(pk=sesion.pk, created_at=sesion.created_at).update(**{campo: F(campo) + 1})
+        setattr(sesion, campo, getattr(sesion, campo) + 1)
+        if not vacio:
+            acumular(sesion, (sesion.placa, sesion.match))
+
+
+def consenso(votos):
+    """
+    Placa de consenso de una sesión a partir de [[placa, score], ...]:
+    se toma el largo más votado (ponderado por score) y, posición por posición,
+    el carácter con más score acumulado. Devuelve (placa, mejor_score).
+    """
+    votos = [(normalizar_placa(p), float(s or 0.0)) for p, s in votos if normalizar_placa(p)]
+    if not votos:
+        return "", 0.0
+    por_largo = Counter()
+    for placa, score in votos:
+        por_largo[len(placa)] += score or 1e-6
+    largo = por_largo.most_common(1)[0][0]
+    posiciones = [defaultdict(float) for _ in range(largo)]
+    for placa, score in votos:
+        if len(placa) == largo:
+            for i, c in enumerate(placa):
+                posiciones[i][c] += score or 1e-6
+    placa = "".join(max(p.items(), key=lambda x: x[1])[0] for p in posiciones)
+    return placa, max(score for _, score in votos)
+
+
+def _identificar(placa, lecturas):
+    """
+    (vehiculo, match_tipo, coincidencias) para la placa de consenso y todas las lecturas.
+    Un match aproximado solo se acepta si placas.aceptable() lo permite; si no,
+    vehiculo=None y las coincidencias quedan para revisión.
+    """
+    vehiculo = buscar_vehiculo(placa)
+    match_tipo = "exacta" if vehiculo else None
+    coincidencias = buscar_similares(lecturas)
+    mejor = None if vehiculo else aceptable(coincidencias)
+    if mejor:
+        vehiculo = Vehiculo.objects.select_related("persona").filter(pk=mejor["vehiculo_id"]).first()
+        match_tipo = "aproximada" if vehiculo else None
+    return vehiculo, match_tipo, coincidencias
+
+
+def registrar_lectura(camera_id, placa, score, candidatos=()):
+    """
+    Funde la lectura en la sesión abierta de la cámara si es el mismo vehículo,
+    o abre una nueva. Devuelve (lectura, vehiculo, match_tipo, coincidencias).
+    """
+    placa = normalizar_placa(placa)
+    ahora = timezone.now()
+    with transaction.atomic():
+        sesion = sesion_abierta(camera_id, lock=True)
+        if sesion and levenshtein(canonica(placa), canonica(sesion.placa)) > DISTANCIA_MISMO_VEHICULO:
+            sesion = None  # otro vehículo: la sesión anterior queda como está
+        nueva = sesion is None
+        if nueva:
+            sesion = LecturaPlaca(camera_id=camera_id, created_at=ahora, frames=0, votos=[])
+        antes = None if nueva else (sesion.placa, sesion.match)
+
+        sesion.votos = (list(sesion.votos or []) + [[placa, score]])[-MAX_VOTOS:]
+        sesion.placa, sesion.score = consenso(sesion.votos)
+        sesion.frames += 1
+        sesion.ultima_lectura = ahora
+
+        lecturas = [(sesion.placa, sesion.score)] + [tuple(v) for v in sesion.votos] + list(candidatos)
+        vehiculo, match_tipo, coincidencias = _identificar(sesion.placa, lecturas)
+        sesion.vehiculo = vehiculo
+        sesion.match = bool(vehiculo)
+        if vehiculo and not sesion.confirmada_en:
+            sesion.confirmada_en = ahora
+        if nueva:
+            sesion.save()
+        else:
+            # Con created_at en el filtro el UPDATE va directo a la partición del mes
+            LecturaPlaca.objects.filter(pk=sesion.pk, created_at=sesion.created_at).update(
+                placa=sesion.placa, score=sesion.score, votos=sesion.votos, frames=sesion.frames,
+                ultima_lectura=ahora, vehiculo=vehiculo, match=sesion.match, confirmada_en=sesion.confirmada_en,
+            )
+        acumular(sesion, antes)
+    return sesion, vehiculo, match_tipo, coincidencias
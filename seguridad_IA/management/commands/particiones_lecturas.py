@@ -0,0 +1,73 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from seguridad_IA import particiones
+from seguridad_IA.models import LecturaPlaca
+
+
+class Command(BaseCommand):
+    help = ("Mantiene las particiones mensuales de lectura_placa: crea los meses siguientes "
+            "y aplica la retención (archiva y/o borra las lecturas más viejas que el horizonte)")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--adelante", type=int, default=3, help="Meses futuros a crear por adelantado")
+        parser.add_argument("--meses", type=int, default=getattr(settings, "LECTURAS_RETENCION_MESES", 12),
+                            help="Horizonte de retención en meses (0 = no aplicar retención)")
+        parser.add_argument("--archivar", metavar="DIRECTORIO",
+                            default=getattr(settings, "LECTURAS_ARCHIVO_DIR", "") or None,
+                            help="Exportar a CSV.gz en este directorio antes de borrar")
+        parser.add_argument("--conservar", action="store_true",
+                            help="Solo desprender las particiones vencidas (quedan como tablas sueltas)")
+        parser.add_argument("--desprender", metavar="PARTICION", help="Desprender una partición y salir")
+        parser.add_argument("--adjuntar", metavar="PARTICION", help="Adjuntar una partición desprendida y salir")
+        parser.add_argument("--listar", action="store_true", help="Listar las particiones y salir")
+        parser.add_argument("--simular", action="store_true", help="Mostrar qué se haría sin cambiar nada")
+
+    def handle(self, *args, **options):
+        particionada = particiones.es_particionada()
+        if (options["desprender"] or options["adjuntar"] or options["listar"]) and not particionada:
+            raise CommandError("lectura_placa no está particionada (solo PostgreSQL)")
+
+        if options["listar"]:
+            for nombre, desde, hasta in particiones.particiones():
+                self.stdout.write(f"{nombre}  [{desde:%Y-%m-%d}, {hasta:%Y-%m-%d})")
+            return
+        if options["desprender"]:
+            particiones.desprender(options["desprender"])
+            self.stdout.write(f"Partición {options['desprender']} desprendida")
+            return
+        if options["adjuntar"]:
+            particiones.adjuntar(options["adjuntar"])
+            self.stdout.write(f"Partición {options['adjuntar']} adjuntada")
+            return
+
+        limite = None
+        if options["meses"] > 0:
+            # Inicio del mes que queda dentro del horizonte
+            hoy = timezone.now()
+            anio, mes = particiones.sumar_meses(hoy.year, hoy.month, -options["meses"])
+            limite = hoy.replace(year=anio, month=mes, day=1, hour=0, minute=0, second=0, microsecond=0)
+
+        if not particionada:
+            if limite is None:
+                return
+            if options["simular"]:
+                n = LecturaPlaca.objects.filter(created_at__lt=limite).count()
+                self.stdout.write(f"Se borrarían {n} lecturas anteriores a {limite:%Y-%m-%d}")
+                return
+            borradas = particiones.retencion_sin_particiones(LecturaPlaca, limite, options["archivar"])
+            self.stdout.write(f"{borradas} lecturas anteriores a {limite:%Y-%m-%d} borradas")
+            return
+
+        if options["simular"]:
+            if limite is not None:
+                for nombre, _, _ in particiones.vencidas(limite):
+                    self.stdout.write(f"Se retiraría {nombre}")
+            return
+
+        creadas = particiones.asegurar_particiones(options["adelante"])
+        self.stdout.write(f"Particiones al día hasta {creadas[-1]}")
+        if limite is not None:
+            for nombre, accion in particiones.aplicar_retencion(limite, options["archivar"], options["conservar"]):
+                self.stdout.write(f"{nombre}: {accion}")
@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from seguridad_IA.resumenes import recalcular
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los resúmenes de lecturas de placas (por hora, por día y placas desconocidas) desde lectura_placa"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--desde", help="Fecha inicial AAAA-MM-DD (por defecto hace 30 días)")
+        parser.add_argument("--hasta", help="Fecha final AAAA-MM-DD, inclusive (por defecto hoy)")
+
+    def handle(self, *args, **options):
+        hasta = parse_date(options["hasta"]) if options["hasta"] else timezone.localdate()
+        desde = parse_date(options["desde"]) if options["desde"] else hasta - timedelta(days=30)
+        if desde is None or hasta is None or desde > hasta:
+            raise CommandError("Rango de fechas inválido")
+        # Día por día para no cargar meses de lecturas en una sola transacción
+        dia = desde
+        while dia <= hasta:
+            recalcular(dia, dia + timedelta(days=1))
+            dia += timedelta(days=1)
+        self.stdout.write(f"Resúmenes recalculados del {desde} al {hasta}")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from seguridad_IA.accesos import reconstruir_todo
+
+
+class Command(BaseCommand):
+    help = "Reconstruye de cero la tabla acceso_precalculado (placas y rostros -> decisión de acceso)"
+
+    def handle(self, *args, **options):
+        filas = reconstruir_todo()
+        self.stdout.write(f"Accesos reconstruidos: {filas} filas")
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:31
+
+from django.db import migrations, models
+
+
+def poblar_identidades(apps, schema_editor):
+    # Registra las personas y empleados que ya estaban enrolados
+    IdentidadLuxand = apps.get_model('seguridad_IA', 'IdentidadLuxand')
+    Persona = apps.get_model('administracion', 'Persona')
+    Empleado = apps.get_model('administracion', 'Empleado')
+    vistos = set()
+    identidades = []
+    for tipo, modelo in (('persona', Persona), ('empleado', Empleado)):
+        for obj in modelo.objects.exclude(luxand_uuid__isnull=True).exclude(luxand_uuid=''):
+            if obj.luxand_uuid in vistos:
+                continue
+            vistos.add(obj.luxand_uuid)
+            identidades.append(IdentidadLuxand(
+                luxand_uuid=obj.luxand_uuid, tipo=tipo, objeto_id=obj.pk,
+                nombre=f"{obj.nombre} {obj.apellido}".strip(),
+                categoria=getattr(obj, 'tipo', '') if tipo == 'persona' else '',
+            ))
+    IdentidadLuxand.objects.bulk_create(identidades, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0004_alter_empleado_luxand_uuid_alter_persona_luxand_uuid'),
+        ('seguridad_IA', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IdentidadLuxand',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('luxand_uuid', models.CharField(max_length=64, unique=True)),
+                ('tipo', models.CharField(choices=[('persona', 'Persona'), ('empleado', 'Empleado')], max_length=10)),
+                ('objeto_id', models.PositiveIntegerField()),
+                ('nombre', models.CharField(max_length=201)),
+                ('categoria', models.CharField(blank=True, max_length=1)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Identidad Luxand',
+                'verbose_name_plural': 'Identidades Luxand',
+                'db_table': 'identidad_luxand',
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'objeto_id'), name='identidad_luxand_tipo_objeto_unica')],
+            },
+        ),
+        migrations.RunPython(poblar_identidades, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:37
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copiar_fecha(apps, schema_editor):
+    # Las lecturas viejas no deben verse como sesiones abiertas
+    LecturaPlaca = apps.get_model('seguridad_IA', 'LecturaPlaca')
+    LecturaPlaca.objects.update(ultima_lectura=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residencial', '0002_vehiculo_placa_normalizada'),
+        ('seguridad_IA', '0002_identidadluxand'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lecturaplaca',
+            name='confirmada_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='lecturaplaca',
+            name='frames',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='lecturaplaca',
+            name='frames_vacios',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='lecturaplaca',
+            name='ultima_lectura',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='lecturaplaca',
+            name='votos',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(copiar_fecha, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='lecturaplaca',
+            index=models.Index(fields=['camera_id', '-ultima_lectura'], name='lectura_camara_ultima_idx'),
+        ),
+    ]
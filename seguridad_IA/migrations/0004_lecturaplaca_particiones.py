@@ -0,0 +1,90 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:38
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+MESES_ADELANTE = 3
+
+
+def _meses(desde, hasta):
+    anio, mes = desde.year, desde.month
+    while (anio, mes) <= (hasta.year, hasta.month):
+        siguiente = (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+        yield (anio, mes), siguiente
+        anio, mes = siguiente
+
+
+def particionar(apps, schema_editor):
+    """
+    Convierte lectura_placa en una tabla particionada por mes en created_at (solo PostgreSQL).
+    La PK pasa a ser (id, created_at) porque debe incluir la clave de partición;
+    se conservan los índices, la FK a vehiculo y los datos.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    ejecutar = schema_editor.execute
+    with schema_editor.connection.cursor() as c:
+        c.execute("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class cl ON cl.oid = pt.partrelid "
+                  "WHERE cl.relname = 'lectura_placa'")
+        if c.fetchone():
+            return
+        c.execute("SELECT min(created_at), max(id) FROM lectura_placa")
+        minimo, max_id = c.fetchone()
+        c.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = 'lectura_placa' "
+                  "AND indexname NOT IN (SELECT conname FROM pg_constraint "
+                  "WHERE conrelid = 'lectura_placa'::regclass AND contype = 'p')")
+        indices = c.fetchall()
+        c.execute("SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+                  "WHERE conrelid = 'lectura_placa'::regclass AND contype = 'f'")
+        fks = c.fetchall()
+
+    ejecutar('CREATE TABLE lectura_placa_nueva (LIKE lectura_placa INCLUDING DEFAULTS INCLUDING CONSTRAINTS) '
+             'PARTITION BY RANGE (created_at)')
+    ejecutar('ALTER TABLE lectura_placa_nueva ADD CONSTRAINT lectura_placa_nueva_pkey PRIMARY KEY (id, created_at)')
+    ahora = datetime.now(timezone.utc)
+    hasta = datetime(ahora.year + (ahora.month + MESES_ADELANTE - 1) // 12,
+                     (ahora.month + MESES_ADELANTE - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+    for (anio, mes), (anio_sig, mes_sig) in _meses(minimo or ahora, hasta):
+        ejecutar(
+            f'CREATE TABLE lectura_placa_{anio:04d}_{mes:02d} PARTITION OF lectura_placa_nueva '
+            f"FOR VALUES FROM ('{anio:04d}-{mes:02d}-01 00:00:00+00') TO ('{anio_sig:04d}-{mes_sig:02d}-01 00:00:00+00')"
+        )
+    # Red de seguridad para filas fuera de rango; el comando particiones_lecturas crea los meses por adelantado
+    ejecutar('CREATE TABLE lectura_placa_default PARTITION OF lectura_placa_nueva DEFAULT')
+    ejecutar('INSERT INTO lectura_placa_nueva SELECT * FROM lectura_placa')
+
+    ejecutar('DROP TABLE lectura_placa')
+    ejecutar('ALTER TABLE lectura_placa_nueva RENAME TO lectura_placa')
+    ejecutar('ALTER TABLE lectura_placa RENAME CONSTRAINT lectura_placa_nueva_pkey TO lectura_placa_pkey')
+    ejecutar('CREATE SEQUENCE lectura_placa_id_seq OWNED BY lectura_placa.id')
+    ejecutar(f"SELECT setval('lectura_placa_id_seq', {(max_id or 0) + 1}, false)")
+    ejecutar("ALTER TABLE lectura_placa ALTER COLUMN id SET DEFAULT nextval('lectura_placa_id_seq')")
+    for _, definicion in indices:
+        ejecutar(definicion)
+    for nombre, definicion in fks:
+        ejecutar(f'ALTER TABLE lectura_placa ADD CONSTRAINT "{nombre}" {definicion}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('residencial', '0002_vehiculo_placa_normalizada'),
+        ('seguridad_IA', '0003_lecturaplaca_sesion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lecturaplaca',
+            index=models.Index(fields=['placa', 'created_at'], name='lectura_placa_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecturaplaca',
+            index=models.Index(fields=['camera_id', 'created_at'], name='lectura_camara_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lecturaplaca',
+            index=models.Index(fields=['-created_at'], name='lectura_fecha_idx'),
+        ),
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 05:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguridad_IA', '0004_lecturaplaca_particiones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlacaDesconocidaDia',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('fecha', models.DateField()),
+                ('placa', models.CharField(max_length=20)),
+                ('lecturas', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'placa_desconocida_dia',
+                'ordering': ['-fecha', '-lecturas'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'placa'), name='placa_desconocida_dia_unica')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenLecturaDia',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('camera_id', models.CharField(blank=True, max_length=50)),
+                ('fecha', models.DateField()),
+                ('match', models.BooleanField()),
+                ('lecturas', models.IntegerField(default=0)),
+                ('frames', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'resumen_lectura_dia',
+                'ordering': ['-fecha', 'camera_id'],
+                'indexes': [models.Index(fields=['fecha'], name='resumen_dia_idx')],
+                'constraints': [models.UniqueConstraint(fields=('camera_id', 'fecha', 'match'), name='resumen_dia_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenLecturaHora',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('camera_id', models.CharField(blank=True, max_length=50)),
+                ('hora', models.DateTimeField()),
+                ('match', models.BooleanField()),
+                ('lecturas', models.IntegerField(default=0)),
+                ('frames', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'resumen_lectura_hora',
+                'ordering': ['-hora', 'camera_id'],
+                'indexes': [models.Index(fields=['hora'], name='resumen_hora_idx')],
+                'constraints': [models.UniqueConstraint(fields=('camera_id', 'hora', 'match'), name='resumen_hora_unico')],
+            },
+        ),
+    ]
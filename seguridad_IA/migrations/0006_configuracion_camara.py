@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:02
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguridad_IA', '0005_resumenes_lecturas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfiguracionCamara',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('camera_id', models.CharField(max_length=50, unique=True)),
+                ('nombre', models.CharField(blank=True, max_length=100)),
+                ('roi_x', models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('roi_y', models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('roi_ancho', models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('roi_alto', models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(0.0), django.core.validators.MaxValueValidator(1.0)])),
+                ('lado_objetivo', models.PositiveIntegerField(blank=True, null=True)),
+                ('activa', models.BooleanField(default=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Configuración de cámara',
+                'verbose_name_plural': 'Configuraciones de cámaras',
+                'db_table': 'configuracion_camara',
+                'ordering': ['camera_id'],
+            },
+        ),
+    ]
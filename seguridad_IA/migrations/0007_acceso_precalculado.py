@@ -0,0 +1,40 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguridad_IA', '0006_configuracion_camara'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccesoPrecalculado',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('placa', 'Placa'), ('rostro', 'Rostro')], max_length=6)),
+                ('clave', models.CharField(max_length=64)),
+                ('sujeto_tipo', models.CharField(choices=[('persona', 'Persona'), ('empleado', 'Empleado')], max_length=8)),
+                ('sujeto_id', models.PositiveIntegerField()),
+                ('vehiculo_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('nombre', models.CharField(max_length=201)),
+                ('categoria', models.CharField(max_length=1)),
+                ('unidad', models.CharField(blank=True, max_length=20)),
+                ('estado', models.CharField(max_length=1)),
+                ('vigente_desde', models.DateField(blank=True, null=True)),
+                ('vigente_hasta', models.DateField(blank=True, null=True)),
+                ('permitido', models.BooleanField(default=False)),
+                ('motivo', models.CharField(blank=True, max_length=30)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Acceso precalculado',
+                'verbose_name_plural': 'Accesos precalculados',
+                'db_table': 'acceso_precalculado',
+                'indexes': [models.Index(fields=['sujeto_tipo', 'sujeto_id'], name='acceso_sujeto_idx'), models.Index(fields=['vehiculo_id'], name='acceso_vehiculo_idx')],
+                'constraints': [models.UniqueConstraint(fields=('tipo', 'clave'), name='acceso_tipo_clave_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.6 on 2026-10-18 06:19
+
+from django.db import migrations, models
+
+
+def crear_version(apps, schema_editor):
+    apps.get_model('seguridad_IA', 'VersionAccesos').objects.get_or_create(pk=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguridad_IA', '0007_acceso_precalculado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VersionAccesos',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Versión de accesos',
+                'verbose_name_plural': 'Versión de accesos',
+                'db_table': 'acceso_version',
+            },
+        ),
+        migrations.RunPython(crear_version, migrations.RunPython.noop),
+    ]
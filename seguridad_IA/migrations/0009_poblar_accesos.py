@@ -0,0 +1,22 @@
+from django.db import migrations
+
+
+def poblar_accesos(apps, schema_editor):
+    # Sin esto la barrera negaría a todos los registrados hasta correr reconstruir_accesos
+    from seguridad_IA.accesos import reconstruir_todo
+
+    reconstruir_todo(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('administracion', '0005_variantes_imagen'),
+        ('finanzas', '0002_initial'),
+        ('residencial', '0003_variantes_imagen'),
+        ('seguridad_IA', '0008_acceso_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(poblar_accesos, migrations.RunPython.noop),
+    ]
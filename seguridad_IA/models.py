@@ -1,3 +1,5 @@
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.utils import timezone
 from residencial.modelsVehiculo import Vehiculo
@@ -11,12 +13,230 @@ class LecturaPlaca(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     vehiculo = models.ForeignKey(Vehiculo, on_delete=models.CASCADE, null=True)
     match = models.BooleanField(default=False)
+    # Sesión por cámara: los frames consecutivos del mismo vehículo se funden en esta fila
+    # (ver seguridad_IA/lecturas.py). `placa` y `score` son el consenso de la sesión.
+    frames = models.PositiveIntegerField(default=1)
+    frames_vacios = models.PositiveIntegerField(default=0)
+    votos = models.JSONField(default=list, blank=True)  # [[placa, score], ...] leídas en la sesión
+    ultima_lectura = models.DateTimeField(default=timezone.now)
+    confirmada_en = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         db_table = "lectura_placa"
         ordering = ["-created_at"]
+        # En PostgreSQL la tabla está particionada por mes en created_at (migración 0004)
+        indexes = [
+            models.Index(fields=["camera_id", "-ultima_lectura"], name="lectura_camara_ultima_idx"),
+            models.Index(fields=["placa", "created_at"], name="lectura_placa_fecha_idx"),
+            models.Index(fields=["camera_id", "created_at"], name="lectura_camara_fecha_idx"),
+            models.Index(fields=["-created_at"], name="lectura_fecha_idx"),
+        ]
 
     def __str__(self):
         return f"{self.placa} ({self.score:.2f}) @ {self.created_at:%Y-%m-%d %H:%M}"
 
-# Create your models here.
\ No newline at end of file
+
+class IdentidadLuxand(models.Model):
+    """
+    Registro único UUID de Luxand -> (tipo, id, nombre) para Persona y Empleado.
+    Se mantiene sincronizado con señales (ver seguridad_IA/identidades.py).
+    """
+    TIPO_CHOICES = [
+        ('persona', 'Persona'),
+        ('empleado', 'Empleado'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    luxand_uuid = models.CharField(max_length=64, unique=True)
+    tipo = models.CharField(max_length=10, choices=TIPO_CHOICES)
+    objeto_id = models.PositiveIntegerField()
+    nombre = models.CharField(max_length=201)
+    # Persona.tipo (P, I, F, V); vacío para empleados
+    categoria = models.CharField(max_length=1, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "identidad_luxand"
+        verbose_name = "Identidad Luxand"
+        verbose_name_plural = "Identidades Luxand"
+        constraints = [
+            models.UniqueConstraint(fields=["tipo", "objeto_id"], name="identidad_luxand_tipo_objeto_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.luxand_uuid} -> {self.tipo} {self.objeto_id} ({self.nombre})"
+
+class ResumenLecturaHora(models.Model):
+    """
+    Lecturas de placas agregadas por cámara, hora y match (ver seguridad_IA/resumenes.py).
+    Una lectura es una sesión de LecturaPlaca (un vehículo frente a la cámara).
+    """
+    id = models.AutoField(primary_key=True)
+    camera_id = models.CharField(max_length=50, blank=True)
+    hora = models.DateTimeField()
+    match = models.BooleanField()
+    lecturas = models.IntegerField(default=0)
+    frames = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "resumen_lectura_hora"
+        ordering = ["-hora", "camera_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["camera_id", "hora", "match"], name="resumen_hora_unico"),
+        ]
+        indexes = [models.Index(fields=["hora"], name="resumen_hora_idx")]
+
+    def __str__(self):
+        return f"{self.camera_id} {self.hora:%Y-%m-%d %H}h match={self.match}: {self.lecturas}"
+
+
+class ResumenLecturaDia(models.Model):
+    id = models.AutoField(primary_key=True)
+    camera_id = models.CharField(max_length=50, blank=True)
+    fecha = models.DateField()
+    match = models.BooleanField()
+    lecturas = models.IntegerField(default=0)
+    frames = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "resumen_lectura_dia"
+        ordering = ["-fecha", "camera_id"]
+        constraints = [
+            models.UniqueConstraint(fields=["camera_id", "fecha", "match"], name="resumen_dia_unico"),
+        ]
+        indexes = [models.Index(fields=["fecha"], name="resumen_dia_idx")]
+
+    def __str__(self):
+        return f"{self.camera_id} {self.fecha} match={self.match}: {self.lecturas}"
+
+
+class PlacaDesconocidaDia(models.Model):
+    """Placas leídas sin vehículo registrado, por día."""
+    id = models.AutoField(primary_key=True)
+    fecha = models.DateField()
+    placa = models.CharField(max_length=20)
+    lecturas = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "placa_desconocida_dia"
+        ordering = ["-fecha", "-lecturas"]
+        constraints = [
+            models.UniqueConstraint(fields=["fecha", "placa"], name="placa_desconocida_dia_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.placa} {self.fecha}: {self.lecturas}"
+
+
+_FRACCION = [MinValueValidator(0.0), MaxValueValidator(1.0)]
+
+
+class ConfiguracionCamara(models.Model):
+    """
+    Ajustes por cámara del ALPR (ver seguridad_IA/camaras.py). La región de interés
+    (ROI) va en fracciones del frame (0-1), así sirve para cualquier resolución:
+    solo ese recorte se sube a PlateRecognizer, reducido a `lado_objetivo` px.
+    """
+    id = models.AutoField(primary_key=True)
+    camera_id = models.CharField(max_length=50, unique=True)
+    nombre = models.CharField(max_length=100, blank=True)
+    roi_x = models.FloatField(null=True, blank=True, validators=_FRACCION)
+    roi_y = models.FloatField(null=True, blank=True, validators=_FRACCION)
+    roi_ancho = models.FloatField(null=True, blank=True, validators=_FRACCION)
+    roi_alto = models.FloatField(null=True, blank=True, validators=_FRACCION)
+    # Lado mayor (px) del recorte que se sube; vacío = IMAGEN_LADO_MAXIMO
+    lado_objetivo = models.PositiveIntegerField(null=True, blank=True)
+    activa = models.BooleanField(default=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "configuracion_camara"
+        ordering = ["camera_id"]
+        verbose_name = "Configuración de cámara"
+        verbose_name_plural = "Configuraciones de cámaras"
+
+    def clean(self):
+        valores = [self.roi_x, self.roi_y, self.roi_ancho, self.roi_alto]
+        if any(v is None for v in valores) and not all(v is None for v in valores):
+            raise ValidationError("La ROI necesita roi_x, roi_y, roi_ancho y roi_alto (o ninguno).")
+        if self.roi is not None:
+            if self.roi_ancho <= 0 or self.roi_alto <= 0:
+                raise ValidationError("roi_ancho y roi_alto deben ser mayores que 0.")
+            if self.roi_x + self.roi_ancho > 1 or self.roi_y + self.roi_alto > 1:
+                raise ValidationError("La ROI se sale del frame (x + ancho y y + alto deben ser <= 1).")
+
+    @property
+    def roi(self):
+        """(x, y, ancho, alto) en fracciones del frame, o None si no hay ROI."""
+        valores = (self.roi_x, self.roi_y, self.roi_ancho, self.roi_alto)
+        return None if any(v is None for v in valores) else valores
+
+    def __str__(self):
+        return self.nombre or self.camera_id
+
+
+class AccesoPrecalculado(models.Model):
+    """
+    Decisión de acceso ya resuelta por placa normalizada y por UUID de Luxand
+    (ver seguridad_IA/accesos.py): quién es, su unidad, su estado y la vigencia del
+    alquiler. Se reconstruye con señales al cambiar los datos de origen y de cero con
+    `python manage.py reconstruir_accesos`. Las fechas se evalúan al consultar.
+    """
+    TIPO_CHOICES = [
+        ('placa', 'Placa'),
+        ('rostro', 'Rostro'),
+    ]
+    SUJETO_CHOICES = [
+        ('persona', 'Persona'),
+        ('empleado', 'Empleado'),
+    ]
+
+    id = models.AutoField(primary_key=True)
+    tipo = models.CharField(max_length=6, choices=TIPO_CHOICES)
+    clave = models.CharField(max_length=64)  # placa normalizada o luxand_uuid
+    sujeto_tipo = models.CharField(max_length=8, choices=SUJETO_CHOICES)
+    sujeto_id = models.PositiveIntegerField()
+    vehiculo_id = models.PositiveIntegerField(null=True, blank=True)
+    nombre = models.CharField(max_length=201)
+    # Persona.tipo (P, I, F, V) o E para empleados
+    categoria = models.CharField(max_length=1)
+    unidad = models.CharField(max_length=20, blank=True)
+    estado = models.CharField(max_length=1)
+    vigente_desde = models.DateField(null=True, blank=True)
+    vigente_hasta = models.DateField(null=True, blank=True)
+    # Decisión sin contar las fechas; si es False, `motivo` dice por qué
+    permitido = models.BooleanField(default=False)
+    motivo = models.CharField(max_length=30, blank=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "acceso_precalculado"
+        verbose_name = "Acceso precalculado"
+        verbose_name_plural = "Accesos precalculados"
+        constraints = [
+            models.UniqueConstraint(fields=["tipo", "clave"], name="acceso_tipo_clave_unico"),
+        ]
+        indexes = [
+            models.Index(fields=["sujeto_tipo", "sujeto_id"], name="acceso_sujeto_idx"),
+            models.Index(fields=["vehiculo_id"], name="acceso_vehiculo_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo} {self.clave} -> {self.nombre} ({'permitido' if self.permitido else self.motivo})"
+
+
+class VersionAccesos(models.Model):
+    """
+    Fila única cuya `version` sube con cada cambio en acceso_precalculado: los workers
+    la consultan para descartar las decisiones que tienen en cache (seguridad_IA/accesos.py).
+    """
+    id = models.AutoField(primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = "acceso_version"
+        verbose_name = "Versión de accesos"
+        verbose_name_plural = "Versión de accesos"
+
+    def __str__(self):
+        return f"accesos v{self.version}"
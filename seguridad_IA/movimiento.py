@@ -0,0 +1,89 @@
+# seguridad_IA/movimiento.py
+"""
+Filtro de cambio de escena para cámaras fijas: por camera_id se guarda en memoria
+una miniatura en grises del último frame que se mandó al ALPR y cada frame nuevo se
+compara con ella (diferencia vectorizada con NumPy). Si casi ningún píxel cambió,
+no hay vehículo nuevo y se responde `no-change` sin llamar a PlateRecognizer.
+
+La referencia es por proceso (cada worker de gunicorn tiene la suya) y solo se
+actualiza cuando el ALPR respondió bien: un 429 o un error no deja "tapado" el frame.
+Guarda también la sesión de LecturaPlaca en la que se fundió esa lectura: un frame
+sin cambios respecto de ella muestra el mismo vehículo que esa sesión.
+"""
+from io import BytesIO
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from PIL import Image, ImageFilter, UnidentifiedImageError
+
+from core.cache_local import CacheLocal
+
+ACTIVO = getattr(settings, "ALPR_MOVIMIENTO", True)
+# Fracción de píxeles que deben cambiar para considerar que la escena cambió
+UMBRAL = getattr(settings, "ALPR_MOVIMIENTO_UMBRAL", 0.02)
+# Diferencia (0-255) a partir de la cual un píxel cuenta como cambiado (ruido, compresión)
+DIFERENCIA_PIXEL = getattr(settings, "ALPR_MOVIMIENTO_PIXEL", 25)
+# Tras estos segundos sin llamar al ALPR la referencia vence y el siguiente frame pasa igual
+REFRESCO = getattr(settings, "ALPR_MOVIMIENTO_REFRESCO", 300)
+# Umbrales por cámara, p.ej. {"porton-norte": {"umbral": 0.05}, "lobby": {"activo": False}}
+POR_CAMARA = getattr(settings, "ALPR_MOVIMIENTO_CAMARAS", {})
+
+# Lado de la miniatura comparada: basta para un auto y borra el ruido del sensor
+LADO = 96
+
+_referencias = CacheLocal(ttl=REFRESCO, max_items=1000)
+
+
+def miniatura(archivo):
+    """Frame en grises reducido a LADO px (uint8), o None si Pillow no lo abre."""
+    if isinstance(archivo, (bytes, bytearray, memoryview)):
+        fuente = BytesIO(bytes(archivo))
+    else:
+        fuente = archivo
+        fuente.seek(0)
+    try:
+        with Image.open(fuente) as img:
+            img.draft("L", (LADO * 2, LADO * 2))
+            gris = img.convert("L")
+            gris.thumbnail((LADO, LADO))
+            return np.asarray(gris.filter(ImageFilter.BoxBlur(1)), dtype=np.uint8)
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError):
+        return None
+    finally:
+        if fuente is archivo:
+            archivo.seek(0)
+
+
+def comparar(camera_id, archivo):
+    """
+    (hay_cambio, fraccion_cambiada, miniatura, lectura_id). Sin camera_id, sin referencia
+    o con el filtro desactivado, siempre hay cambio (fraccion None). `lectura_id` es la
+    sesión de la referencia (None si aquella lectura no encontró placa).
+    """
+    config = POR_CAMARA.get(camera_id, {})
+    if not camera_id or not config.get("activo", ACTIVO):
+        return True, None, None, None
+    actual = miniatura(archivo)
+    if actual is None:
+        return True, None, None, None
+    referencia, lectura_id = _referencias.get(camera_id, (None, None))
+    if referencia is None or referencia.shape != actual.shape:
+        return True, None, actual, None
+
+    diferencia = np.abs(actual.astype(np.int16) - referencia.astype(np.int16))
+    fraccion = float(np.count_nonzero(diferencia > config.get("pixel", DIFERENCIA_PIXEL))) / diferencia.size
+    return fraccion >= config.get("umbral", UMBRAL), round(fraccion, 4), actual, lectura_id
+
+
+def fijar_referencia(camera_id, actual, lectura_id=None):
+    """
+    El frame `actual` (de comparar) ya fue leído por el ALPR y se fundió en la sesión
+    `lectura_id`: pasa a ser la referencia.
+    """
+    if camera_id and actual is not None:
+        _referencias.set(camera_id, (actual, lectura_id))
+
+
+async def acomparar(camera_id, archivo):
+    return await sync_to_async(comparar, thread_sensitive=False)(camera_id, archivo)
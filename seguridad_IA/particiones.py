@@ -0,0 +1,155 @@
+# seguridad_IA/particiones.py
+"""
+Particiones mensuales de lectura_placa (solo PostgreSQL; ver migración 0004).
+Cada partición se llama lectura_placa_AAAA_MM y cubre [día 1 del mes, día 1 del mes siguiente).
+"""
+import csv
+import gzip
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+TABLA = "lectura_placa"
+
+
+def _mes_siguiente(anio, mes):
+    return (anio + 1, 1) if mes == 12 else (anio, mes + 1)
+
+
+def sumar_meses(anio, mes, n):
+    total = anio * 12 + (mes - 1) + n
+    return total // 12, total % 12 + 1
+
+
+def nombre_particion(anio, mes):
+    return f"{TABLA}_{anio:04d}_{mes:02d}"
+
+
+def _limites(anio, mes):
+    desde = datetime(anio, mes, 1, tzinfo=dt_timezone.utc)
+    hasta = datetime(*_mes_siguiente(anio, mes), 1, tzinfo=dt_timezone.utc)
+    return desde, hasta
+
+
+def es_particionada():
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as c:
+        c.execute("SELECT 1 FROM pg_partitioned_table pt JOIN pg_class cl ON cl.oid = pt.partrelid "
+                  "WHERE cl.relname = %s", [TABLA])
+        return c.fetchone() is not None
+
+
+def particiones():
+    """[(nombre, desde, hasta)] de las particiones mensuales adjuntas, de la más vieja a la más nueva."""
+    with connection.cursor() as c:
+        c.execute("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = %s
+            ORDER BY child.relname
+        """, [TABLA])
+        nombres = [fila[0] for fila in c.fetchall()]
+    resultado = []
+    for nombre in nombres:
+        try:
+            anio, mes = int(nombre[-7:-3]), int(nombre[-2:])
+        except ValueError:
+            continue  # la partición DEFAULT
+        resultado.append((nombre, *_limites(anio, mes)))
+    return resultado
+
+
+def crear_particion(anio, mes):
+    """Crea (si no existe) la partición del mes. Devuelve su nombre."""
+    nombre = nombre_particion(anio, mes)
+    desde, hasta = _limites(anio, mes)
+    with connection.cursor() as c:
+        c.execute(f'CREATE TABLE IF NOT EXISTS "{nombre}" PARTITION OF "{TABLA}" '
+                  f"FOR VALUES FROM (%s) TO (%s)", [desde, hasta])
+    return nombre
+
+
+def asegurar_particiones(meses_adelante=3, hoy=None):
+    """Crea las particiones del mes actual y de los próximos `meses_adelante` meses."""
+    hoy = hoy or datetime.now(dt_timezone.utc)
+    return [crear_particion(*sumar_meses(hoy.year, hoy.month, n)) for n in range(meses_adelante + 1)]
+
+
+def desprender(nombre):
+    """Separa una partición: queda como tabla suelta, fuera de las consultas de LecturaPlaca."""
+    with connection.cursor() as c:
+        c.execute(f'ALTER TABLE "{TABLA}" DETACH PARTITION "{nombre}"')
+
+
+def adjuntar(nombre):
+    """Vuelve a adjuntar una tabla lectura_placa_AAAA_MM desprendida antes."""
+    desde, hasta = _limites(int(nombre[-7:-3]), int(nombre[-2:]))
+    with connection.cursor() as c:
+        c.execute(f'ALTER TABLE "{TABLA}" ATTACH PARTITION "{nombre}" FOR VALUES FROM (%s) TO (%s)',
+                  [desde, hasta])
+
+
+def archivar(nombre, directorio):
+    """Exporta una tabla/partición a <directorio>/<nombre>.csv.gz. Devuelve la ruta."""
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.join(directorio, f"{nombre}.csv.gz")
+    with gzip.open(ruta, "wt", newline="") as f, connection.cursor() as c:
+        c.cursor.copy_expert(f'COPY (SELECT * FROM "{nombre}" ORDER BY id) TO STDOUT WITH CSV HEADER', f)
+    return ruta
+
+
+def eliminar(nombre):
+    with connection.cursor() as c:
+        c.execute(f'DROP TABLE IF EXISTS "{nombre}"')
+
+
+def vencidas(limite):
+    """Particiones cuyo rango termina antes de `limite` (todas sus filas son más viejas)."""
+    return [p for p in particiones() if p[2] <= limite]
+
+
+def aplicar_retencion(limite, directorio=None, conservar=False):
+    """
+    Saca de lectura_placa las particiones anteriores a `limite`:
+    las desprende y, salvo `conservar`, las archiva (si hay `directorio`) y las borra.
+    Devuelve [(nombre, accion)].
+    """
+    hechas = []
+    for nombre, _, _ in vencidas(limite):
+        with transaction.atomic():
+            desprender(nombre)
+        if conservar:
+            hechas.append((nombre, "desprendida"))
+            continue
+        if directorio:
+            archivar(nombre, directorio)
+        eliminar(nombre)
+        hechas.append((nombre, "archivada" if directorio else "eliminada"))
+    return hechas
+
+
+def retencion_sin_particiones(modelo, limite, directorio=None, lote=5000):
+    """
+    Retención para bases sin particiones (SQLite en desarrollo): borra por lotes
+    las filas con created_at < limite, exportándolas antes a CSV si hay `directorio`.
+    """
+    qs = modelo.objects.filter(created_at__lt=limite).order_by("id")
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, f"{TABLA}_hasta_{limite:%Y_%m_%d}.csv.gz")
+        campos = [f.attname for f in modelo._meta.concrete_fields]
+        with gzip.open(ruta, "wt", newline="") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(campos)
+            for fila in qs.values_list(*campos).iterator(chunk_size=lote):
+                escritor.writerow(fila)
+    borradas = 0
+    while True:
+        ids = list(qs.values_list("id", flat=True)[:lote])
+        if not ids:
+            return borradas
+        borradas += modelo.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,102 @@
+# seguridad_IA/reconocimiento.py
+import hashlib
+from urllib.parse import urlsplit, urlunsplit
+
+from django.conf import settings
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from core.cache_local import CacheLocal
+from core.luxand import caras_de, probabilidad
+from .accesos import buscar_varios, decidir
+from .identidades import resolver_uuids
+from .models import IdentidadLuxand
+
+# clave de imagen -> respuesta cruda de Luxand /photo/search/v2
+_cache = CacheLocal(
+    ttl=getattr(settings, "RECONOCIMIENTO_CACHE_TTL", 15),
+    max_items=getattr(settings, "RECONOCIMIENTO_CACHE_MAX", 500),
+)
+
+
+def _normalizar_url(url):
+    partes = urlsplit(url.strip())
+    return urlunsplit((partes.scheme.lower(), partes.netloc.lower(), partes.path, partes.query, ""))
+
+
+def clave_imagen(gallery, image_url=None, image_file=None):
+    """
+    Clave de cache para una imagen: SHA-256 de los bytes subidos o de la URL normalizada,
+    junto con la galería consultada. Deja el archivo listo para volver a leerse.
+    """
+    h = hashlib.sha256()
+    if image_file is not None and getattr(image_file, "sha256", None):
+        # Ya hasheado por core.subidas.ImagenUploadHandler mientras llegaba
+        return f"{gallery}:archivo:{image_file.sha256}"
+    if image_file is not None:
+        for chunk in image_file.chunks():
+            h.update(chunk)
+        image_file.seek(0)
+        origen = "archivo"
+    else:
+        h.update(_normalizar_url(image_url).encode())
+        origen = "url"
+    return f"{gallery}:{origen}:{h.hexdigest()}"
+
+
+def obtener(clave):
+    """Respuesta de Luxand cacheada para esa imagen, o None."""
+    return _cache.get(clave)
+
+
+def guardar(clave, respuesta):
+    # Solo se guardan respuestas válidas; los errores se vuelven a consultar
+    if isinstance(respuesta, dict) and "error" in respuesta:
+        return
+    _cache.set(clave, respuesta)
+
+
+def _uuid(candidato):
+    return candidato.get("uuid") or candidato.get("subject") or candidato.get("person_uuid")
+
+
+def resultado_por_cara(candidatos, umbral):
+    """
+    Modo multi-cara: el mejor candidato de cada cara de la foto, con todas las
+    identidades resueltas en una sola consulta. Devuelve una lista, una entrada por cara.
+    """
+    caras = caras_de(candidatos)
+    uuids = [_uuid(cara["candidatos"][0]) for cara in caras]
+    identidades = resolver_uuids(uuids)
+    filas = buscar_varios("rostro", uuids)
+    resultado = []
+    for cara in caras:
+        best = cara["candidatos"][0]
+        uuid = _uuid(best)
+        sim = probabilidad(best)
+        identidad = identidades.get(uuid)
+        ok = bool(identidad) and sim >= umbral
+        resultado.append({
+            "ok": ok,
+            "tipo": identidad["tipo"] if identidad else None,
+            "id": identidad["id"] if identidad else None,
+            "nombre": identidad["nombre"] if identidad else None,
+            "categoria": identidad["categoria"] if identidad else None,
+            "acceso": decidir(filas.get(uuid)) if ok else {**decidir(None), "motivo": "no_reconocido"},
+            "similaridad": round(sim, 4),
+            "uuid": uuid,
+            "coleccion": best.get("collection"),
+            "rectangulo": cara["rectangulo"],
+        })
+    return resultado
+
+
+def estadisticas():
+    return _cache.estadisticas()
+
+
+@receiver(post_save, sender=IdentidadLuxand)
+@receiver(post_delete, sender=IdentidadLuxand)
+def invalidar_reconocimientos(sender, **kwargs):
+    # Alguien se enroló o se dio de baja: un "sin coincidencias" o un candidato cacheado ya no vale
+    _cache.invalidar()
@@ -0,0 +1,88 @@
+# seguridad_IA/resumenes.py
+from datetime import datetime, time
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import LecturaPlaca, ResumenLecturaHora, ResumenLecturaDia, PlacaDesconocidaDia
+
+
+def _sumar(modelo, clave, **incrementos):
+    """UPDATE ... SET campo = campo + n; si la fila no existe se crea (con reintento si otro la creó)."""
+    incrementos = {campo: n for campo, n in incrementos.items() if n}
+    if not incrementos:
+        return
+    cambios = {campo: F(campo) + n for campo, n in incrementos.items()}
+    if modelo.objects.filter(**clave).update(**cambios):
+        return
+    try:
+        with transaction.atomic():
+            modelo.objects.create(**clave, **incrementos)
+    except IntegrityError:
+        modelo.objects.filter(**clave).update(**cambios)
+
+
+def _cubetas(lectura):
+    creada = timezone.localtime(lectura.created_at)
+    return creada.replace(minute=0, second=0, microsecond=0), creada.date()
+
+
+def acumular(lectura, antes=None, frames=1):
+    """
+    Actualiza los resúmenes tras registrar un frame en `lectura` (una sesión de LecturaPlaca).
+    `antes` es (placa, match) de la sesión antes del frame, o None si la sesión es nueva.
+    La sesión cuenta en la hora/día en que empezó; si cambia de match o de placa se mueve de cubeta.
+    """
+    hora, fecha = _cubetas(lectura)
+    camara = lectura.camera_id
+    cambio_match = antes is not None and antes[1] != lectura.match
+    for modelo, clave in ((ResumenLecturaHora, {"hora": hora}), (ResumenLecturaDia, {"fecha": fecha})):
+        if cambio_match:
+            # La sesión entera (con sus frames anteriores) pasa a la otra cubeta
+            _sumar(modelo, {**clave, "camera_id": camara, "match": antes[1]},
+                   lecturas=-1, frames=-(lectura.frames - frames))
+            _sumar(modelo, {**clave, "camera_id": camara, "match": lectura.match},
+                   lecturas=1, frames=lectura.frames)
+        else:
+            _sumar(modelo, {**clave, "camera_id": camara, "match": lectura.match},
+                   lecturas=1 if antes is None else 0, frames=frames)
+
+    placa_antes = antes[0] if antes is not None and not antes[1] else None
+    placa_ahora = lectura.placa if not lectura.match else None
+    if placa_antes != placa_ahora:
+        if placa_antes:
+            _sumar(PlacaDesconocidaDia, {"fecha": fecha, "placa": placa_antes}, lecturas=-1)
+        if placa_ahora:
+            _sumar(PlacaDesconocidaDia, {"fecha": fecha, "placa": placa_ahora}, lecturas=1)
+
+
+def recalcular(desde, hasta):
+    """
+    Reconstruye los resúmenes de [desde, hasta) (fechas) a partir de lectura_placa.
+    Sirve para cargar el histórico o corregir desvíos.
+    """
+    inicio = timezone.make_aware(datetime.combine(desde, time.min))
+    fin = timezone.make_aware(datetime.combine(hasta, time.min))
+    lecturas = LecturaPlaca.objects.filter(created_at__gte=inicio, created_at__lt=fin).exclude(placa="")
+    with transaction.atomic():
+        ResumenLecturaHora.objects.filter(hora__gte=inicio, hora__lt=fin).delete()
+        ResumenLecturaDia.objects.filter(fecha__gte=desde, fecha__lt=hasta).delete()
+        PlacaDesconocidaDia.objects.filter(fecha__gte=desde, fecha__lt=hasta).delete()
+
+        ResumenLecturaHora.objects.bulk_create([
+            ResumenLecturaHora(**fila) for fila in
+            lecturas.annotate(hora=TruncHour("created_at")).values("camera_id", "hora", "match")
+            .annotate(lecturas=Count("id"), frames=Sum("frames")).order_by()
+        ], batch_size=1000)
+        ResumenLecturaDia.objects.bulk_create([
+            ResumenLecturaDia(**fila) for fila in
+            lecturas.annotate(fecha=TruncDate("created_at")).values("camera_id", "fecha", "match")
+            .annotate(lecturas=Count("id"), frames=Sum("frames")).order_by()
+        ], batch_size=1000)
+        PlacaDesconocidaDia.objects.bulk_create([
+            PlacaDesconocidaDia(**fila) for fila in
+            lecturas.filter(match=False).annotate(fecha=TruncDate("created_at")).values("fecha", "placa")
+            .annotate(lecturas=Count("id")).order_by()
+        ], batch_size=1000)
@@ -0,0 +1,8 @@
+from rest_framework import serializers
+from ..models import ResumenLecturaHora
+
+
+class ResumenLecturaHoraSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ResumenLecturaHora
+        fields = ['camera_id', 'hora', 'match', 'lecturas', 'frames']
@@ -0,0 +1,21 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework import serializers
+from ..models import ConfiguracionCamara
+
+
+class ConfiguracionCamaraSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ConfiguracionCamara
+        fields = ['id', 'camera_id', 'nombre', 'roi_x', 'roi_y', 'roi_ancho', 'roi_alto',
+                  'lado_objetivo', 'activa', 'fecha_actualizacion']
+        read_only_fields = ['id', 'fecha_actualizacion']
+
+    def validate(self, attrs):
+        # Las reglas de la ROI viven en el modelo (ConfiguracionCamara.clean)
+        campos = ['roi_x', 'roi_y', 'roi_ancho', 'roi_alto']
+        config = ConfiguracionCamara(**{c: attrs.get(c, getattr(self.instance, c, None)) for c in campos})
+        try:
+            config.clean()
+        except DjangoValidationError as e:
+            raise serializers.ValidationError(e.messages)
+        return attrs
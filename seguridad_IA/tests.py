@@ -1,3 +1,442 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from PIL import Image, ImageDraw
+from rest_framework.test import APIClient
+
+from administracion.models import Cargo, Empleado
+from finanzas.models import contrato
+from residencial import placas
+from residencial.models import Familiares, Inquilino, Visita
+from residencial.modelsVehiculo import Bloque, Unidad
+from residencial.tests import crear_persona, crear_vehiculo
+from seguridad_IA import accesos, alpr, camaras, identidades, lecturas, movimiento, resumenes
+from seguridad_IA.models import (AccesoPrecalculado, ConfiguracionCamara, LecturaPlaca, PlacaDesconocidaDia, ResumenLecturaDia,
+                                 ResumenLecturaHora, VersionAccesos)
+
+
+class IdentificarPlacaTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        self.persona = crear_persona("S-1")
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def test_empate_aproximado_no_identifica_vehiculo(self):
+        crear_vehiculo("2345XYZ", self.persona)
+        crear_vehiculo("2345XYK", self.persona)
+        sesion, vehiculo, match_tipo, coincidencias = lecturas.registrar_lectura("cam-1", "2345XYW", 0.9)
+        self.assertIsNone(vehiculo)
+        self.assertIsNone(match_tipo)
+        self.assertFalse(sesion.match)
+        self.assertEqual(len(coincidencias), 2)
+
+    def test_sustitucion_no_confundible_no_identifica_vehiculo(self):
+        crear_vehiculo("2345XYZ", self.persona)
+        _, vehiculo, _, coincidencias = lecturas.registrar_lectura("cam-1", "2345XYW", 0.99)
+        self.assertIsNone(vehiculo)
+        self.assertEqual(coincidencias[0]["placa"], "2345XYZ")
+
+    def test_confusion_de_ocr_identifica_vehiculo(self):
+        registrado = crear_vehiculo("2345XYZ", self.persona)
+        _, vehiculo, match_tipo, _ = lecturas.registrar_lectura("cam-1", "2345XY2", 0.9)
+        self.assertEqual(vehiculo, registrado)
+        self.assertEqual(match_tipo, "aproximada")
+
+    def test_exacta(self):
+        registrado = crear_vehiculo("2345-XYZ", self.persona)
+        _, vehiculo, match_tipo, _ = lecturas.registrar_lectura("cam-1", "2345xyz", 0.9)
+        self.assertEqual(vehiculo, registrado)
+        self.assertEqual(match_tipo, "exacta")
+
+
+def frame_con_auto(desplazamiento=0, calidad=85):
+    """JPEG de 1280x960 con textura (pasa el control de calidad) y un "auto" en `desplazamiento`."""
+    escena = Image.new("RGB", (1280, 960), (120, 120, 120))
+    dibujo = ImageDraw.Draw(escena)
+    for x in range(0, 1280, 60):
+        dibujo.rectangle([x, 100, x + 30, 300], fill=(20, 20, 20))
+    dibujo.rectangle([300 + desplazamiento, 400, 900 + desplazamiento, 700], fill=(200, 30, 30))
+    salida = BytesIO()
+    escena.save(salida, "JPEG", quality=calidad)
+    return salida.getvalue()
+
+
+class AlprEsperaTests(TestCase):
+    """Con un vehículo confirmado, solo el mismo frame se responde sin llamar al ALPR."""
+
+    def setUp(self):
+        placas._cache.invalidar()
+        movimiento._referencias.invalidar()
+        persona = crear_persona("S-2")
+        crear_vehiculo("AAA111", persona)
+        self.cliente = APIClient()
+        self.cliente.force_authenticate(User.objects.create_user("guardia"))
+        self.placa_leida = "AAA111"
+        self.score = 0.95
+        self.llamadas = 0
+
+    def tearDown(self):
+        placas._cache.invalidar()
+        movimiento._referencias.invalidar()
+
+    def _alpr(self, request):
+        self.llamadas += 1
+        return httpx.Response(201, json={"results": [{"plate": self.placa_leida.lower(), "score": self.score,
+                                                      "box": {"xmin": 1, "ymin": 1, "xmax": 2, "ymax": 2}}]})
+
+    def _scan(self, frame, nombre="f.jpg"):
+        with mock.patch("core.http.cliente",
+                        lambda proveedor: httpx.AsyncClient(transport=httpx.MockTransport(self._alpr))):
+            return self.cliente.post("/api/alpr/", {
+                "camera_id": "porton", "barrera": "true",
+                "upload": SimpleUploadedFile(nombre, frame, "image/jpeg"),
+            }, format="multipart")
+
+    def test_mismo_frame_responde_confirmado_sin_llamar(self):
+        primero = self._scan(frame_con_auto())
+        self.assertEqual(primero.data["status"], "ok")
+        self.assertTrue(primero.data["permitido"])
+        segundo = self._scan(frame_con_auto(), "g.jpg")
+        self.assertEqual(segundo.data["status"], "confirmed")
+        self.assertEqual(self.llamadas, 1)
+
+    def test_frames_confirmados_coinciden_con_recalcular(self):
+        self._scan(frame_con_auto())
+        self.assertEqual(self._scan(frame_con_auto(), "g.jpg").data["status"], "confirmed")
+        self.assertEqual(self._procesar(frame_con_auto())["status"], "confirmed")
+        incremental = list(ResumenLecturaDia.objects.values_list("match", "lecturas", "frames"))
+        self.assertEqual(incremental, [(True, 1, 3)])
+        hoy = timezone.localdate()
+        resumenes.recalcular(hoy, hoy + timedelta(days=1))
+        self.assertEqual(list(ResumenLecturaDia.objects.values_list("match", "lecturas", "frames")), incremental)
+
+    def test_vehiculo_que_se_pega_detras_se_lee(self):
+        self._scan(frame_con_auto())
+        self.placa_leida = "ZZZ999"
+        r = self._scan(frame_con_auto(desplazamiento=200))
+        self.assertEqual(self.llamadas, 2)
+        self.assertEqual(r.data["status"], "ok")
+        self.assertEqual(r.data["plate"], "ZZZ999")
+        self.assertFalse(r.data["permitido"])
+
+    def test_misma_sesion_exige_referencia_de_la_sesion(self):
+        sesion, *_ = lecturas.registrar_lectura("porton", "AAA111", 0.95)
+        self.assertTrue(alpr.misma_sesion(sesion, False, sesion.pk))
+        self.assertFalse(alpr.misma_sesion(sesion, True, sesion.pk))
+        self.assertFalse(alpr.misma_sesion(sesion, False, None))
+
+    def _procesar(self, frame):
+        trabajo = alpr.encolar_frame("porton", SimpleUploadedFile("f.jpg", frame, "image/jpeg"))
+        respuesta = mock.Mock(status_code=201, json=lambda: {"results": [
+            {"plate": self.placa_leida, "score": 0.95}]})
+        with mock.patch("seguridad_IA.alpr.leer_placas", side_effect=lambda *a, **k: self._contar(respuesta)):
+            return alpr.procesar_frame(trabajo)
+
+    def _contar(self, respuesta):
+        self.llamadas += 1
+        return respuesta
+
+    def test_cola_lee_el_frame_de_otro_vehiculo(self):
+        self.assertEqual(self._procesar(frame_con_auto())["status"], "ok")
+        self.assertEqual(self._procesar(frame_con_auto())["status"], "confirmed")
+        self.placa_leida = "ZZZ999"
+        cuerpo = self._procesar(frame_con_auto(desplazamiento=200))
+        self.assertEqual((cuerpo["status"], cuerpo["plate"]), ("ok", "ZZZ999"))
+        self.assertEqual(self.llamadas, 2)
+
+    def test_sesion_sin_confirmar_se_relee_aunque_no_cambie_la_escena(self):
+        self.placa_leida, self.score = "AAX111", 0.6
+        self.assertFalse(self._scan(frame_con_auto()).data["permitido"])
+        self.placa_leida, self.score = "AAA111", 0.95
+        r = self._scan(frame_con_auto(calidad=80))
+        self.assertEqual(self.llamadas, 2)
+        self.assertEqual((r.data["status"], r.data["plate"]), ("ok", "AAA111"))
+        self.assertTrue(r.data["permitido"])
+
+    def test_sin_cambio_responde_la_decision_de_la_sesion(self):
+        sesion, *_ = lecturas.registrar_lectura("porton", "AAA111", 0.95)
+        cuerpo = alpr.respuesta_sin_cambio(0.001, sesion, sesion.pk, barrera=True)
+        self.assertEqual((cuerpo["status"], cuerpo["plate"], cuerpo["permitido"]), ("no-change", "AAA111", True))
+        cuerpo = alpr.respuesta_sin_cambio(0.001, sesion, None, barrera=True)
+        self.assertEqual((cuerpo["permitido"], cuerpo["motivo"]), (False, "sin_placa"))
+        cuerpo = alpr.respuesta_sin_cambio(0.001)
+        self.assertFalse(cuerpo["acceso"]["permitido"])
+
+
+class AccesosTests(TestCase):
+    """Reglas de acceso_precalculado (seguridad_IA/accesos.py), por UUID de rostro."""
+
+    def setUp(self):
+        accesos._cache.invalidar()
+        accesos._version.invalidar()
+        self.hoy = timezone.localdate()
+        self.propietario = crear_persona("A-1", luxand_uuid="u-propietario")
+        unidad = Unidad.objects.create(numero="101", codigo="B1-101",
+                                       bloque=Bloque.objects.create(nombre="B1", direccion="Calle 1"))
+        contrato.objects.create(propietario=self.propietario, unidad=unidad, fecha_contrato=self.hoy, estado="A")
+
+    def tearDown(self):
+        accesos._cache.invalidar()
+        accesos._version.invalidar()
+
+    def _inquilino(self, **extra):
+        datos = {"nombre": "Iván", "apellido": "Paz", "tipo": "I", "sexo": "M", "fecha_nacimiento": "1990-01-01",
+                 "CI": "A-2", "luxand_uuid": "u-inquilino", "propietario": self.propietario,
+                 "fecha_inicio": self.hoy - timedelta(days=30), "fecha_fin": self.hoy + timedelta(days=30)}
+        datos.update(extra)
+        return Inquilino.objects.create(**datos)
+
+    def test_la_migracion_llena_la_tabla_con_los_modelos_historicos(self):
+        from django.db import connection
+        from django.db.migrations.executor import MigrationExecutor
+
+        crear_vehiculo("XYZ-123", self.propietario)
+        self._inquilino()
+        esperado = sorted(AccesoPrecalculado.objects.values_list("tipo", "clave", "permitido", "unidad"))
+        AccesoPrecalculado.objects.all().delete()
+        VersionAccesos.objects.all().delete()
+        apps = MigrationExecutor(connection).loader.project_state(("seguridad_IA", "0009_poblar_accesos")).apps
+        self.assertEqual(accesos.reconstruir_todo(apps), len(esperado))
+        self.assertEqual(sorted(AccesoPrecalculado.objects.values_list("tipo", "clave", "permitido", "unidad")), esperado)
+        self.assertEqual(VersionAccesos.objects.get(pk=1).version, 1)
+
+    def test_propietario_activo_con_su_unidad(self):
+        acceso = accesos.acceso_rostro("u-propietario")
+        self.assertTrue(acceso["permitido"])
+        self.assertEqual(acceso["unidad"], "B1-101")
+        self.propietario.estado = "S"
+        self.propietario.save()
+        self.assertEqual(accesos.acceso_rostro("u-propietario")["motivo"], "persona_suspendido")
+
+    def test_placa_del_vehiculo_del_propietario(self):
+        crear_vehiculo("XYZ-123", self.propietario)
+        self.assertTrue(accesos.acceso_placa("XYZ123")["permitido"])
+        self.assertEqual(accesos.acceso_placa("NOEXISTE")["motivo"], "no_registrado")
+
+    def test_inquilino_segun_fechas_del_alquiler(self):
+        inquilino = self._inquilino()
+        self.assertTrue(accesos.acceso_rostro("u-inquilino")["permitido"])
+        self.assertEqual(accesos.acceso_rostro("u-inquilino")["unidad"], "B1-101")
+
+        inquilino.fecha_fin = self.hoy - timedelta(days=1)
+        inquilino.save()
+        self.assertEqual(accesos.acceso_rostro("u-inquilino")["motivo"], "alquiler_vencido")
+
+        inquilino.fecha_inicio, inquilino.fecha_fin = self.hoy + timedelta(days=1), self.hoy + timedelta(days=60)
+        inquilino.save()
+        self.assertEqual(accesos.acceso_rostro("u-inquilino")["motivo"], "alquiler_no_iniciado")
+
+        inquilino.fecha_inicio, inquilino.estado_inquilino = self.hoy, "F"
+        inquilino.save()
+        self.assertEqual(accesos.acceso_rostro("u-inquilino")["motivo"], "inquilino_finalizado")
+
+    def test_familiar_depende_de_su_titular(self):
+        inquilino = self._inquilino()
+        Familiares.objects.create(nombre="Eva", apellido="Paz", tipo="F", sexo="F", fecha_nacimiento="2010-01-01",
+                                  CI="A-3", luxand_uuid="u-familiar", persona_relacionada=inquilino,
+                                  parentesco="HIJA")
+        acceso = accesos.acceso_rostro("u-familiar")
+        self.assertTrue(acceso["permitido"])
+        self.assertEqual(acceso["unidad"], "B1-101")
+
+        inquilino.fecha_fin = self.hoy - timedelta(days=1)
+        inquilino.save()
+        self.assertEqual(accesos.acceso_rostro("u-familiar")["motivo"], "alquiler_vencido")
+
+        inquilino.estado = "I"
+        inquilino.save()
+        self.assertEqual(accesos.acceso_rostro("u-familiar")["motivo"], "titular_inactivo")
+
+    def test_visitante_solo_con_visita_activa(self):
+        visitante = crear_persona("A-4", tipo="V", luxand_uuid="u-visitante")
+        self.assertEqual(accesos.acceso_rostro("u-visitante")["motivo"], "visita_no_activa")
+
+        visita = Visita.objects.create(visitante=visitante, recibe_persona=self.propietario, estado="ACTIVA",
+                                       fecha_hora_entrada=timezone.now())
+        acceso = accesos.acceso_rostro("u-visitante")
+        self.assertTrue(acceso["permitido"])
+        self.assertEqual(acceso["unidad"], "B1-101")
+
+        visita.estado = "FINALIZADA"
+        visita.save()
+        self.assertFalse(accesos.acceso_rostro("u-visitante")["permitido"])
+
+    def test_empleado_segun_su_estado(self):
+        empleado = Empleado.objects.create(nombre="Luis", apellido="Gil", direccion="Calle 2", sexo="M", CI="E-1",
+                                           sueldo=1000, cargo=Cargo.objects.create(nombre="Guardia"),
+                                           luxand_uuid="u-empleado")
+        self.assertTrue(accesos.acceso_rostro("u-empleado")["permitido"])
+        empleado.estado = "S"
+        empleado.save()
+        self.assertEqual(accesos.acceso_rostro("u-empleado")["motivo"], "empleado_suspendido")
+
+    def test_cambio_en_otro_worker_invalida_la_cache(self):
+        self.assertTrue(accesos.acceso_rostro("u-propietario")["permitido"])
+        with self.assertNumQueries(0):
+            self.assertTrue(accesos.acceso_rostro("u-propietario")["permitido"])
+
+        # Otro worker desactiva a la persona: su cache local no se entera, pero sube la versión
+        AccesoPrecalculado.objects.filter(clave="u-propietario").update(permitido=False, motivo="persona_inactivo")
+        VersionAccesos.objects.filter(pk=1).update(version=VersionAccesos.objects.get(pk=1).version + 1)
+        accesos._version.invalidar()  # venció ACCESOS_VERSION_SEGUNDOS
+        self.assertEqual(accesos.acceso_rostro("u-propietario")["motivo"], "persona_inactivo")
+
+
+class IdentidadesTests(TestCase):
+    def setUp(self):
+        identidades._cache.invalidar()
+        self.persona = crear_persona("I-1", luxand_uuid="uuid-1")
+
+    def tearDown(self):
+        identidades._cache.invalidar()
+
+    def test_uuid_desconocido_se_cachea(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(identidades.resolver_uuid("uuid-x"))
+            self.assertIsNone(identidades.resolver_uuid("uuid-x"))
+
+    def test_varios_uuid_en_una_consulta(self):
+        identidades.resolver_uuid("uuid-1")
+        with self.assertNumQueries(1):
+            resultado = identidades.resolver_uuids(["uuid-1", "uuid-x", "uuid-y", "uuid-1"])
+        self.assertEqual(resultado["uuid-1"]["id"], self.persona.pk)
+        self.assertIsNone(resultado["uuid-x"])
+        with self.assertNumQueries(0):
+            identidades.resolver_uuids(["uuid-1", "uuid-x", "uuid-y"])
+
+    def test_cambio_de_uuid_invalida_en_este_worker(self):
+        self.assertEqual(identidades.resolver_uuid("uuid-1")["id"], self.persona.pk)
+        self.persona.luxand_uuid = "uuid-2"
+        self.persona.save()
+        self.assertIsNone(identidades.resolver_uuid("uuid-1"))
+        self.assertEqual(identidades.resolver_uuid("uuid-2")["id"], self.persona.pk)
+
+
+class ConsensoTests(SimpleTestCase):
+    def test_caracter_con_mas_score_por_posicion(self):
+        placa, score = lecturas.consenso([["ABC-123", 0.6], ["ABC128", 0.5], ["A8C123", 0.4]])
+        self.assertEqual((placa, score), ("ABC123", 0.6))
+
+    def test_largo_mas_votado(self):
+        placa, _ = lecturas.consenso([["ABC12", 0.9], ["ABC123", 0.6], ["ABC124", 0.5]])
+        self.assertEqual(placa, "ABC123")
+
+    def test_sin_votos_validos(self):
+        self.assertEqual(lecturas.consenso([["", 0.9], ["--", 0.5]]), ("", 0.0))
+
+
+class SesionesTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        self.vehiculo = crear_vehiculo("ABC123", crear_persona("S-1"))
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def test_frames_del_mismo_vehiculo_se_funden_en_una_sesion(self):
+        sesion, vehiculo, _, _ = lecturas.registrar_lectura("cam-1", "ABC124", 0.9)
+        self.assertIsNone(vehiculo)
+        sesion, vehiculo, match_tipo, _ = lecturas.registrar_lectura("cam-1", "ABC123", 0.95)
+        self.assertEqual((vehiculo, match_tipo), (self.vehiculo, "exacta"))
+        self.assertEqual(LecturaPlaca.objects.count(), 1)
+        self.assertEqual((sesion.placa, sesion.frames), ("ABC123", 2))
+        self.assertIsNotNone(sesion.confirmada_en)
+        otra, _, _, _ = lecturas.registrar_lectura("cam-1", "XYZ987", 0.9)
+        self.assertNotEqual(otra.pk, sesion.pk)
+
+
+class ResumenesTests(TestCase):
+    def setUp(self):
+        placas._cache.invalidar()
+        crear_vehiculo("ABC123", crear_persona("S-2"))
+
+    def tearDown(self):
+        placas._cache.invalidar()
+
+    def _resumen(self, modelo):
+        return list(modelo.objects.order_by("match").values_list("match", "lecturas", "frames"))
+
+    def test_el_cambio_de_match_mueve_la_sesion_de_cubeta(self):
+        lecturas.registrar_lectura("cam-1", "ABC124", 0.9)
+        self.assertEqual(self._resumen(ResumenLecturaDia), [(False, 1, 1)])
+        self.assertEqual(list(PlacaDesconocidaDia.objects.values_list("placa", "lecturas")), [("ABC124", 1)])
+        lecturas.registrar_lectura("cam-1", "ABC123", 0.95)
+        lecturas.registrar_lectura("cam-1", "ABC123", 0.95)
+        self.assertEqual(self._resumen(ResumenLecturaDia), [(False, 0, 0), (True, 1, 3)])
+        self.assertEqual(self._resumen(ResumenLecturaHora), [(False, 0, 0), (True, 1, 3)])
+        self.assertEqual(list(PlacaDesconocidaDia.objects.values_list("placa", "lecturas")), [("ABC124", 0)])
+
+    def test_los_deltas_coinciden_con_recalcular(self):
+        lecturas.registrar_lectura("cam-1", "ABC124", 0.9)
+        lecturas.registrar_lectura("cam-1", "ABC123", 0.95)
+        lecturas.registrar_lectura("cam-2", "XYZ987", 0.8)
+        lecturas.registrar_lectura("cam-2", "XYZ987", 0.8)
+        incremental = {(c, m): (l, f) for c, m, l, f in ResumenLecturaDia.objects.filter(lecturas__gt=0)
+                       .values_list("camera_id", "match", "lecturas", "frames")}
+        hoy = timezone.localdate()
+        resumenes.recalcular(hoy, hoy + timedelta(days=1))
+        recalculado = {(c, m): (l, f) for c, m, l, f in ResumenLecturaDia.objects
+                       .values_list("camera_id", "match", "lecturas", "frames")}
+        self.assertEqual(incremental, recalculado)
+        self.assertEqual(incremental, {("cam-1", True): (1, 2), ("cam-2", False): (1, 2)})
+
+    def test_frames_confirmados_cuentan_en_los_resumenes(self):
+        sesion, _, _, _ = lecturas.registrar_lectura("cam-1", "ABC123", 0.95)
+        # Frames repetidos del vehículo confirmado y frames sin placa: no pasan por registrar_lectura
+        lecturas.contar_frame(sesion)
+        lecturas.contar_frame(sesion)
+        lecturas.contar_frame(sesion, vacio=True)
+        self.assertEqual(self._resumen(ResumenLecturaDia), [(True, 1, 3)])
+        self.assertEqual(self._resumen(ResumenLecturaHora), [(True, 1, 3)])
+        hoy = timezone.localdate()
+        resumenes.recalcular(hoy, hoy + timedelta(days=1))
+        self.assertEqual(self._resumen(ResumenLecturaDia), [(True, 1, 3)])
+        self.assertEqual(self._resumen(ResumenLecturaHora), [(True, 1, 3)])
+
+
+class RoiCamaraTests(TestCase):
+    def setUp(self):
+        camaras._configuraciones.invalidar()
+
+    def tearDown(self):
+        camaras._configuraciones.invalidar()
+
+    def _frame(self):
+        salida = BytesIO()
+        Image.new("RGB", (2000, 1000), (90, 90, 90)).save(salida, "JPEG")
+        return salida.getvalue()
+
+    def test_recorte_y_cajas_de_vuelta_al_frame(self):
+        archivo, info, transformacion = camaras.recortar(self._frame(), (0.5, 0.5, 0.5, 0.5), 500)
+        self.assertEqual(info["roi"], [1000, 500, 2000, 1000])
+        self.assertEqual(info["dimensiones_final"], [500, 250])
+        self.assertEqual(transformacion, {"x": 1000, "y": 500, "escala": 0.5})
+        js = {"results": [{"box": {"xmin": 100, "ymin": 50, "xmax": 200, "ymax": 100},
+                           "vehicle": {"box": {"xmin": 0, "ymin": 0, "xmax": 500, "ymax": 250}}}]}
+        camaras.mapear_cajas(js, transformacion)
+        self.assertEqual(js["results"][0]["box"], {"xmin": 1200, "ymin": 600, "xmax": 1400, "ymax": 700})
+        self.assertEqual(js["results"][0]["vehicle"]["box"], {"xmin": 1000, "ymin": 500, "xmax": 2000, "ymax": 1000})
+
+    def test_roi_fuera_del_frame_envia_el_frame_completo(self):
+        self.assertIsNone(camaras.recortar(self._frame(), (1.0, 0.0, 0.5, 0.5), 500))
+
+    def test_sin_transformacion_no_toca_las_cajas(self):
+        js = {"results": [{"box": {"xmin": 10, "ymin": 20, "xmax": 30, "ymax": 40}}]}
+        self.assertEqual(camaras.mapear_cajas(js, dict(camaras.IDENTIDAD))["results"][0]["box"]["xmin"], 10)
+
+    def test_configuracion_por_camara(self):
+        _, _, transformacion = camaras.preparar_frame(self._frame(), "cam-roi")
+        self.assertEqual((transformacion["x"], transformacion["y"]), (0, 0))
+        ConfiguracionCamara.objects.create(camera_id="cam-roi", roi_x=0.25, roi_y=0.0, roi_ancho=0.5, roi_alto=1.0,
+                                           lado_objetivo=400)
+        _, info, transformacion = camaras.preparar_frame(self._frame(), "cam-roi")
+        self.assertEqual(info["roi"], [500, 0, 1500, 1000])
+        self.assertEqual(transformacion, {"x": 500, "y": 0, "escala": 0.4})
@@ -1,12 +1,23 @@
 # seguridad_IA/urls.py
-from django.urls import path
-from .views import AlprScanView, ReconocimientoGlobalView, EnrolarPersonaView, VerificarEnrolamientoView, VerificarLuxandAPIView, ProbarLuxandView
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import ConfiguracionCamaraViewSet, AlprScanView, AlprColaView, AlprIngestaView, ReconocimientoGlobalView, EnrolarPersonaView, VerificarEnrolamientoView, VerificarLuxandAPIView, ProbarLuxandView
+from .views_analitica import LecturasPorHoraView, LecturasPorDiaView, PlacasDesconocidasView
+
+router = DefaultRouter()
+router.register(r'camaras', ConfiguracionCamaraViewSet, basename='camaras')
 
 urlpatterns = [
     path("alpr/", AlprScanView.as_view(), name="alpr-scan"),
+    path("alpr/cola/", AlprColaView.as_view(), name="alpr-cola"),
+    path("alpr/ingestas/<int:pk>/", AlprIngestaView.as_view(), name="alpr-ingesta"),
     path("reconocimiento/", ReconocimientoGlobalView.as_view(), name="reconocimiento-global"),
     path("enrolar/", EnrolarPersonaView.as_view(), name="enrolar-persona"),
     path("verificar-enrolamiento/", VerificarEnrolamientoView.as_view(), name="verificar-enrolamiento"),
     path("verificar-luxand/", VerificarLuxandAPIView.as_view(), name="verificar-luxand"),
     path("probar-luxand/", ProbarLuxandView.as_view(), name="probar-luxand"),
+    path("analitica/lecturas/por-hora/", LecturasPorHoraView.as_view(), name="analitica-lecturas-hora"),
+    path("analitica/lecturas/por-dia/", LecturasPorDiaView.as_view(), name="analitica-lecturas-dia"),
+    path("analitica/placas-desconocidas/", PlacasDesconocidasView.as_view(), name="analitica-placas-desconocidas"),
+    path("", include(router.urls)),
 ]
@@ -1,20 +1,41 @@
-import time, requests
+import math, httpx, requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from rest_framework import viewsets
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.response import Response
-from .models import LecturaPlaca
-from .serializers.serializersPlaca import LecturaPlacaSerializer
-from residencial.modelsVehiculo import Vehiculo
+from django.urls import reverse
+from .lecturas import sesion_abierta, contar_frame
+from . import accesos, alpr, camaras, movimiento
+from core.models import Trabajo
+from .models import ConfiguracionCamara
+from .serializers.serializersCamara import ConfiguracionCamaraSerializer
 from administracion.models import Persona, Empleado
-from core.luxand import recognize, add_person
-
-PLATE_URL = "https://api.platerecognizer.com/v1/plate-reader/"
-
-class AlprScanView(APIView):
+from core.luxand import recognize, aadd_person, abuscar_en_colecciones, colecciones_busqueda, probabilidad, LuxandError
+from core.asincrono import APIViewAsync
+from core.cuotas import CuotaAgotada
+from core import http, coalescencia
+from core.preproceso import apreparar
+from core.calidad import aevaluar, evaluar
+from .identidades import resolver_uuid
+from . import reconocimiento
+
+class AlprScanView(APIViewAsync):
+    """
+    Con una cámara fija, un frame igual al último leído responde status=no-change
+    sin llamar a PlateRecognizer (seguridad_IA/movimiento.py), con la decisión de la
+    sesión de ese frame; si ese frame confirmó al vehículo hace menos de
+    ALPR_ESPERA_CONFIRMADA segundos, responde status=confirmed. Mientras la sesión abierta
+    no confirme un vehículo, los frames se leen aunque la escena no cambie.
+    La respuesta incluye `acceso` (permitido/motivo, seguridad_IA/accesos.py); con
+    barrera=true solo va la decisión: {status, plate, score, permitido, motivo, nombre, categoria, unidad}.
+    Async: mientras espera a PlateRecognizer (o su turno en la cuota) no ocupa un hilo.
+    El ORM de sesiones de lectura (transacciones y SELECT FOR UPDATE) corre en un hilo aparte.
+    """
     parser_classes = [MultiPartParser, FormParser]
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         token = settings.PLATE_TOKEN
         if not token:
             return Response({"error": "Configura PLATE_TOKEN"}, status=500)
@@ -27,72 +48,139 @@ class AlprScanView(APIView):
 
         camera_id = request.data.get("camera_id", "") or ""
         regions   = request.data.get("regions") or settings.PLATE_REGIONS
-
-        headers = {"Authorization": f"Token {token}"}
-        payload = {"regions": regions}
-        if camera_id:
-            payload["camera_id"] = camera_id
-
-        files = {"upload": (getattr(f, "name", "frame.jpg"), f, getattr(f, "content_type", "image/jpeg"))}
+        barrera   = _es_verdadero(request.data.get("barrera"))
+
+        sesion = await sync_to_async(sesion_abierta)(camera_id)
+        hay_cambio, fraccion, actual, lectura_id = await movimiento.acomparar(camera_id, f)
+
+        # Mismo frame que ya confirmó al vehículo de esta cámara: no se gasta otra llamada al ALPR
+        if alpr.misma_sesion(sesion, hay_cambio, lectura_id):
+            await sync_to_async(contar_frame)(sesion)
+            return Response(await sync_to_async(alpr.respuesta_confirmada)(sesion, barrera), status=200)
+
+        # Cámara fija sin cambios en la escena desde el último frame leído: nada nuevo que leer,
+        # salvo que la sesión abierta siga sin confirmar (el consenso necesita otra lectura)
+        if not hay_cambio and not alpr.releer(sesion):
+            cuerpo = await sync_to_async(alpr.respuesta_sin_cambio)(fraccion, sesion, lectura_id, barrera)
+            return Response(cuerpo, status=200)
+
+        # Frame borroso/oscuro/diminuto: se rechaza localmente sin llamar al ALPR
+        calidad = await aevaluar(f, "alpr", camera_id)
+        if not calidad["ok"]:
+            return Response(_calidad_insuficiente(calidad), status=422)
+
+        # Reenvíos simultáneos del mismo frame comparten una sola llamada al ALPR y su respuesta
+        clave = alpr.clave_frame("scan-barrera" if barrera else "scan", alpr.huella(f), camera_id, regions)
+        r = await coalescencia.una_vez(clave, lambda: self._leer(f, camera_id, regions, sesion, barrera))
+        if r["status"] == 200:
+            movimiento.fijar_referencia(camera_id, actual, r.get("lectura_id"))
+        return Response(r["cuerpo"], status=r["status"], headers=r.get("headers"))
+
+    async def _leer(self, f, camera_id, regions, sesion, barrera=False):
+        """Llamada al ALPR y registro de la lectura; devuelve {status, cuerpo, headers} (JSON)."""
+        # Solo la ROI de la cámara (o el frame reducido) y recomprimido antes de subirlo
+        preparado, _, transformacion = await camaras.apreparar_frame(f, camera_id)
         try:
-            f.seek(0)
-            r = requests.post(PLATE_URL, headers=headers, data=payload, files=files, timeout=20)
-            if r.status_code == 429:
-                time.sleep(1)
-                f.seek(0)
-                r = requests.post(PLATE_URL, headers=headers, data=payload, files=files, timeout=20)
-        except requests.RequestException as e:
-            return Response({"error": "No se pudo contactar al ALPR", "detail": str(e)}, status=502)
+            # La cuota compartida espera el turno (hasta PLATE_CUOTA_ESPERA) en vez de dormir tras un 429
+            r = await alpr.aleer_placas(preparado.read(), preparado.name, preparado.content_type, camera_id, regions)
+        except CuotaAgotada as e:
+            return {"status": 429, "cuerpo": {"detail": str(e)}, "headers": {"Retry-After": str(math.ceil(e.espera))}}
+        except httpx.HTTPError as e:
+            return {"status": 502, "cuerpo": {"error": "No se pudo contactar al ALPR", "detail": str(e)}}
+
+        if r.status_code == 429:
+            return {"status": 429, "cuerpo": {"error": "Cuota de ALPR excedida", "detail": r.text},
+                    "headers": {"Retry-After": r.headers.get("Retry-After", "1")}}
 
         # 🔧 ACEPTAR 200/201 COMO ÉXITO
         if r.status_code not in (200, 201):
-            return Response({"error": "ALPR no respondió OK", "status_code": r.status_code, "detail": r.text}, status=r.status_code)
+            return {"status": r.status_code, "cuerpo": {"error": "ALPR no respondió OK", "status_code": r.status_code, "detail": r.text}}
 
-        js = r.json()
-        results = js.get("results", [])
+        js = camaras.mapear_cajas(r.json(), transformacion)
+        cuerpo, lectura = await sync_to_async(alpr.procesar_resultado)(camera_id, js, sesion, barrera)
+        return {"status": 200, "cuerpo": cuerpo, "lectura_id": lectura.pk if lectura else None}
 
-        if not results:
-            l = LecturaPlaca.objects.create(placa="", score=0.0, camera_id=camera_id, image_url=None, vehiculo=None, match=False)
-            return Response({
-                "status": "no-plate-found",
-                "plate": None, "score": None, "match": False,
-                "vehiculo": None,
-                "lectura": LecturaPlacaSerializer(l).data
-            }, status=200)
-
-        best      = max(results, key=lambda x: x.get("score", 0) or 0.0)
-        plate_raw = (best.get("plate") or "").upper()
-        score     = float(best.get("score") or 0.0)
-
-        v_match = (Vehiculo.objects.filter(placa__iexact=plate_raw)   # BD ya normalizada
-                .select_related("persona")
-                .first())
-
-        lectura = LecturaPlaca.objects.create(
-            placa=plate_raw, score=score, camera_id=camera_id,
-            image_url=None, vehiculo=v_match, match=bool(v_match)
-        )
-
-        from residencial.serializers.serializersVehiculo import VehiculoSerializer
+
+class AlprColaView(APIView):
+    """
+    Ingesta en cola: la cámara sube el frame y recibe 202 con el id de ingesta
+    sin esperar a PlateRecognizer. El resultado se consulta en alpr/ingestas/<id>/.
+    Por cámara solo se conservan los últimos ALPR_COLA_POR_CAMARA frames pendientes.
+    Todo frame se encola: si es el mismo vehículo ya confirmado lo resuelve el worker
+    sin llamar al ALPR (alpr.procesar_frame).
+    """
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request, *args, **kwargs):
+        if not settings.PLATE_TOKEN:
+            return Response({"error": "Configura PLATE_TOKEN"}, status=500)
+
+        f = request.FILES.get("upload")
+        if not f:
+            return Response({"error": "Debes enviar el archivo en 'upload'."}, status=400)
+        if not getattr(f, "content_type", "").startswith("image/"):
+            return Response({"error": "El archivo debe ser una imagen."}, status=400)
+
+        camera_id = request.data.get("camera_id", "") or ""
+        regions   = request.data.get("regions") or settings.PLATE_REGIONS
+
+        calidad = evaluar(f, "alpr", camera_id)
+        if not calidad["ok"]:
+            return Response(_calidad_insuficiente(calidad), status=422)
+
+        trabajo = alpr.encolar_frame(camera_id, f, regions)
         return Response({
-            "status": "ok",
-            "plate": plate_raw,
-            "score": score,
-            "match": bool(v_match),
-            "vehiculo": VehiculoSerializer(v_match).data if v_match else None,
-            "lectura": LecturaPlacaSerializer(lectura).data
-        }, status=200)
+            "ingesta_id": trabajo.id,
+            "estado": trabajo.estado,
+            "url": request.build_absolute_uri(reverse("alpr-ingesta", args=[trabajo.id])),
+        }, status=202)
 
 
-def _norm(sim):
-    try:
-        sim = float(sim or 0.0)
-    except:
-        sim = 0.0
-    return sim / 100.0 if sim > 1.0 else sim
+class AlprIngestaView(APIView):
+    """
+    Estado de un frame encolado: PENDIENTE / PROCESANDO / COMPLETADO (con el mismo
+    cuerpo que alpr/) / FALLIDO / CANCELADO (descartado por uno más nuevo).
+    """
+    def get(self, request, pk, *args, **kwargs):
+        trabajo = Trabajo.objects.filter(pk=pk, tipo='ALPR').defer('archivo').first()
+        if trabajo is None:
+            return Response({"detail": "No encontrado."}, status=404)
+        data = {
+            "ingesta_id": trabajo.id,
+            "estado": trabajo.estado,
+            "camera_id": (trabajo.parametros or {}).get("camera_id", ""),
+            "fecha_creacion": trabajo.fecha_creacion,
+            "resultado": trabajo.resultado,
+            "error": trabajo.ultimo_error if trabajo.estado in ('FALLIDO', 'CANCELADO') else None,
+        }
+        return Response(data, status=200)
+
+
+class ConfiguracionCamaraViewSet(viewsets.ModelViewSet):
+    """
+    ROI y resolución de subida por cámara (ver seguridad_IA/camaras.py).
+    roi_x, roi_y, roi_ancho, roi_alto son fracciones del frame (0-1).
+    """
+    queryset = ConfiguracionCamara.objects.all()
+    serializer_class = ConfiguracionCamaraSerializer
+
+
+def _es_verdadero(valor):
+    return str(valor).strip().lower() in ("1", "true", "si", "sí")
+
+
+def _cuota_agotada(e):
+    return Response({"detail": str(e)}, status=429, headers={"Retry-After": str(math.ceil(e.espera))})
+
 
+def _calidad_insuficiente(calidad):
+    return {
+        "ok": False, "reason": "calidad_insuficiente", "motivo": calidad["motivo"],
+        "detail": calidad["detalle"], "metricas": calidad["metricas"],
+    }
 
-class ReconocimientoGlobalView(APIView):
+
+class ReconocimientoGlobalView(APIViewAsync):
     """
     Reconoce a una persona (residente) o a un empleado en una sola llamada.
     Body:
@@ -100,11 +188,21 @@ class ReconocimientoGlobalView(APIView):
       - umbral   (float, default=0.80)
     Respuesta:
       { ok, tipo, id, nombre, similaridad, uuid }
+      - multiple (bool, default=false): una entrada por cada cara de la foto
+      - camera_id (str, opcional): umbrales de calidad de esa cámara (core/calidad.py)
+      - barrera (bool, default=false): solo la decisión de acceso
+        { permitido, motivo, tipo, id, nombre, categoria, unidad, similaridad }
+    Respuesta con multiple:
+      { ok, caras: [{ ok, tipo, id, nombre, similaridad, uuid, rectangulo }, ...] }
+    Un archivo borroso, oscuro o diminuto se rechaza con 422 (reason=calidad_insuficiente).
+    Async: la espera a Luxand no ocupa un hilo del worker.
     """
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         umbral = float(request.data.get("umbral", 0.80))
+        multiple = _es_verdadero(request.data.get("multiple"))
+        barrera = _es_verdadero(request.data.get("barrera"))
         image_url = request.data.get("image_url")
         image_file = request.FILES.get("image_file")
 
@@ -124,33 +222,36 @@ class ReconocimientoGlobalView(APIView):
 
             fuente = image_url if image_url else image_file
             
-            # Intentar reconocimiento con retry en caso de errores temporales
-            max_retries = 3
-            retry_delay = 2  # segundos
-            
-            for attempt in range(max_retries):
-                try:
-                    print(f"🔄 Reconocimiento intento {attempt + 1}/{max_retries}")
-                    res = recognize(fuente, gallery=gallery)
-                    break  # Si es exitoso, salir del loop
-                except ValueError as e:
-                    error_msg = str(e)
-                    print(f"❌ Error en intento {attempt + 1}: {error_msg}")
-                    
-                    # Si es un error 503 o 429, intentar de nuevo después de un delay
-                    if ("503" in error_msg or "429" in error_msg or "timeout" in error_msg.lower()) and attempt < max_retries - 1:
-                        print(f"⏳ Esperando {retry_delay} segundos antes del siguiente intento...")
-                        import time
-                        time.sleep(retry_delay)
-                        retry_delay *= 2  # Exponential backoff
-                        continue
-                    else:
-                        # Si no es un error temporal o ya se agotaron los intentos, re-lanzar el error
-                        raise e
-            
+            # Personas y empleados pueden estar en colecciones distintas: se consultan todas a la vez
+            colecciones = colecciones_busqueda()
+
+            # La misma imagen (bytes o URL) reenviada en segundos no vuelve a consultar Luxand
+            clave = reconocimiento.clave_imagen(",".join(colecciones), image_url=image_url, image_file=None if image_url else image_file)
+            res = reconocimiento.obtener(clave)
+            desde_cache = res is not None
+            if not desde_cache and image_file and not image_url:
+                # Frame borroso/oscuro/diminuto: se rechaza localmente sin llamar a Luxand
+                calidad = await aevaluar(image_file, "reconocimiento", request.data.get("camera_id", "") or "")
+                if not calidad["ok"]:
+                    return Response(_calidad_insuficiente(calidad), status=422)
+            if not desde_cache:
+                async def consultar():
+                    # Se sube la versión reducida; la clave de cache sigue siendo la del original
+                    fuente_subida = (await apreparar(fuente))[0] if image_file and not image_url else fuente
+                    # La cuota compartida de Luxand ordena las llamadas de todos los workers
+                    # Con varias caras no se corta en la primera que supera el umbral
+                    res, completo = await abuscar_en_colecciones(fuente_subida, colecciones, None if multiple else umbral)
+                    if completo:
+                        # Un resultado cortado al superar este umbral podría no servir con otro umbral
+                        reconocimiento.guardar(clave, res)
+                    return res
+
+                # Reintentos simultáneos de la misma imagen esperan la llamada en curso
+                res = await coalescencia.una_vez(f"reconocimiento:{clave}:{umbral}:{multiple}", consultar)
+
             # Debug: Log the response structure and gallery
             print(f"=== RECONOCIMIENTO DEBUG ===")
-            print(f"Gallery used: '{gallery}'")
+            print(f"Galleries used: {colecciones}")
             print(f"Luxand API response type: {type(res)}")
             print(f"Luxand API response: {res}")
             print(f"==========================")
@@ -207,6 +308,17 @@ class ReconocimientoGlobalView(APIView):
                     "reason": "sin_coincidencias", 
                     "detail": "No se encontraron coincidencias válidas en la respuesta"
                 })
+
+            if multiple:
+                caras = await sync_to_async(reconocimiento.resultado_por_cara)(
+                    [c for c in candidates if isinstance(c, dict)], umbral)
+                return Response({
+                    "ok": any(c["ok"] for c in caras),
+                    "caras": caras,
+                    "umbral": umbral,
+                    "desde_cache": desde_cache,
+                    "raw": res
+                })
             
             best = candidates[0]
             # Ensure best is a dictionary
@@ -220,57 +332,65 @@ class ReconocimientoGlobalView(APIView):
             # Extract UUID and similarity according to Luxand documentation
             # Luxand returns: uuid, probability, name, etc.
             uuid = best.get("uuid") or best.get("subject") or best.get("person_uuid")
-            sim = _norm(best.get("probability") or best.get("similarity") or best.get("confidence") or best.get("score"))
+            sim = probabilidad(best)
 
             print(f"🎯 UUID DEBUG:")
             print(f"   UUID from Luxand: {uuid}")
             print(f"   Similarity: {sim}")
 
-            tipo = None
-            obj = None
-            if uuid:
-                print(f"🔍 DATABASE SEARCH:")
-                obj = Persona.objects.filter(luxand_uuid=uuid).first()
-                if obj:
-                    tipo = "persona"
-                    print(f"   ✅ Found in Persona table: {obj.nombre} {obj.apellido}")
-                else:
-                    obj = Empleado.objects.filter(luxand_uuid=uuid).first()
-                    if obj:
-                        tipo = "empleado"
-                        print(f"   ✅ Found in Empleado table: {obj.nombre} {obj.apellido}")
-                    else:
-                        print(f"   ❌ Not found in database with UUID: {uuid}")
-                        print(f"   📋 Available UUIDs in Persona: {list(Persona.objects.filter(luxand_uuid__isnull=False).values_list('luxand_uuid', flat=True))}")
-                        print(f"   📋 Available UUIDs in Empleado: {list(Empleado.objects.filter(luxand_uuid__isnull=False).values_list('luxand_uuid', flat=True))}")
-            else:
+            if barrera:
+                # Una sola búsqueda (cacheada) en acceso_precalculado y el cuerpo corto
+                acceso = await sync_to_async(accesos.acceso_rostro)(uuid) if sim >= umbral else \
+                    {**accesos.decidir(None), "motivo": "no_reconocido"}
+                return Response({**acceso, "similaridad": round(sim, 4)})
+
+            # Una sola búsqueda indexada (cacheada por proceso) en el registro de identidades
+            identidad = await sync_to_async(resolver_uuid)(uuid)
+            if not uuid:
                 print(f"   ❌ No UUID found in Luxand response")
+            elif identidad:
+                print(f"   ✅ Found {identidad['tipo']}: {identidad['nombre']}")
+            else:
+                print(f"   ❌ Not found in database with UUID: {uuid}")
 
-            ok = bool(obj) and sim >= umbral
-            nombre = f"{getattr(obj, 'nombre', '')} {getattr(obj, 'apellido', '')}".strip() if obj else None
+            ok = bool(identidad) and sim >= umbral
+            nombre = identidad["nombre"] if identidad else None
             
             print(f"🎯 FINAL RESULT:")
-            print(f"   Object found: {bool(obj)}")
+            print(f"   Object found: {bool(identidad)}")
             print(f"   Similarity: {sim}")
             print(f"   Threshold: {umbral}")
             print(f"   OK: {ok}")
             print(f"   Name: {nombre}")
             
+            acceso = await sync_to_async(accesos.acceso_rostro)(uuid) if ok else \
+                {**accesos.decidir(None), "motivo": "no_reconocido"}
+
             return Response({
                 "ok": ok,
-                "tipo": tipo,
-                "id": getattr(obj, "id", None),
+                "tipo": identidad["tipo"] if identidad else None,
+                "id": identidad["id"] if identidad else None,
                 "nombre": nombre,
+                "acceso": acceso,
                 "similaridad": round(sim, 4),
                 "uuid": uuid,
                 "umbral": umbral,
+                "coleccion": best.get("collection"),
+                "desde_cache": desde_cache,
                 "raw": res  # quítalo en producción si no lo necesitas
             })
             
+        except CuotaAgotada as e:
+            return _cuota_agotada(e)
+        except LuxandError as e:
+            if e.temporal:
+                return Response({"detail": f"Luxand no disponible: {e}"}, status=429 if e.status_code == 429 else 503,
+                                headers={"Retry-After": str(e.retry_after or 1)})
+            return Response({"detail": f"Error de API Luxand: {e}"}, status=400)
         except ValueError as e:
             # Errores específicos de Luxand API
             return Response({"detail": f"Error de API Luxand: {e}"}, status=400)
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             # Errores de conexión
             return Response({"detail": f"Error de conexión con Luxand: {e}"}, status=503)
         except Exception as e:
@@ -278,7 +398,7 @@ class ReconocimientoGlobalView(APIView):
             return Response({"detail": f"Error interno: {e}"}, status=500)
 
 
-class EnrolarPersonaView(APIView):
+class EnrolarPersonaView(APIViewAsync):
     """
     Enrola una persona en Luxand (registra su foto para reconocimiento futuro).
     Body:
@@ -286,10 +406,11 @@ class EnrolarPersonaView(APIView):
       - image_url (str) ó image_file (multipart) - Foto de la persona
     Respuesta:
       { ok, uuid, nombre, mensaje }
+    Async: ORM async de Django y httpx hacia Luxand.
     """
     parser_classes = (MultiPartParser, FormParser, JSONParser)
 
-    def post(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
         persona_id = request.data.get("persona_id")
         empleado_id = request.data.get("empleado_id")
         image_url = request.data.get("image_url")
@@ -307,10 +428,10 @@ class EnrolarPersonaView(APIView):
             tipo = None
             
             if persona_id:
-                obj = Persona.objects.filter(id=persona_id).first()
+                obj = await Persona.objects.filter(id=persona_id).afirst()
                 tipo = "persona"
             else:
-                obj = Empleado.objects.filter(id=empleado_id).first()
+                obj = await Empleado.objects.filter(id=empleado_id).afirst()
                 tipo = "empleado"
             
             if not obj:
@@ -342,7 +463,10 @@ class EnrolarPersonaView(APIView):
                 print(f"Tipo de contenido: {image_file.content_type}")
             print(f"==========================")
             
-            res = add_person(nombre_completo, fuente, collections=gallery)
+            if image_file and not image_url:
+                fuente, info = await apreparar(image_file)
+                print(f"Imagen enviada: {info['bytes_final']} bytes (original {info['bytes_original']})")
+            res = await aadd_person(nombre_completo, fuente, collections=gallery)
             
             print(f"Luxand add_person response: {res}")
             
@@ -364,7 +488,8 @@ class EnrolarPersonaView(APIView):
             
             # Guardar UUID en la base de datos
             obj.luxand_uuid = uuid
-            obj.save()
+            obj.luxand_estado = 'ENROLADO'
+            await obj.asave()
             
             return Response({
                 "ok": True,
@@ -414,9 +539,6 @@ class VerificarLuxandAPIView(APIView):
     """
     def get(self, request, *args, **kwargs):
         try:
-            import requests
-            from django.conf import settings
-            
             # Verificar configuración
             token = getattr(settings, "LUXAND_TOKEN", "")
             collection = getattr(settings, "LUXAND_COLLECTION", "")
@@ -433,7 +555,7 @@ class VerificarLuxandAPIView(APIView):
             
             try:
                 # Hacer una petición GET para verificar conectividad
-                response = requests.get(url, headers=headers, timeout=10)
+                response = http.get("luxand", url, headers=headers, timeout=10)
                 
                 return Response({
                     "status": "success" if response.status_code == 200 else "error",
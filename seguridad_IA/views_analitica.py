@@ -0,0 +1,92 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Sum, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import ResumenLecturaHora, ResumenLecturaDia, PlacaDesconocidaDia
+from .serializers.serializersAnalitica import ResumenLecturaHoraSerializer
+
+
+def _rango(request, dias_por_defecto=7):
+    """(desde, hasta) inclusive a partir de ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD."""
+    hoy = timezone.localdate()
+    hasta = parse_date(request.query_params.get("hasta", "") or "") or hoy
+    desde = parse_date(request.query_params.get("desde", "") or "") or hasta - timedelta(days=dias_por_defecto - 1)
+    return desde, hasta
+
+
+def _tasa(con_match, total):
+    return round(con_match / total, 4) if total else None
+
+
+class LecturasPorHoraView(APIView):
+    """
+    Lecturas por cámara, hora y match, leídas de resumen_lectura_hora.
+    Query: ?desde=&hasta= (fechas, por defecto hoy) &camera_id=
+    """
+    def get(self, request, *args, **kwargs):
+        desde, hasta = _rango(request, dias_por_defecto=1)
+        inicio = timezone.make_aware(datetime.combine(desde, time.min))
+        fin = timezone.make_aware(datetime.combine(hasta + timedelta(days=1), time.min))
+        qs = ResumenLecturaHora.objects.filter(hora__gte=inicio, hora__lt=fin, lecturas__gt=0)
+        camera_id = request.query_params.get("camera_id")
+        if camera_id is not None:
+            qs = qs.filter(camera_id=camera_id)
+        return Response(ResumenLecturaHoraSerializer(qs.order_by("hora", "camera_id", "match"), many=True).data)
+
+
+class LecturasPorDiaView(APIView):
+    """
+    Lecturas por día y cámara con la proporción de vehículos reconocidos.
+    Query: ?desde=&hasta= (por defecto los últimos 7 días) &camera_id=
+    """
+    def get(self, request, *args, **kwargs):
+        desde, hasta = _rango(request)
+        qs = ResumenLecturaDia.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+        camera_id = request.query_params.get("camera_id")
+        if camera_id is not None:
+            qs = qs.filter(camera_id=camera_id)
+        filas = (qs.values("fecha", "camera_id")
+                 .annotate(total=Sum("lecturas"), total_frames=Sum("frames"),
+                           con_match=Sum("lecturas", filter=Q(match=True)))
+                 .order_by("fecha", "camera_id"))
+        data = []
+        for fila in filas:
+            con_match = fila["con_match"] or 0
+            data.append({
+                "fecha": fila["fecha"],
+                "camera_id": fila["camera_id"],
+                "lecturas": fila["total"],
+                "frames": fila["total_frames"],
+                "con_match": con_match,
+                "sin_match": fila["total"] - con_match,
+                "tasa_match": _tasa(con_match, fila["total"]),
+            })
+        total = sum(f["lecturas"] for f in data)
+        total_match = sum(f["con_match"] for f in data)
+        return Response({
+            "desde": desde, "hasta": hasta,
+            "total": total, "con_match": total_match, "tasa_match": _tasa(total_match, total),
+            "dias": data,
+        })
+
+
+class PlacasDesconocidasView(APIView):
+    """
+    Placas más leídas sin vehículo registrado.
+    Query: ?desde=&hasta= (por defecto los últimos 7 días) &limite=20
+    """
+    def get(self, request, *args, **kwargs):
+        desde, hasta = _rango(request)
+        try:
+            limite = min(int(request.query_params.get("limite", 20)), 200)
+        except ValueError:
+            limite = 20
+        filas = (PlacaDesconocidaDia.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+                 .values("placa").annotate(total=Sum("lecturas"))
+                 .filter(total__gt=0).order_by("-total", "placa")[:limite])
+        placas = [{"placa": f["placa"], "lecturas": f["total"]} for f in filas]
+        return Response({"desde": desde, "hasta": hasta, "placas": placas})